@@ -0,0 +1,339 @@
+"""
+Shih-Hsuan Hsu
+October 18, 2026
+Download many FRED series in one process (used by `env.FredDownloads`).
+The series are fetched concurrently by a few threads, each reusing its HTTP connection.
+Every API key in `secrets/fred*.txt` has its own token bucket, so requests are spread
+    over the keys before any of them hits the FRED rate limit (120 requests per minute).
+Rate-limited (429) and failed (5xx, timeouts) requests are retried with exponential backoff,
+    and a rate-limited key rests before it is used again.
+Each series is kept in a local cache (see `fred_cache.py`), so only its recent observations
+    are requested again, and is written to its own CSV file (`date,value`,
+    like `get_series(...).to_csv`) or Parquet file only when its values change.
+Set `FRED_API_URL` to use another server (e.g., `fred_stand_in_server.py` for testing).
+Usage: python fred_batch.py <series>=<output file> <series>=<output file> ... [--full]
+"""
+
+import os
+import sys
+import json
+import time
+import random
+import argparse
+import threading
+import http.client
+import urllib.parse
+from glob import glob
+from concurrent.futures import ThreadPoolExecutor
+import fred_cache
+
+FRED_API_URL = "https://api.stlouisfed.org/fred"
+"""Base URL of the FRED API (`FRED_API_URL` environment variable)."""
+
+KEY_FILES = "../../../secrets/fred*.txt"
+"""API key files, relative to the `code` folder of a task."""
+
+REQUESTS_PER_SECOND = 2.0
+"""Requests per second per API key (FRED allows 120 requests per minute)."""
+
+BURST = 5
+"""Requests a key can send at once after being idle."""
+
+WORKERS = 8
+"""Series downloaded at once."""
+
+RETRIES = 5
+"""Retries of a series after a rate-limited or failed request."""
+
+BACKOFF = 1.0
+"""Seconds before the first retry (doubled at every retry)."""
+
+TIMEOUT = 60
+"""Seconds before a request times out."""
+
+
+class FredError(Exception):
+    """
+    An error returned by FRED that retrying does not fix (e.g., an unknown series).
+    """
+
+
+class RetryableError(Exception):
+    """
+    A failed request that may succeed if retried (rate limit, server error, timeout).
+    """
+
+
+class TokenBucket:
+    """
+    Allow `rate` requests per second on average, and up to `burst` at once.
+    """
+
+    def __init__(self, rate, burst):
+        self.rate = rate
+        self.burst = burst
+        self.tokens = burst
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+
+    def wait_time(self):
+        """
+        Returns the seconds until a token is available.
+        """
+        with self.lock:
+            now = time.monotonic()
+            self.tokens = min(
+                self.burst, self.tokens + (now - self.updated) * self.rate
+            )
+            self.updated = now
+            return max((1 - self.tokens) / self.rate, 0)
+
+    def try_take(self):
+        """
+        Take a token if one is available; returns True if taken.
+        """
+        if self.wait_time() > 0:
+            return False
+        with self.lock:
+            if self.tokens < 1:
+                return False
+            self.tokens -= 1
+            return True
+
+    def drain(self, seconds):
+        """
+        Empty the bucket so that the next token comes in `seconds` (after a 429).
+        """
+        with self.lock:
+            self.tokens = min(self.tokens, 1 - seconds * self.rate)
+            self.updated = time.monotonic()
+
+
+class KeyRing:
+    """
+    Hand out API keys, each limited by its own token bucket.
+    """
+
+    def __init__(self, keys, rate=REQUESTS_PER_SECOND, burst=BURST):
+        if not keys:
+            raise FredError("No FRED API key found (see `secrets/README.md`).")
+        keys = list(keys)
+        random.shuffle(keys)  # so that the keys are used in random order
+        self.buckets = {key: TokenBucket(rate, burst) for key in keys}
+
+    def acquire(self):
+        """
+        Wait for the key that has a token first, and return it.
+        """
+        while True:
+            waits = {
+                key: bucket.wait_time() for key, bucket in self.buckets.items()
+            }
+            key = min(waits, key=waits.get)
+            if waits[key] > 0:
+                time.sleep(waits[key])
+            if self.buckets[key].try_take():
+                return key
+
+    def rest(self, key, seconds):
+        """
+        Do not use `key` for `seconds` (it was rate-limited).
+        """
+        self.buckets[key].drain(seconds)
+
+
+def load_keys(pattern=KEY_FILES):
+    """
+    Returns the API keys in the key files.
+    """
+    keys = []
+    for path in sorted(glob(pattern)):
+        with open(path, "r", encoding="utf-8") as f:
+            key = f.read().strip()
+        if key:
+            keys.append(key)
+    return keys
+
+
+class FredClient:
+    """
+    Fetch FRED series, with one persistent HTTP connection per thread.
+    """
+
+    def __init__(self, keys, base_url=None, timeout=TIMEOUT):
+        base_url = base_url or os.environ.get("FRED_API_URL", FRED_API_URL)
+        url = urllib.parse.urlsplit(base_url)
+        self.https = url.scheme == "https"
+        self.host = url.netloc
+        self.path = url.path.rstrip("/")
+        self.timeout = timeout
+        self.keys = keys
+        self.local = threading.local()
+
+    def connection(self):
+        """
+        Returns the connection of the current thread, opening it if needed.
+        """
+        if getattr(self.local, "connection", None) is None:
+            connection_class = (
+                http.client.HTTPSConnection
+                if self.https
+                else http.client.HTTPConnection
+            )
+            self.local.connection = connection_class(
+                self.host, timeout=self.timeout
+            )
+        return self.local.connection
+
+    def close(self):
+        """
+        Close the connection of the current thread.
+        """
+        if getattr(self.local, "connection", None) is not None:
+            self.local.connection.close()
+            self.local.connection = None
+
+    def request(self, endpoint, **params):
+        """
+        Send one request with the next available key and return the JSON response.
+        """
+        key = self.keys.acquire()
+        query = urllib.parse.urlencode(
+            {**params, "api_key": key, "file_type": "json"}
+        )
+        try:
+            connection = self.connection()
+            connection.request("GET", f"{self.path}/{endpoint}?{query}")
+            response = connection.getresponse()
+            body = response.read()
+        except (OSError, http.client.HTTPException) as e:
+            # the connection is broken (or timed out): reconnect on retry
+            self.close()
+            raise RetryableError(f"{type(e).__name__}: {e}") from e
+        if response.status == 429:
+            retry_after = float(response.getheader("Retry-After") or 60)
+            self.keys.rest(key, retry_after)
+            raise RetryableError("Too Many Requests")
+        if response.status >= 500:
+            raise RetryableError(f"HTTP {response.status}")
+        try:
+            data = json.loads(body)
+        except ValueError as e:
+            raise RetryableError(f"Invalid response: {e}") from e
+        if response.status != 200:
+            raise FredError(
+                data.get("error_message", f"HTTP {response.status}")
+            )
+        return data
+
+    def get_series(
+        self,
+        series_id,
+        observation_start=None,
+        retries=RETRIES,
+        backoff=BACKOFF,
+    ):
+        """
+        Returns the observations of a series (from `observation_start` if given)
+            as FRED returns them: [{date, value, realtime_start, realtime_end}].
+        """
+        params = {"series_id": series_id}
+        if observation_start is not None:
+            params["observation_start"] = observation_start
+        for attempt in range(retries + 1):
+            try:
+                data = self.request("series/observations", **params)
+                break
+            except RetryableError as e:
+                if attempt == retries:
+                    raise FredError(
+                        f"{series_id}: gave up after {retries} retries ({e})."
+                    ) from e
+                delay = backoff * 2**attempt * random.uniform(1, 1.5)
+                print(f"{series_id}: {e}; retrying in {delay:.1f} s.")
+                time.sleep(delay)
+        return data["observations"]
+
+
+def download_batch(pairs, client, workers=WORKERS, full=False):
+    """
+    Refresh the series of `pairs` [(series, output file)] concurrently
+        (download their full history if `full` or not cached).
+    Returns {series: error message} of the series that failed.
+    """
+
+    def download(pair):
+        series_id, path = pair
+        start = time.perf_counter()
+        cached = None if full else fred_cache.read_cache(series_id)
+        observation_start = fred_cache.refresh_start(cached)
+        new = fred_cache.to_frame(
+            client.get_series(series_id, observation_start)
+        )
+        observations = fred_cache.merge(cached, new)
+        fred_cache.write_cache(series_id, observations)
+        written = fred_cache.write_output(path, observations)
+        print(
+            f"{series_id}: {len(new)} observations requested "
+            f"(from {observation_start or 'the start'}) "
+            f"in {time.perf_counter() - start:.1f} s -> "
+            f"{path if written else 'unchanged'}"
+        )
+
+    errors = {}
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        futures = {executor.submit(download, pair): pair for pair in pairs}
+        for future, (series_id, _) in futures.items():
+            try:
+                future.result()
+            except Exception as e:  # pylint: disable=broad-except
+                errors[series_id] = str(e)
+    return errors
+
+
+def parse_pair(text):
+    """
+    Parse `<series>=<output file>`.
+    """
+    series_id, separator, path = text.partition("=")
+    if not separator or not series_id or not path:
+        raise argparse.ArgumentTypeError(
+            f"Expect <series>=<output file> but got `{text}`."
+        )
+    return series_id, path
+
+
+def main():
+    """
+    Download the series given on the command line.
+    """
+    parser = argparse.ArgumentParser(description="Download FRED series.")
+    parser.add_argument("pairs", nargs="+", type=parse_pair)
+    parser.add_argument("--workers", type=int, default=WORKERS)
+    parser.add_argument("--keys", default=KEY_FILES, help="API key files")
+    parser.add_argument(
+        "--full", action="store_true", help="ignore the cached series"
+    )
+    parser.add_argument(
+        "--rate",
+        type=float,
+        default=REQUESTS_PER_SECOND,
+        help="requests per second per API key",
+    )
+    args = parser.parse_args()
+    keys = KeyRing(load_keys(args.keys), rate=args.rate)
+    start = time.perf_counter()
+    errors = download_batch(
+        args.pairs, FredClient(keys), args.workers, args.full
+    )
+    print(
+        f"Downloaded {len(args.pairs) - len(errors)} of {len(args.pairs)} series "
+        f"in {time.perf_counter() - start:.1f} s with {len(keys.buckets)} key(s)."
+    )
+    for series_id, error in errors.items():
+        print(f"FAILED {series_id}: {error}", file=sys.stderr)
+    return 1 if errors else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
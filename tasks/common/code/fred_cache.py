@@ -0,0 +1,131 @@
+"""
+Shih-Hsuan Hsu
+October 18, 2026
+Local cache of FRED series (used by `fred_batch.py`).
+Each series is stored as a Parquet file with its observations and their realtime period
+    (`date`, `value`, `realtime_start`, `realtime_end`).
+A refresh only requests the observations from `REFRESH_OVERLAP` observations before
+    the last cached date (recent observations are often revised), and merges them in.
+The output files are only rewritten when their values change,
+    so unchanged series do not trigger downstream rebuilds.
+Set `FRED_CACHE_DIR` to move the cache (default: `tasks/.scons_cache/fred`).
+"""
+
+import os
+import pandas as pd
+
+FRED_CACHE_DIR = "../../.scons_cache/fred"
+"""Folder of the cached series, relative to `common/code` (`FRED_CACHE_DIR`)."""
+
+REFRESH_OVERLAP = 24
+"""Cached observations requested again at each refresh, to pick up revisions."""
+
+COLUMNS = ["date", "value", "realtime_start", "realtime_end"]
+"""Columns of a cached series."""
+
+
+def cache_path(series_id: str) -> str:
+    """
+    Returns the path of the cached series.
+    """
+    cache_dir = os.environ.get("FRED_CACHE_DIR", FRED_CACHE_DIR)
+    return os.path.join(cache_dir, f"{series_id}.parquet")
+
+
+def read_cache(series_id: str):
+    """
+    Returns the cached observations of a series (None if not cached).
+    """
+    try:
+        return pd.read_parquet(cache_path(series_id))
+    except (OSError, ValueError) as e:
+        if os.path.exists(cache_path(series_id)):
+            print(f"{series_id}: cannot read the cache ({e}); downloading all.")
+        return None
+
+
+def refresh_start(cached):
+    """
+    Returns the first date to request (None to request the full history).
+    """
+    if cached is None or cached.empty:
+        return None
+    return cached["date"].iloc[max(len(cached) - REFRESH_OVERLAP, 0)]
+
+
+def to_frame(observations: list) -> pd.DataFrame:
+    """
+    Returns the observations returned by FRED as a DataFrame
+        (missing values `.` are NaN).
+    """
+    frame = pd.DataFrame(observations, columns=COLUMNS)
+    frame["value"] = pd.to_numeric(frame["value"], errors="coerce")
+    return frame.astype(
+        {"date": str, "realtime_start": str, "realtime_end": str}
+    )
+
+
+def merge(cached, new: pd.DataFrame) -> pd.DataFrame:
+    """
+    Returns the cached observations updated with the new ones
+        (the new ones replace the cached ones from their first date).
+    """
+    if cached is None or new.empty:
+        return new if cached is None else cached
+    kept = cached[cached["date"] < new["date"].iloc[0]]
+    return pd.concat([kept, new], ignore_index=True)
+
+
+def write_cache(series_id: str, frame: pd.DataFrame):
+    """
+    Store the observations of a series in the cache.
+    """
+    path = cache_path(series_id)
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    temporary = f"{path}.tmp"
+    frame.to_parquet(temporary, index=False)
+    os.replace(temporary, path)
+
+
+def same_values(path: str, frame: pd.DataFrame) -> bool:
+    """
+    Returns True if the output file already has the dates and values of `frame`.
+    """
+    if not os.path.exists(path):
+        return False
+    if path.endswith(".parquet"):
+        try:
+            existing = pd.read_parquet(path)
+        except (OSError, ValueError):
+            return False
+        return existing.equals(frame[["date", "value"]])
+    with open(path, "r", encoding="utf-8") as f:
+        return f.read() == csv_text(frame)
+
+
+def csv_text(frame: pd.DataFrame) -> str:
+    """
+    Returns the CSV output of a series (`date,value` without a header).
+    """
+    return "".join(
+        f"{date},{'' if pd.isna(value) else value}\n"
+        for date, value in zip(frame["date"], frame["value"])
+    )
+
+
+def write_output(path: str, frame: pd.DataFrame) -> bool:
+    """
+    Write the dates and values of a series to a CSV or Parquet file,
+        unless the file already has them. Returns True if the file was written.
+    """
+    if same_values(path, frame):
+        return False
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    temporary = f"{path}.tmp"
+    if path.endswith(".parquet"):
+        frame[["date", "value"]].to_parquet(temporary, index=False)
+    else:
+        with open(temporary, "w", encoding="utf-8", newline="") as f:
+            f.write(csv_text(frame))
+    os.replace(temporary, path)
+    return True
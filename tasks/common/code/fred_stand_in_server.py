@@ -0,0 +1,197 @@
+"""
+Shih-Hsuan Hsu
+October 18, 2026
+A local stand-in for the FRED API, to try the FRED downloads without an API key
+    or the network (see `fred_batch.py`):
+    python fred_stand_in_server.py --port 8766
+    FRED_API_URL=http://127.0.0.1:8766/fred scons download_public_data
+
+Endpoint:
+    GET /fred/series/observations?series_id=<series>&api_key=<key>&file_type=json
+Every series has `--months` monthly observations from 2000 derived from its name
+    (series starting with `MISSING` do not exist), filtered by `observation_start`;
+    restart with more months to publish new observations, or with a higher `--vintage`
+    to revise the last `REVISED_MONTHS` observations (like FRED revising recent data).
+Like FRED, each key may send `--rate` requests per second (more get a 429),
+    and `--fail` is the share of requests answered with a 500, to exercise the retries.
+"""
+
+import json
+import time
+import random
+import zlib
+import argparse
+import threading
+import urllib.parse
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+
+REVISED_MONTHS = 12
+"""Observations revised by each vintage (`--vintage`)."""
+
+
+class FredRequestHandler(BaseHTTPRequestHandler):
+    """
+    Handle the requests to the stand-in FRED API.
+    """
+
+    protocol_version = "HTTP/1.1"  # keep the connections alive like FRED
+    rate = 2.0
+    """Requests per second allowed per key (set by `main`)."""
+    fail = 0.0
+    """Share of the requests failing with a 500 (set by `main`)."""
+    latency = 0.05
+    """Seconds to answer a request (set by `main`)."""
+    months = 300
+    """Observations per series (set by `main`)."""
+    vintage = 0
+    """Revisions of the recent observations (set by `main`)."""
+    requests = {}
+    """Times of the recent requests of each key."""
+    lock = threading.Lock()
+
+    def send_json(self, status, data, headers=None):
+        """
+        Send a JSON response.
+        """
+        body = json.dumps(data).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def rate_limited(self, key):
+        """
+        Returns True if `key` sent more than `rate` requests in the last second.
+        """
+        now = time.monotonic()
+        with self.lock:
+            recent = [t for t in self.requests.get(key, []) if now - t < 1]
+            recent.append(now)
+            self.requests[key] = recent
+            return len(recent) > max(self.rate, 1)
+
+    def do_GET(self):  # pylint: disable=invalid-name
+        """
+        Return the observations of a series.
+        """
+        url = urllib.parse.urlsplit(self.path)
+        params = dict(urllib.parse.parse_qsl(url.query))
+        time.sleep(self.latency)
+        if url.path != "/fred/series/observations":
+            self.send_json(
+                404, {"error_code": 404, "error_message": "Not Found"}
+            )
+        elif not params.get("api_key"):
+            self.send_json(
+                400,
+                {
+                    "error_code": 400,
+                    "error_message": "Bad Request. Variable api_key is not set.",
+                },
+            )
+        elif self.rate_limited(params["api_key"]):
+            self.send_json(
+                429,
+                {"error_code": 429, "error_message": "Too Many Requests."},
+                {"Retry-After": "1"},
+            )
+        elif random.random() < self.fail:
+            self.send_json(
+                500,
+                {"error_code": 500, "error_message": "Internal Server Error."},
+            )
+        elif params.get("series_id", "").startswith("MISSING"):
+            self.send_json(
+                400,
+                {
+                    "error_code": 400,
+                    "error_message": "Bad Request.  The series does not exist.",
+                },
+            )
+        else:
+            self.send_json(
+                200,
+                self.observations(
+                    params.get("series_id", ""),
+                    params.get("observation_start", ""),
+                ),
+            )
+
+    def observations(self, series_id, observation_start=""):
+        """
+        Returns the observations of a series from `observation_start`
+            (the same for every request).
+        """
+        today = time.strftime("%Y-%m-%d")
+        generator = random.Random(zlib.crc32(series_id.encode("utf-8")))
+        level = generator.uniform(1, 100)
+        observations = []
+        for month in range(self.months):
+            level *= 1 + generator.gauss(0, 0.01)
+            date = f"{2000 + month // 12}-{month % 12 + 1:02d}-01"
+            if date < observation_start:
+                continue
+            value = level
+            if month >= self.months - REVISED_MONTHS:
+                value *= 1 + 0.01 * self.vintage
+            observations.append(
+                {
+                    "realtime_start": today,
+                    "realtime_end": today,
+                    "date": date,
+                    "value": "." if month % 97 == 96 else f"{value:.2f}",
+                }
+            )
+        return {"count": len(observations), "observations": observations}
+
+    def log_message(self, format, *args):  # pylint: disable=redefined-builtin
+        """
+        Only log the failed requests.
+        """
+        if args and str(args[1]) != "200":
+            super().log_message(format, *args)
+
+
+def main():
+    """
+    Start the stand-in server.
+    """
+    parser = argparse.ArgumentParser(description="Stand-in FRED API server.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8766)
+    parser.add_argument(
+        "--rate", type=float, default=2.0, help="requests per second per key"
+    )
+    parser.add_argument(
+        "--fail", type=float, default=0.0, help="share of requests failing"
+    )
+    parser.add_argument(
+        "--latency", type=float, default=0.05, help="seconds per request"
+    )
+    parser.add_argument(
+        "--months", type=int, default=300, help="observations per series"
+    )
+    parser.add_argument(
+        "--vintage",
+        type=int,
+        default=0,
+        help="revisions of the last observations",
+    )
+    args = parser.parse_args()
+    FredRequestHandler.rate = args.rate
+    FredRequestHandler.fail = args.fail
+    FredRequestHandler.latency = args.latency
+    FredRequestHandler.months = args.months
+    FredRequestHandler.vintage = args.vintage
+    server = ThreadingHTTPServer((args.host, args.port), FredRequestHandler)
+    print(
+        f"Serving the stand-in FRED API on http://{args.host}:{args.port}/fred"
+    )
+    server.serve_forever()
+
+
+if __name__ == "__main__":
+    main()
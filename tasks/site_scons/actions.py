@@ -8,8 +8,15 @@ This file contains all the build actions that can be used
 import os
 import subprocess
 import json
+import shutil
+import hashlib
 from pathlib import Path
-from helpers import create_log_file_path, parse_args
+from helpers import (
+    CACHE_DIR,
+    create_log_file_path,
+    create_target_log_file_path,
+    parse_args,
+)
 from custom_warnings import (
     no_symlink_permission,
     no_pdf_compiler,
@@ -17,6 +24,16 @@ from custom_warnings import (
     no_build_warning,
 )
 from helpers import calculate_md5, create_md5_file_path
+from worker_pool import get_pool
+from build_history import run_command
+from resources import thread_environment
+from dynare_cache import restore_preprocessed, store_preprocessed
+
+PYTHON_WORKER_MODULES = ["numpy", "pandas", "plotly.graph_objects", "plotly.io"]
+"""Modules imported by the Python worker before forking (`PYTHON_WORKER_MODULES`)."""
+
+MATLAB_COMMAND = ["matlab", "-nodesktop", "-nosplash"]
+"""Command to start MATLAB (`MATLAB_COMMAND` for the MATLAB worker)."""
 
 
 def copy_file_with_metadata(src, dst):
@@ -104,6 +121,10 @@ def stata_build_action(target, source, env, *_, **__):
     This function is used to execute the first Stata file in the source.
     Any print statements in the source files will be redirected to a log file
     with the same name as the source file, but with a `.log` extension.
+
+    By default, the do file is sent to a persistent Stata worker
+    (one per job slot), so Stata is only initialized once per build.
+    Set `STATA_WORKER` to False to start a new Stata session for each do file.
     """
     # directly mark a build as successful (helpful when skipping a build)
     if env.get("SUCCESS", False):
@@ -121,14 +142,29 @@ def stata_build_action(target, source, env, *_, **__):
     os.environ["STATA_CONFIG_PATH"] = os.path.abspath(
         "common/code/stata_config.py"
     )
-    with open(log_file_path, "w", encoding="utf-8") as log_file:
-        runner = subprocess.run(
-            ["python", run_stata_path, filename] + parse_args(env, True),
-            cwd=dir_name,
-            stdout=log_file,
-            stderr=log_file,
-            check=True,
+    if env.get("STATA_WORKER", True):
+        # run the do file in a persistent Stata session (one per job slot)
+        open(log_file_path, "w", encoding="utf-8").close()
+        pool = get_thread_pool(
+            env, "stata", ["python", run_stata_path, "--worker"]
+        )
+        returncode = pool.run(
+            cwd=os.path.abspath(dir_name),
+            log_file=os.path.abspath(log_file_path),
+            script=filename,
+            args=parse_args(env, True),
         )
+    else:
+        with open(log_file_path, "w", encoding="utf-8") as log_file:
+            runner = run_command(
+                ["python", run_stata_path, filename] + parse_args(env, True),
+                cwd=dir_name,
+                stdout=log_file,
+                stderr=log_file,
+                check=True,
+                env=thread_environment(env),
+            )
+        returncode = runner.returncode
     # scan the log file for errors
     with open(log_file_path, "r", encoding="utf-8") as log_file:
         log = log_file.read()
@@ -139,14 +175,20 @@ def stata_build_action(target, source, env, *_, **__):
         md5_status = store_md5_action(target=target, source=source, env=env)
         if md5_status != 0:
             return md5_status
-    return runner.returncode
+    return returncode
 
 
-def generic_build_action(target, source, env, program, ext, *_, **__):
+def generic_build_action(
+    target, source, env, program, ext, options=None, *_, **__
+):
     """
     This function is used to execute the first `program` file in the source.
+    `options` are passed to `program` before the file name.
     Any print statements in the source files will be redirected to a log file
     with the same name as the source file, but with a `.log` extension.
+
+    If a persistent worker is enabled for `program` (see `get_worker_command`),
+    the file is sent to the worker instead of starting a new process.
     """
     # directly mark a build as successful (helpful when skipping a build)
     if env.get("SUCCESS", False):
@@ -157,20 +199,87 @@ def generic_build_action(target, source, env, program, ext, *_, **__):
     # get directory and filename
     dir_name, filename = os.path.split(str(source[0]))
     log_file_path = create_log_file_path(env, source, ext)
-    with open(log_file_path, "w", encoding="utf-8") as log_file:
-        runner = subprocess.run(
-            [program, filename] + parse_args(env),
-            cwd=dir_name,
-            stdout=log_file,
-            stderr=log_file,
-            check=True,
+    command = [program] + (options or []) + [filename] + parse_args(env)
+    worker_command = get_worker_command(env, program)
+    if worker_command:
+        # run the script on a persistent worker (one per job slot)
+        open(log_file_path, "w", encoding="utf-8").close()
+        returncode = get_thread_pool(env, program, worker_command).run(
+            cwd=os.path.abspath(dir_name),
+            log_file=os.path.abspath(log_file_path),
+            script=filename,
+            args=parse_args(env),
         )
+        if returncode != 0:
+            # fail the same way as `subprocess.run(..., check=True)`
+            raise subprocess.CalledProcessError(returncode, command)
+    else:
+        with open(log_file_path, "w", encoding="utf-8") as log_file:
+            runner = run_command(
+                command,
+                cwd=dir_name,
+                stdout=log_file,
+                stderr=log_file,
+                check=True,
+                env=thread_environment(env),
+            )
+        returncode = runner.returncode
     # check MD5 hash if STORE_MD5 is True
     if env.get("STORE_MD5", False):
         md5_status = store_md5_action(target=target, source=source, env=env)
         if md5_status != 0:
             return md5_status
-    return runner.returncode
+    return returncode
+
+
+def get_worker_command(env, program):
+    """
+    This function returns the command to start a persistent worker for `program`,
+        or None if the worker is not enabled (or not supported on this platform).
+    """
+    if program == "python" and env.get("PYTHON_WORKER", False):
+        # forking is not available on Windows
+        if not hasattr(os, "fork"):
+            return None
+        modules = env.get("PYTHON_WORKER_MODULES", PYTHON_WORKER_MODULES)
+        return [
+            "python",
+            os.path.abspath("site_scons/python_worker.py"),
+        ] + list(modules)
+    if program == "julia" and env.get("JULIA_WORKER", False):
+        return (
+            ["julia"]
+            + julia_sysimage_options(env)
+            + [os.path.abspath("site_scons/julia_worker.jl")]
+        )
+    return None
+
+
+def get_thread_pool(env, name, command):
+    """
+    This function returns the worker pool `name` for the thread budget of the target.
+    Workers keep the threads they start with (e.g., BLAS is set up when numpy is imported),
+        so each thread budget has its own pool, but the pools of `name` share
+        the job slots, so there are at most as many workers as jobs.
+    """
+    worker_env = thread_environment(env)
+    if worker_env is None:
+        return get_pool(name, command, group=name)
+    threads = worker_env["OMP_NUM_THREADS"]
+    return get_pool(
+        f"{name} ({threads} threads)", command, env=worker_env, group=name
+    )
+
+
+def julia_sysimage_options(env):
+    """
+    This function returns the `--sysimage` option for Julia
+        if a sysimage was set by `env.JuliaSysimage` and it has been built.
+    """
+    sysimage = env.get("JULIA_SYSIMAGE", "")
+    if sysimage and os.path.exists(sysimage):
+        return [f"--sysimage={sysimage}"]
+    return []
 
 
 def python_build_action(target, source, env):
@@ -189,12 +298,103 @@ def julia_build_action(target, source, env):
     This function is used to execute the first Julia file in the source.
     Any print statements in the source files will be redirected to a log file
     with the same name as the source file, but with a `.log` extension.
+    If a custom sysimage exists (see `env.JuliaSysimage`), Julia starts with it.
     """
     return generic_build_action(
-        target=target, source=source, env=env, program="julia", ext="jl"
+        target=target,
+        source=source,
+        env=env,
+        program="julia",
+        ext="jl",
+        options=julia_sysimage_options(env),
     )
 
 
+def read_julia_packages(project_file):
+    """
+    This function returns the package names in the `[deps]` section
+        of a Julia `Project.toml` file.
+    """
+    packages = []
+    in_deps = False
+    with open(project_file, "r", encoding="utf-8") as f:
+        for line in f:
+            line = line.strip()
+            if line.startswith("["):
+                in_deps = line == "[deps]"
+            elif in_deps and "=" in line:
+                packages.append(line.split("=")[0].strip())
+    return packages
+
+
+def julia_sysimage_build_action(target, source, env):
+    """
+    This function is used to build a Julia sysimage with PackageCompiler.
+    The first source must be the `Project.toml` of the Julia project;
+        the other sources (e.g., `Manifest.toml`) are part of the cache key.
+    The packages in the sysimage are given by `PACKAGES`
+        (default: all the packages in `Project.toml`).
+    Sysimages are cached in `.scons_cache/julia_sysimage`,
+        keyed on the hash of the sources, the packages, and the Julia version,
+        so switching back to a previous `Manifest.toml` does not rebuild the sysimage.
+    """
+    # directly mark a build as successful (helpful when skipping a build)
+    if env.get("SUCCESS", False):
+        no_build_warning(
+            f"JuliaSysimage action for {source[0]} skipped; targets: {[str(t) for t in target]}."
+        )
+        return 0
+    project_file = os.path.abspath(str(source[0]))
+    packages = env.get("PACKAGES", []) or read_julia_packages(project_file)
+    sysimage = os.path.abspath(str(target[0]))
+    log_file_path = create_target_log_file_path(env, target)
+    with open(log_file_path, "w", encoding="utf-8") as log_file:
+        version = subprocess.run(
+            ["julia", "--version"],
+            stdout=subprocess.PIPE,
+            stderr=log_file,
+            text=True,
+            check=True,
+        ).stdout.strip()
+        # compute the cache key
+        key = hashlib.sha256(version.encode("utf-8"))
+        key.update(" ".join(sorted(packages)).encode("utf-8"))
+        for file in source:
+            with open(str(file), "rb") as f:
+                key.update(f.read())
+        cache_dir = os.path.join(CACHE_DIR, "julia_sysimage")
+        cached = os.path.join(
+            cache_dir, key.hexdigest() + os.path.splitext(sysimage)[1]
+        )
+        if os.path.exists(cached):
+            print(f"Using the cached sysimage {cached}.", file=log_file)
+        else:
+            os.makedirs(cache_dir, exist_ok=True)
+            symbols = ", ".join(f":{package}" for package in packages)
+            script = (
+                "using PackageCompiler; "
+                f"create_sysimage(Symbol[{symbols}]; "
+                f"sysimage_path={json.dumps(os.path.abspath(cached) + '.tmp')})"
+            )
+            log_file.flush()
+            run_command(
+                [
+                    "julia",
+                    f"--project={os.path.dirname(project_file)}",
+                    "-e",
+                    script,
+                ],
+                stdout=log_file,
+                stderr=log_file,
+                check=True,
+            )
+            os.replace(cached + ".tmp", cached)
+    # replace the sysimage atomically, since Julia targets may be starting with it
+    shutil.copyfile(cached, sysimage + ".tmp")
+    os.replace(sysimage + ".tmp", sysimage)
+    return 0
+
+
 def dynare_build_action(target, source, env):
     """
     This function is used to execute the first Dynare file in the source.
@@ -215,6 +415,9 @@ def matlab_build_action(target, source, env, dynare=False):
 
     **NOTE**: Matlab scripts do not take arguments,
     so the arguments are passed as a environmental variable named `ARGS`.
+
+    If `MATLAB_WORKER` is True, the file runs in a resident MATLAB session
+    (one per job slot) with a cleared workspace, instead of starting MATLAB.
     """
     # directly mark a build as successful (helpful when skipping a build)
     if env.get("SUCCESS", False):
@@ -225,7 +428,8 @@ def matlab_build_action(target, source, env, dynare=False):
     # parse arguments as environmental variables,
     # because matlab scripts do not take arguments
     arguments = parse_args(env)
-    env_vars = {**os.environ}  # prevent modifying the original environment
+    # prevent modifying the original environment
+    env_vars = thread_environment(env) or {**os.environ}
     if arguments:
         env_vars["ARGS"] = f"{arguments}"
     # get directory and filename
@@ -234,26 +438,60 @@ def matlab_build_action(target, source, env, dynare=False):
         log_file_path = create_log_file_path(env, source, "mod")
     else:
         log_file_path = create_log_file_path(env, source, "m")
+    # check if the Dynare preprocessor output is cached
+    preprocessed = False
+    if dynare and env.get("DYNARE_CACHE", False):
+        preprocessed = restore_preprocessed(env, str(source[0]))
     # check if Dynare is used
-    if dynare:
+    if preprocessed:
+        # skip the preprocessor and run the cached driver
+        statement = f"dynare_config; {os.path.splitext(filename)[0]}.driver"
+        executor = f"try, {statement}, catch error, disp(getReport(error,'extended')), exit(1), end, exit(0);"
+    elif dynare:
+        statement = f"dynare {filename}"
         executor = f"try, dynare {filename}, catch error, disp(getReport(error,'extended')), exit(1), end, exit(0);"
     else:
+        statement = f"run('{filename}')"
         executor = f"try, run('{filename}'), catch ERROR, display(ERROR), exit(1), end, exit(0);"
-    with open(log_file_path, "w", encoding="utf-8") as log_file:
-        runner = subprocess.run(
-            ["matlab", "-nodesktop", "-nosplash", "-r", executor],
-            cwd=dir_name,
-            stdout=log_file,
-            stderr=log_file,
-            check=True,
-            env=env_vars,
+    if env.get("MATLAB_WORKER", False):
+        # run the file in a resident MATLAB session (one per job slot)
+        open(log_file_path, "w", encoding="utf-8").close()
+        pool = get_thread_pool(
+            env,
+            "matlab",
+            ["python", os.path.abspath("site_scons/matlab_worker.py")]
+            + env.get("MATLAB_COMMAND", MATLAB_COMMAND),
         )
+        returncode = pool.run(
+            cwd=os.path.abspath(dir_name),
+            log_file=os.path.abspath(log_file_path),
+            script=statement,
+            # ARGS is only set when there are arguments, like without the worker
+            args=[f"{arguments}"] if arguments else [],
+        )
+        if returncode != 0:
+            # fail the same way as `subprocess.run(..., check=True)`
+            raise subprocess.CalledProcessError(returncode, executor)
+    else:
+        with open(log_file_path, "w", encoding="utf-8") as log_file:
+            runner = run_command(
+                MATLAB_COMMAND + ["-r", executor],
+                cwd=dir_name,
+                stdout=log_file,
+                stderr=log_file,
+                check=True,
+                env=env_vars,
+            )
+        returncode = runner.returncode
+    # cache the Dynare preprocessor output
+    if dynare and env.get("DYNARE_CACHE", False) and not preprocessed:
+        store_preprocessed(env, str(source[0]))
     # check MD5 hash if STORE_MD5 is True
     if env.get("STORE_MD5", False):
         md5_status = store_md5_action(target=target, source=source, env=env)
         if md5_status != 0:
             return md5_status
-    return runner.returncode
+    return returncode
 
 
 def touch_target_action(target, source, env):
@@ -268,15 +506,12 @@ def touch_target_action(target, source, env):
 def check_pdf_compiler_action(env):
     """
     This function is used to check if the PDF compiler is available.
+    Returns 0 if it is available, otherwise 1.
+    The result is read from the tool probe (`env["TOOL_PROBE"]`),
+        so the compiler is not started for every PDF target.
     """
     pdf_compiler = env.get("PDF_COMPILER", "latexmk")
-    runner = subprocess.run(
-        [pdf_compiler, "--version"],
-        stdout=subprocess.DEVNULL,
-        stderr=subprocess.DEVNULL,
-        check=True,
-    )
-    return runner.returncode
+    return 0 if env["TOOL_PROBE"].available(pdf_compiler) else 1
 
 
 def pdf_build_action(target, source, env):
@@ -307,7 +542,7 @@ def pdf_build_action(target, source, env):
         log_file_path = create_log_file_path(env, source, "tex")
         # compile
         with open(log_file_path, "w", encoding="utf-8") as log_file:
-            runner = subprocess.run(
+            runner = run_command(
                 [pdf_compiler] + pdf_env.get("ARGS", []) + [filename],
                 cwd=dir_name,
                 stdout=log_file,
@@ -0,0 +1,142 @@
+"""
+Shih-Hsuan Hsu
+October 18, 2026
+Project-level artifact cache for the scripting and PDF builders.
+When the script, the sources, and the settings of a target are the same as in a
+    previous build (e.g., after switching git branches), the targets, log files,
+    and MD5 files are restored from the cache instead of running the action.
+Enable it with `ARTIFACT_CACHE=True`; opt out for a builder with `CACHE=False`.
+If `REMOTE_CACHE_URL` is set, targets missing from the local cache are pulled from
+    the shared cache, and new targets are pushed to it (unless `REMOTE_CACHE_PUSH=False`).
+"""
+
+import os
+import hashlib
+import functools
+from artifact_store import get_store, is_safe_path
+from helpers import CACHE_DIR, parse_size
+
+CACHEABLE_BUILDERS = ["Python", "Stata", "Julia", "Matlab", "Dynare", "PDF"]
+"""Builders whose actions can be cached."""
+
+CACHE_KEY_VARIABLES = [
+    "ARGS",
+    "LOG_FILE",
+    "LOG_DIR",
+    "STORE_MD5",
+    "MD5_FILE",
+    "MD5_DIR",
+    "PDF_COMPILER",
+    "DYNARE_VERSION",
+]
+"""Environment variables that change the targets of an action."""
+
+ARTIFACT_CACHE_SIZE = "10GB"
+"""Default size limit of the artifact cache (`ARTIFACT_CACHE_SIZE`)."""
+
+
+def get_artifact_store(env):
+    """
+    Returns the artifact store for the build actions.
+    """
+    return get_store(
+        "Artifact cache",
+        env.get("ARTIFACT_CACHE_DIR", os.path.join(CACHE_DIR, "artifacts")),
+        parse_size(env.get("ARTIFACT_CACHE_SIZE", ARTIFACT_CACHE_SIZE)),
+    )
+
+
+def artifact_cache_key(target, source, env, builder_name, action_contents):
+    """
+    Returns the cache key of an action,
+        based on the builder (and its code), the target paths,
+        the content signatures of all its dependencies (sources, `env.Depends`,
+        and implicit dependencies), and the settings in `CACHE_KEY_VARIABLES`.
+    """
+    top_dir = env.Dir("#").abspath
+    key = hashlib.sha256(builder_name.encode("utf-8"))
+    key.update(bytes(action_contents))
+    for t in target:
+        key.update(os.path.relpath(t.abspath, top_dir).encode("utf-8"))
+    # the children of the executor are the sources, the explicit dependencies
+    #   (of any target of the action), and the scanned implicit dependencies
+    children = target[0].get_executor().get_all_children()
+    for child in sorted(set(children), key=str):
+        key.update(str(child).encode("utf-8"))
+        key.update(child.get_csig().encode("utf-8"))
+    for variable in CACHE_KEY_VARIABLES:
+        key.update(f"{variable}={env.get(variable, None)!r}".encode("utf-8"))
+    return key.hexdigest()
+
+
+def use_artifact_cache(env):
+    """
+    Returns True if the artifact cache is enabled for the action.
+    """
+    return (
+        env.get("ARTIFACT_CACHE", False)
+        and env.get("CACHE", True)
+        # SUCCESS = True does not create the targets
+        and not env.get("SUCCESS", False)
+    )
+
+
+def cache_action(action_function, builder_name, action_contents):
+    """
+    Wrap a build action so that its targets are restored from (or stored in)
+        the artifact cache.
+    """
+
+    @functools.wraps(action_function)
+    def cached_action_function(target, source, env):
+        if not use_artifact_cache(env):
+            return action_function(target=target, source=source, env=env)
+        store = get_artifact_store(env)
+        top_dir = env.Dir("#").abspath
+        key = artifact_cache_key(
+            target, source, env, builder_name, action_contents
+        )
+        # the entry may only restore the targets of this action
+        allowed_paths = {os.path.relpath(t.abspath, top_dir) for t in target}
+        if not all(is_safe_path(path) for path in allowed_paths):
+            # targets outside the project are not cached
+            return action_function(target=target, source=source, env=env)
+        remote = None
+        if env.get("REMOTE_CACHE_URL", ""):
+            # deferred: urllib is slow to import and rarely needed
+            from remote_cache import get_remote_cache
+
+            remote = get_remote_cache(env)
+        if store.get(key, top_dir, allowed_paths) or (
+            # try the shared cache if the target is not in the local cache
+            remote is not None
+            and remote.pull(key, store, allowed_paths)
+            and store.get(key, top_dir, allowed_paths)
+        ):
+            print(
+                f"Restored {[str(t) for t in target]} from the artifact cache."
+            )
+            return 0
+        status = action_function(target=target, source=source, env=env)
+        # only cache successful builds that created all the targets
+        paths = [t.abspath for t in target]
+        if not status and all(os.path.isfile(path) for path in paths):
+            store.put(
+                key,
+                {os.path.relpath(path, top_dir): path for path in paths},
+                {"builder": builder_name, "source": str(source[0])},
+            )
+            if remote is not None and env.get("REMOTE_CACHE_PUSH", True):
+                remote.push(key, store)
+        return status
+
+    return cached_action_function
+
+
+def print_cache_report(target, source, env):
+    """
+    Print a report of the artifact cache (the action of `scons cache-stats`).
+    """
+    store = get_artifact_store(env)
+    print(store.report())
+    return 0
@@ -0,0 +1,317 @@
+"""
+Shih-Hsuan Hsu
+October 18, 2026
+A local content-addressed store for build artifacts.
+Each entry is a set of files stored under a key (e.g., a hash of the inputs).
+The least recently used entries are evicted when the store exceeds its size limit.
+
+Layout:
+    <root>/<key[:2]>/<key>/manifest.json  (relative path, sha256, and size of each file)
+    <root>/<key[:2]>/<key>/<sha256>       (file contents)
+Entries are published and removed by renaming their directory, so an entry is never
+    seen half-written or half-deleted; a restore that loses the race with an eviction
+    (under `-j`) is a miss.
+"""
+
+import os
+import re
+import json
+import shutil
+import hashlib
+import threading
+from datetime import datetime
+
+STORES = {}
+"""Store the artifact stores that have been opened, keyed by name."""
+
+_STORES_LOCK = threading.Lock()
+
+SHA256_PATTERN = re.compile(r"^[0-9a-f]{64}$")
+"""Valid file hashes in a manifest."""
+
+
+def hash_file(path):
+    """
+    Returns the SHA-256 hash of a file.
+    """
+    sha256 = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            sha256.update(chunk)
+    return sha256.hexdigest()
+
+
+def is_safe_path(path):
+    """
+    Returns True if `path` is a relative path that stays inside its base directory.
+    """
+    return (
+        isinstance(path, str)
+        and path != ""
+        and not os.path.isabs(path)
+        and not os.path.splitdrive(path)[0]
+        and ".." not in re.split(r"[\\/]", path)
+    )
+
+
+def check_manifest(manifest, allowed_paths=None):
+    """
+    Raise ValueError if a manifest could write outside its destination,
+        or restores other files than `allowed_paths` (a set of relative paths).
+    """
+    try:
+        files = manifest["files"]
+        paths = {item["path"] for item in files}
+        hashes = [item["sha256"] for item in files]
+    except (KeyError, TypeError) as e:
+        raise ValueError(f"Invalid manifest ({e}).") from e
+    for path in paths:
+        if not is_safe_path(path):
+            raise ValueError(f"Unsafe path in manifest: {path!r}")
+    for sha256 in hashes:
+        if not isinstance(sha256, str) or not SHA256_PATTERN.match(sha256):
+            raise ValueError(f"Invalid hash in manifest: {sha256!r}")
+    if allowed_paths is not None and paths != set(allowed_paths):
+        raise ValueError(
+            f"Manifest restores {sorted(paths)}, expected {sorted(allowed_paths)}."
+        )
+
+
+class ArtifactStore:
+    """
+    A content-addressed store with LRU eviction.
+    """
+
+    def __init__(self, name, root, max_bytes):
+        self.name = name
+        self.root = root
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self.stored = 0
+        self.evicted = 0
+        self.lock = threading.Lock()
+
+    def entry_dir(self, key):
+        """
+        Returns the directory of an entry.
+        """
+        return os.path.join(self.root, key[:2], key)
+
+    def manifest(self, key):
+        """
+        Returns the manifest of an entry, or None if the entry does not exist.
+        """
+        try:
+            with open(
+                os.path.join(self.entry_dir(key), "manifest.json"),
+                "r",
+                encoding="utf-8",
+            ) as f:
+                return json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            return None
+
+    def get(self, key, dest_dir, allowed_paths=None):
+        """
+        Restore the files of an entry into `dest_dir`.
+        Only entries restoring exactly `allowed_paths` (relative paths) are restored.
+        Returns True on a hit and False on a miss.
+        """
+        manifest = self.manifest(key)
+        if manifest is not None:
+            try:
+                check_manifest(manifest, allowed_paths)
+            except ValueError as e:
+                print(f"Ignoring artifact cache entry {key}: {e}")
+                manifest = None
+        if manifest is None:
+            with self.lock:
+                self.misses += 1
+            return False
+        entry_dir = self.entry_dir(key)
+        tmp_path = None
+        try:
+            for item in manifest["files"]:
+                path = os.path.join(dest_dir, item["path"])
+                os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+                # replace (not overwrite) the file, so symlinks are not followed
+                tmp_path = f"{path}.tmp{threading.get_ident()}"
+                shutil.copyfile(
+                    os.path.join(entry_dir, item["sha256"]), tmp_path
+                )
+                os.replace(tmp_path, path)
+            # mark the entry as recently used
+            os.utime(os.path.join(entry_dir, "manifest.json"))
+        except OSError:
+            # the entry was evicted or replaced while it was restored
+            if tmp_path is not None and os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            with self.lock:
+                self.misses += 1
+            return False
+        with self.lock:
+            self.hits += 1
+        return True
+
+    def put(self, key, files, metadata=None):
+        """
+        Store the files under the key.
+        `files` maps the relative path (used when restoring) to the file to store.
+        """
+        entry_dir = self.entry_dir(key)
+        tmp_dir = f"{entry_dir}.tmp{threading.get_ident()}"
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+        os.makedirs(tmp_dir)
+        manifest = {"files": [], "metadata": metadata or {}}
+        for rel_path, path in files.items():
+            sha256 = hash_file(path)
+            shutil.copyfile(path, os.path.join(tmp_dir, sha256))
+            manifest["files"].append(
+                {
+                    "path": rel_path,
+                    "sha256": sha256,
+                    "size": os.path.getsize(path),
+                }
+            )
+        with open(
+            os.path.join(tmp_dir, "manifest.json"), "w", encoding="utf-8"
+        ) as f:
+            json.dump(manifest, f, indent=4)
+        # publish the entry atomically (moving the previous one out of the way first)
+        self.remove(key)
+        try:
+            os.replace(tmp_dir, entry_dir)
+        except OSError:
+            # another job published the same entry in the meantime
+            shutil.rmtree(tmp_dir, ignore_errors=True)
+        with self.lock:
+            self.stored += 1
+        self.evict()
+
+    def remove(self, key):
+        """
+        Remove an entry: it is renamed first, so it disappears at once
+            instead of file by file.
+        """
+        entry_dir = self.entry_dir(key)
+        removed_dir = f"{entry_dir}.removed{threading.get_ident()}"
+        shutil.rmtree(removed_dir, ignore_errors=True)
+        try:
+            os.replace(entry_dir, removed_dir)
+        except OSError:
+            return  # already removed
+        shutil.rmtree(removed_dir, ignore_errors=True)
+
+    def entries(self):
+        """
+        Returns a list of (last used time, size, key) of all entries.
+        """
+        entries = []
+        if not os.path.isdir(self.root):
+            return entries
+        for prefix in os.listdir(self.root):
+            prefix_dir = os.path.join(self.root, prefix)
+            if not os.path.isdir(prefix_dir):
+                continue
+            for key in os.listdir(prefix_dir):
+                if "." in key:
+                    continue  # being written or removed
+                manifest_path = os.path.join(prefix_dir, key, "manifest.json")
+                try:
+                    size = sum(
+                        entry.stat().st_size
+                        for entry in os.scandir(os.path.join(prefix_dir, key))
+                    )
+                    entries.append((os.path.getmtime(manifest_path), size, key))
+                except OSError:
+                    continue  # incomplete or removed entry
+        return entries
+
+    def evict(self):
+        """
+        Remove the least recently used entries until the store fits its size limit.
+        """
+        with self.lock:
+            entries = sorted(self.entries())
+            total = sum(size for _, size, _ in entries)
+            for _, size, key in entries:
+                if total <= self.max_bytes:
+                    break
+                self.remove(key)
+                total -= size
+                self.evicted += 1
+
+    def stats_file(self):
+        """
+        Returns the path to the file storing the statistics of all builds.
+        """
+        return os.path.join(self.root, "stats.json")
+
+    def load_stats(self):
+        """
+        Returns the statistics of all previous builds.
+        """
+        try:
+            with open(self.stats_file(), "r", encoding="utf-8") as f:
+                return json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            return {"hits": 0, "misses": 0, "stored": 0, "evicted": 0}
+
+    def save_stats(self):
+        """
+        Add the statistics of this build to the statistics of all builds.
+        """
+        stats = self.load_stats()
+        for name in stats:
+            stats[name] += getattr(self, name)
+        os.makedirs(self.root, exist_ok=True)
+        with open(self.stats_file(), "w", encoding="utf-8") as f:
+            json.dump(stats, f, indent=4)
+
+    def report(self):
+        """
+        Returns a report of the contents and the statistics of all builds.
+        """
+        entries = sorted(self.entries())
+        size = sum(size for _, size, _ in entries)
+        stats = self.load_stats()
+        lookups = stats["hits"] + stats["misses"]
+        hit_rate = stats["hits"] / lookups if lookups else 0
+        lines = [
+            f"{self.name} ({self.root})",
+            f"\tentries: {len(entries)}",
+            f"\tsize: {size / 1e6:.1f} MB / {self.max_bytes / 1e6:.1f} MB",
+            f"\thits: {stats['hits']}, misses: {stats['misses']} (hit rate {hit_rate:.0%})",
+            f"\tstored: {stats['stored']}, evicted: {stats['evicted']}",
+        ]
+        if entries:
+            oldest = datetime.fromtimestamp(entries[0][0])
+            newest = datetime.fromtimestamp(entries[-1][0])
+            lines.append(
+                f"\tleast recently used: {oldest:%Y-%m-%d %H:%M}, "
+                f"most recently used: {newest:%Y-%m-%d %H:%M}"
+            )
+        return "\n".join(lines)
+
+    def summary(self):
+        """
+        Returns a one-line summary of the cache statistics.
+        """
+        entries = self.entries()
+        size = sum(size for _, size, _ in entries)
+        return (
+            f"{self.name}: {self.hits} hit(s), {self.misses} miss(es), "
+            f"{self.stored} stored, {self.evicted} evicted; "
+            f"{len(entries)} entries, {size / 1e6:.1f} MB / {self.max_bytes / 1e6:.1f} MB"
+        )
+
+
+def get_store(name, root, max_bytes):
+    """
+    Returns the artifact store `name`, opening it on first use.
+    """
+    with _STORES_LOCK:
+        if name not in STORES:
+            STORES[name] = ArtifactStore(name, root, max_bytes)
+        return STORES[name]
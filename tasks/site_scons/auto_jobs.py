@@ -0,0 +1,227 @@
+"""
+Shih-Hsuan Hsu
+October 18, 2026
+Adapt the number of running actions to the load of a shared machine (`AUTO_JOBS=1`).
+SCons starts `AUTO_JOBS_MAX` job slots (default: twice the CPUs, or `-j N`),
+    but only lets scripting actions run while the CPUs they use fit in the current limit,
+    which starts at the number of CPUs (`MACHINE_CPUS`, shared with `resources.py`).
+An action uses its declared `CPUS=` (at most the limit, so that it can run alone),
+    or one CPU if it declares none.
+Every `AUTO_JOBS_INTERVAL` seconds, the limit is lowered when the machine swaps,
+    runs low on available memory, or is overloaded (load average above the CPUs),
+    and raised when CPUs are idle and actions are waiting
+    (at most once every `RAISE_EVERY` samples, so that the load average catches up).
+Running actions are never stopped: a lower limit only delays the next actions.
+Every change of the limit is printed at exit.
+"""
+
+import os
+import time
+import threading
+import functools
+from helpers import format_duration, format_size
+from custom_warnings import auto_jobs_warning
+
+AUTO_JOBS_INTERVAL = 5
+"""Seconds between two samples of the load of the machine (`AUTO_JOBS_INTERVAL`)."""
+
+MIN_AVAILABLE_MEMORY = 0.1
+"""The limit is lowered when less than this share of the memory is available..."""
+
+MAX_SWAP_RATE = 100
+"""...or when more than this many pages per second are swapped in or out."""
+
+RAISE_EVERY = 6
+"""Samples between two raises of the limit, since the load average lags
+    (the 1-minute average takes about a minute to show new actions)."""
+
+CONTROLLER = None
+"""Job controller of this build (None unless `AUTO_JOBS=1`)."""
+
+
+def available_memory():
+    """
+    Returns (available, total) memory in bytes (None if unknown, e.g., not on Linux).
+    """
+    try:
+        with open("/proc/meminfo") as f:
+            info = {
+                line.split(":")[0]: int(line.split()[1]) * 1024 for line in f
+            }
+        return info["MemAvailable"], info["MemTotal"]
+    except (OSError, KeyError, ValueError, IndexError):
+        return None
+
+
+def swapped_pages():
+    """
+    Returns the number of pages swapped in and out since boot (None if unknown).
+    """
+    try:
+        with open("/proc/vmstat") as f:
+            stats = dict(line.split() for line in f)
+        return int(stats["pswpin"]) + int(stats["pswpout"])
+    except (OSError, KeyError, ValueError):
+        return None
+
+
+class JobController:
+    """
+    Admit actions while the CPUs they use fit in `limit`,
+        and adjust `limit` to the load of the machine in a daemon thread.
+    """
+
+    def __init__(self, cpus, max_jobs, interval=AUTO_JOBS_INTERVAL):
+        self.cpus = cpus
+        self.max_jobs = max_jobs
+        self.limit = min(cpus, max_jobs)
+        self.interval = interval
+        self.running = 0
+        """CPUs used by the running actions."""
+        self.waiting = 0
+        self.waited = 0.0
+        """Total time (in seconds) actions waited for the limit."""
+        self.start = time.time()
+        self.decisions = []
+        """Changes of the limit: (seconds since the start, old, new, reason)."""
+        self.last_pages = None
+        """Pages swapped since boot at the previous sample."""
+        self.since_change = 0
+        """Samples since the last change of the limit."""
+        self.condition = threading.Condition()
+        self.thread = threading.Thread(
+            target=self.run, name="auto jobs", daemon=True
+        )
+
+    def acquire(self, cpus=1):
+        """
+        Wait until `cpus` more CPUs fit in `limit` (at most `limit`),
+            and returns the CPUs charged to the action.
+        """
+        start = time.perf_counter()
+        with self.condition:
+            self.waiting += 1
+            while self.running + min(cpus, self.limit) > self.limit:
+                self.condition.wait()
+            charged = min(cpus, self.limit)
+            self.waiting -= 1
+            self.running += charged
+            self.waited += time.perf_counter() - start
+        return charged
+
+    def release(self, cpus=1):
+        """
+        Release the CPUs charged by `acquire` and let the next actions start.
+        """
+        with self.condition:
+            self.running -= cpus
+            self.condition.notify_all()
+
+    def decide(self, load, memory, swap_rate):
+        """
+        Returns (new limit, reason) given the load average, (available, total) memory,
+            and swapped pages per second (the limit is unchanged if the reason is None).
+        """
+        limit = self.limit
+        if swap_rate is not None and swap_rate > MAX_SWAP_RATE:
+            return max(limit // 2, 1), f"swapping {swap_rate:.0f} pages/s"
+        if memory is not None and memory[0] < memory[1] * MIN_AVAILABLE_MEMORY:
+            return max(limit - 1, 1), f"{format_size(memory[0])} available"
+        if load > self.cpus + 1:
+            return max(limit - 1, 1), f"load {load:.1f} on {self.cpus} CPUs"
+        if (
+            load < self.cpus - 0.5
+            and self.waiting
+            and limit < self.max_jobs
+            and self.since_change >= RAISE_EVERY
+        ):
+            return limit + 1, f"load {load:.1f} on {self.cpus} CPUs"
+        return limit, None
+
+    def sample(self):
+        """
+        Sample the load of the machine and adjust the limit.
+        """
+        pages = swapped_pages()
+        swap_rate = None
+        if pages is not None and self.last_pages is not None:
+            swap_rate = (pages - self.last_pages) / self.interval
+        self.last_pages = pages
+        limit, reason = self.decide(
+            os.getloadavg()[0], available_memory(), swap_rate
+        )
+        self.since_change += 1
+        if reason is None or limit == self.limit:
+            return
+        with self.condition:
+            self.since_change = 0
+            self.decisions.append(
+                (time.time() - self.start, self.limit, limit, reason)
+            )
+            self.limit = limit
+            self.condition.notify_all()
+
+    def run(self):
+        """
+        Sample the load of the machine every `interval` seconds.
+        """
+        self.last_pages = swapped_pages()
+        while True:
+            time.sleep(self.interval)
+            self.sample()
+
+    def summary(self):
+        """
+        Returns the lines of the summary of the limit changes.
+        """
+        lines = [
+            f"Auto jobs: {len(self.decisions)} change(s) of the limit "
+            f"(started at {min(self.cpus, self.max_jobs)}, "
+            f"at most {self.max_jobs}), waited {format_duration(self.waited)}"
+        ]
+        for elapsed, old, new, reason in self.decisions:
+            lines.append(
+                f"\t{format_duration(elapsed):>9}  {old} -> {new} ({reason})"
+            )
+        return lines
+
+
+def start_auto_jobs(cpus, max_jobs, interval=AUTO_JOBS_INTERVAL):
+    """
+    Start adapting the number of running actions to the load of the machine
+        with `cpus` CPUs (`MACHINE_CPUS`).
+    Returns the job controller, or None if the load average is not available
+        (e.g., on Windows).
+    """
+    global CONTROLLER
+    if not hasattr(os, "getloadavg"):
+        auto_jobs_warning(
+            "AUTO_JOBS needs the load average, which is not available "
+            "on this platform; the build uses the fixed number of jobs."
+        )
+        return None
+    CONTROLLER = JobController(cpus, max_jobs, interval)
+    CONTROLLER.thread.start()
+    return CONTROLLER
+
+
+def auto_jobs_action(action_function, builder_name, action_contents):
+    """
+    Wrap a build action so that it waits until its CPUs fit in the limit (`AUTO_JOBS=1`).
+    """
+
+    @functools.wraps(action_function)
+    def limited_action_function(target, source, env):
+        # deferred: resources imports this module
+        from resources import declared_resources
+
+        controller = CONTROLLER
+        if controller is None:
+            return action_function(target=target, source=source, env=env)
+        charged = controller.acquire(declared_resources(env)[0])
+        try:
+            return action_function(target=target, source=source, env=env)
+        finally:
+            controller.release(charged)
+
+    return limited_action_function
@@ -0,0 +1,156 @@
+"""
+Shih-Hsuan Hsu
+October 18, 2026
+Benchmark the SConscript cache (`SCONSCRIPT_CACHE`) on a synthetic project.
+Creates a project with N tasks (each task links the output of the previous task
+    and runs a Python script), builds it once, and then times no-op builds
+    with and without the SConscript cache.
+Run it from the tasks directory:
+    python site_scons/benchmarks/sconscript_cache_benchmark.py --tasks 500
+"""
+
+import os
+import re
+import time
+import shutil
+import argparse
+import tempfile
+import statistics
+import subprocess
+
+SCONSCRIPT = """Import("env")
+
+env.Link(
+    target=["input/previous.txt"],
+    source=["#/{previous}/output/result.txt"],
+)
+env.Python(
+    target=["output/result.txt"],
+    source=["code/run.py", "input/previous.txt"],
+    ARGS=["{task}"],
+)
+"""
+"""SConscript file of each task (except the first task)."""
+
+FIRST_SCONSCRIPT = """Import("env")
+
+env.Python(
+    target=["output/result.txt"],
+    source=["code/run.py"],
+    ARGS=["{task}"],
+)
+"""
+"""SConscript file of the first task."""
+
+SCRIPT = """import sys
+
+with open("../output/result.txt", "w", encoding="utf-8") as f:
+    f.write(sys.argv[1])
+"""
+"""Python script of each task."""
+
+
+def create_project(tasks_dir, project_dir, n_tasks):
+    """
+    Create a project with `n_tasks` tasks, using the SConstruct and site_scons
+        of `tasks_dir`.
+    """
+    shutil.copy(os.path.join(tasks_dir, "SConstruct"), project_dir)
+    ignore = shutil.ignore_patterns(
+        "benchmarks", "__pycache__", ".scons_cache", "input", "output", "logs"
+    )
+    for name in ["site_scons", "common"]:
+        shutil.copytree(
+            os.path.join(tasks_dir, name),
+            os.path.join(project_dir, name),
+            ignore=ignore,
+        )
+    for i in range(n_tasks):
+        task = f"task_{i:04d}"
+        os.makedirs(os.path.join(project_dir, task, "code"))
+        sconscript = SCONSCRIPT if i else FIRST_SCONSCRIPT
+        with open(
+            os.path.join(project_dir, task, "SConscript"), "w", encoding="utf-8"
+        ) as f:
+            f.write(sconscript.format(task=task, previous=f"task_{i - 1:04d}"))
+        with open(
+            os.path.join(project_dir, task, "code", "run.py"),
+            "w",
+            encoding="utf-8",
+        ) as f:
+            f.write(SCRIPT)
+
+
+def run_scons(project_dir, *args):
+    """
+    Run SCons in the project and return the wall time
+        and the time spent reading the SConscript files (in seconds).
+    """
+    start = time.perf_counter()
+    runner = subprocess.run(
+        ["scons", "-Q", "--startup-profile", *args],
+        cwd=project_dir,
+        capture_output=True,
+        text=True,
+    )
+    elapsed = time.perf_counter() - start
+    if runner.returncode != 0:
+        print(runner.stdout, runner.stderr)
+        raise RuntimeError(f"SCons failed in {project_dir}.")
+    match = re.search(r"([\d.]+) s\s+reading SConscript files", runner.stdout)
+    return elapsed, float(match.group(1)) if match else float("nan")
+
+
+def main():
+    """
+    Run the benchmark.
+    """
+    parser = argparse.ArgumentParser(
+        description="Benchmark the SConscript cache."
+    )
+    parser.add_argument(
+        "--tasks", type=int, default=500, help="number of tasks"
+    )
+    parser.add_argument("--repeat", type=int, default=5, help="timed builds")
+    parser.add_argument(
+        "--jobs",
+        type=int,
+        default=os.cpu_count() or 1,
+        help="jobs for the first build",
+    )
+    args = parser.parse_args()
+    tasks_dir = os.path.dirname(
+        os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    )
+    with tempfile.TemporaryDirectory() as project_dir:
+        print(f"Creating {args.tasks} tasks in {project_dir}...")
+        create_project(tasks_dir, project_dir, args.tasks)
+        print("Building the project...")
+        run_scons(project_dir, f"-j{args.jobs}")
+        results = {}
+        for label, options in [
+            ("without cache", []),
+            ("with cache", ["SCONSCRIPT_CACHE=1"]),
+        ]:
+            # the first build formats the files or records the SConscript files
+            run_scons(project_dir, *options)
+            runs = [
+                run_scons(project_dir, *options) for _ in range(args.repeat)
+            ]
+            times = [run[0] for run in runs]
+            results[label] = (
+                statistics.median(times),
+                statistics.median(run[1] for run in runs),
+            )
+            print(
+                f"No-op build {label}: median {results[label][0]:.2f} s "
+                f"(min {min(times):.2f} s, max {max(times):.2f} s), "
+                f"reading SConscript files: {results[label][1]:.2f} s"
+            )
+        for i, name in enumerate(["No-op build", "Reading SConscript files"]):
+            speedup = results["without cache"][i] / results["with cache"][i]
+            print(f"{name} speed-up: {speedup:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
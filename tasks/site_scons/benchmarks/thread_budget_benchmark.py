@@ -0,0 +1,174 @@
+"""
+Shih-Hsuan Hsu
+October 18, 2026
+Benchmark the thread budget of the scripts (`THREAD_BUDGET`) on a synthetic project.
+Creates a project with layers of linear-algebra tasks (each task multiplies and
+    inverts random matrices with numpy, and depends on two tasks of the previous layer),
+    and times full builds with `-j N` with and without the thread budget,
+    and with `-j 1` for reference.
+Run it from the tasks directory:
+    python site_scons/benchmarks/thread_budget_benchmark.py --layers 4 --width 8
+"""
+
+import os
+import time
+import shutil
+import argparse
+import tempfile
+import statistics
+import subprocess
+
+SCONSCRIPT = """Import("env")
+
+env.Python(
+    target=["output/result.txt"],
+    source=["code/run.py"] + {inputs},
+    ARGS=["{seed}", "{size}", "{repeat}"],
+    THREAD_BUDGET=ARGUMENTS.get("THREAD_BUDGET", "1") == "1",
+)
+"""
+"""SConscript file of each task."""
+
+SCRIPT = """import sys
+import numpy as np
+
+seed, size, repeat = map(int, sys.argv[1:])
+rng = np.random.default_rng(seed)
+total = 0.0
+for _ in range(repeat):
+    a = rng.standard_normal((size, size))
+    b = a @ a.T + size * np.eye(size)
+    total += np.linalg.inv(b).trace()
+with open("../output/result.txt", "w", encoding="utf-8") as f:
+    f.write(str(total))
+"""
+"""Python script of each task."""
+
+
+def create_project(tasks_dir, project_dir, layers, width, size, repeat):
+    """
+    Create a project with `layers` layers of `width` tasks, using the SConstruct
+        and site_scons of `tasks_dir`.
+    """
+    shutil.copy(os.path.join(tasks_dir, "SConstruct"), project_dir)
+    ignore = shutil.ignore_patterns(
+        "benchmarks", "__pycache__", ".scons_cache", "input", "output", "logs"
+    )
+    for name in ["site_scons", "common"]:
+        shutil.copytree(
+            os.path.join(tasks_dir, name),
+            os.path.join(project_dir, name),
+            ignore=ignore,
+        )
+    for layer in range(layers):
+        for i in range(width):
+            task = f"layer_{layer}_{i:02d}"
+            inputs = []
+            if layer:
+                inputs = [
+                    f"#/layer_{layer - 1}_{j % width:02d}/output/result.txt"
+                    for j in (i, i + 1)
+                ]
+            os.makedirs(os.path.join(project_dir, task, "code"))
+            with open(
+                os.path.join(project_dir, task, "SConscript"),
+                "w",
+                encoding="utf-8",
+            ) as f:
+                f.write(
+                    SCONSCRIPT.format(
+                        inputs=inputs,
+                        seed=layer * width + i,
+                        size=size,
+                        repeat=repeat,
+                    )
+                )
+            with open(
+                os.path.join(project_dir, task, "code", "run.py"),
+                "w",
+                encoding="utf-8",
+            ) as f:
+                f.write(SCRIPT)
+
+
+def run_scons(project_dir, *args):
+    """
+    Clean the project, then build it with SCons and return the wall time (in seconds).
+    """
+    subprocess.run(
+        ["scons", "-Q", "-c"], cwd=project_dir, capture_output=True, check=True
+    )
+    start = time.perf_counter()
+    runner = subprocess.run(
+        ["scons", "-Q", *args],
+        cwd=project_dir,
+        capture_output=True,
+        text=True,
+    )
+    elapsed = time.perf_counter() - start
+    if runner.returncode != 0:
+        print(runner.stdout, runner.stderr)
+        raise RuntimeError(f"SCons failed in {project_dir}.")
+    return elapsed
+
+
+def main():
+    """
+    Run the benchmark.
+    """
+    parser = argparse.ArgumentParser(
+        description="Benchmark the thread budget of the scripts."
+    )
+    parser.add_argument("--layers", type=int, default=4, help="task layers")
+    parser.add_argument("--width", type=int, default=8, help="tasks per layer")
+    parser.add_argument("--size", type=int, default=1000, help="matrix size")
+    parser.add_argument(
+        "--matrices", type=int, default=5, help="matrices per task"
+    )
+    parser.add_argument("--repeat", type=int, default=3, help="timed builds")
+    parser.add_argument(
+        "--jobs",
+        type=int,
+        default=os.cpu_count() or 1,
+        help="jobs of the parallel builds",
+    )
+    args = parser.parse_args()
+    tasks_dir = os.path.dirname(
+        os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    )
+    with tempfile.TemporaryDirectory() as project_dir:
+        n_tasks = args.layers * args.width
+        print(f"Creating {n_tasks} tasks in {project_dir}...")
+        create_project(
+            tasks_dir,
+            project_dir,
+            args.layers,
+            args.width,
+            args.size,
+            args.matrices,
+        )
+        # the first build formats the files
+        run_scons(project_dir, f"-j{args.jobs}")
+        results = {}
+        for label, options in [
+            (f"-j {args.jobs} without thread budget", ["THREAD_BUDGET=0"]),
+            (f"-j {args.jobs} with thread budget", []),
+            ("-j 1 with thread budget", ["-j1"]),
+        ]:
+            if "-j1" not in options:
+                options = [f"-j{args.jobs}"] + options
+            times = [
+                run_scons(project_dir, *options) for _ in range(args.repeat)
+            ]
+            results[label] = statistics.median(times)
+            print(
+                f"Build {label}: median {results[label]:.2f} s "
+                f"(min {min(times):.2f} s, max {max(times):.2f} s), "
+                f"{n_tasks / results[label] * 60:.1f} tasks/min"
+            )
+        without, with_budget, _ = results.values()
+        print(f"Thread budget speed-up: {without / with_budget:.2f}x")
+
+
+if __name__ == "__main__":
+    main()
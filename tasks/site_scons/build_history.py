@@ -0,0 +1,351 @@
+"""
+Shih-Hsuan Hsu
+October 18, 2026
+Record the telemetry of every build action in a SQLite database
+    (`.scons_cache/build_history.sqlite`): start and end time, user and system CPU time,
+    peak RSS of the process tree, exit status, and the sizes of the sources and targets.
+The database is used to annotate the task graph with the time of each task
+    and its critical path, and to report the slowest targets and the regressions at exit.
+The records are kept in memory during the build and written once at exit,
+    so builds that run nothing do not open the database.
+Disable it with `BUILD_HISTORY=False`.
+"""
+
+import os
+import sys
+import time
+import threading
+import functools
+import subprocess
+from helpers import CACHE_DIR
+
+BUILD_HISTORY_FILE = os.path.join(CACHE_DIR, "build_history.sqlite")
+"""Database storing the telemetry of the build actions."""
+
+TIMED_BUILDERS = [
+    "Python",
+    "Stata",
+    "Julia",
+    "Sysimage",
+    "Matlab",
+    "Dynare",
+    "Copy",
+    "Link",
+    "PDF",
+]
+"""Builders whose actions are recorded."""
+
+BUILD_HISTORY_DAYS = 365
+"""Number of days the builds are kept in the database."""
+
+BUILD_HISTORY_RUNS = 5
+"""Number of recent successful runs of a target used to estimate its run time."""
+
+REGRESSION_RATIO = 1.5
+"""A target regressed if its run time or peak RSS grew by this factor..."""
+
+REGRESSION_MIN_SECONDS = 1.0
+"""...and its run time grew by at least this many seconds..."""
+
+REGRESSION_MIN_BYTES = 100e6
+"""...or its peak RSS grew by at least this many bytes."""
+
+RECORDS = []
+"""Actions run in this build (a dict of the `actions` columns for each action)."""
+
+_RECORDS_LOCK = threading.Lock()
+
+RUNNING = {}
+"""Actions running now: {thread id: (target, start time)}."""
+
+_CURRENT = threading.local()
+"""Resource usage of the action running in the current thread."""
+
+_SLOTS = {}
+"""Job slot of each SCons thread that ran an action (numbered from 1)."""
+
+BUILD_START = time.time()
+"""Time at which this build started."""
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS builds (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    start REAL NOT NULL,
+    end REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS actions (
+    build_id INTEGER NOT NULL REFERENCES builds(id) ON DELETE CASCADE,
+    builder TEXT NOT NULL,
+    target TEXT NOT NULL,
+    start REAL NOT NULL,
+    duration REAL NOT NULL,
+    status INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS actions_target ON actions(target);
+CREATE INDEX IF NOT EXISTS actions_build_id ON actions(build_id);
+"""
+"""Tables of the database."""
+
+COLUMNS = {
+    "builds": {"host": "TEXT", "jobs": "INTEGER"},
+    "actions": {
+        "end": "REAL",
+        "user_cpu": "REAL",
+        "system_cpu": "REAL",
+        "peak_rss": "INTEGER",
+        "input_bytes": "INTEGER",
+        "output_bytes": "INTEGER",
+        "slot": "INTEGER",
+    },
+}
+"""Columns added after the tables were created (NULL when not measured)."""
+
+
+def connect(path=BUILD_HISTORY_FILE):
+    """
+    Returns a connection to the database, creating the tables if needed.
+    """
+    # deferred: sqlite3 is only needed when the history is read or written
+    import sqlite3
+
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    connection = sqlite3.connect(path, timeout=30)
+    connection.execute("PRAGMA foreign_keys = ON")
+    connection.executescript(SCHEMA)
+    for table, columns in COLUMNS.items():
+        existing = {
+            row[1] for row in connection.execute(f"PRAGMA table_info({table})")
+        }
+        for column, column_type in columns.items():
+            if column not in existing:
+                connection.execute(
+                    f"ALTER TABLE {table} ADD COLUMN {column} {column_type}"
+                )
+    return connection
+
+
+def rss_bytes(ru_maxrss):
+    """
+    Returns `ru_maxrss` in bytes (it is in kilobytes, except on macOS).
+    """
+    return ru_maxrss if sys.platform == "darwin" else ru_maxrss * 1024
+
+
+def add_usage(user_cpu, system_cpu, peak_rss):
+    """
+    Add the resource usage of a process (or of a script run by a worker)
+        to the action running in the current thread.
+    """
+    usage = getattr(_CURRENT, "usage", None)
+    if usage is None:
+        return
+    usage["user_cpu"] = (usage["user_cpu"] or 0) + user_cpu
+    usage["system_cpu"] = (usage["system_cpu"] or 0) + system_cpu
+    usage["peak_rss"] = max(usage["peak_rss"] or 0, peak_rss)
+
+
+def run_command(command, check=False, **kwargs):
+    """
+    Run a command like `subprocess.run` (without capturing its output),
+        and add the CPU time and peak RSS of its process tree to the current action.
+    The usage includes the children the command waited for (e.g., `pdflatex` under `latexmk`).
+    On Linux, the peak RSS is at least the memory of SCons when the command started,
+        since it is measured from the fork.
+    """
+    if not hasattr(os, "wait4"):
+        # e.g., on Windows, the usage is not measured
+        return subprocess.run(command, check=check, **kwargs)
+    process = subprocess.Popen(command, **kwargs)
+    try:
+        _, status, rusage = os.wait4(process.pid, 0)
+    except BaseException:
+        process.kill()
+        process.wait()
+        raise
+    process.returncode = os.waitstatus_to_exitcode(status)
+    add_usage(rusage.ru_utime, rusage.ru_stime, rss_bytes(rusage.ru_maxrss))
+    if check and process.returncode:
+        raise subprocess.CalledProcessError(process.returncode, command)
+    return subprocess.CompletedProcess(command, process.returncode)
+
+
+def job_slot():
+    """
+    Returns the job slot of the current thread (SCons runs each job slot in a thread).
+    """
+    with _RECORDS_LOCK:
+        return _SLOTS.setdefault(threading.get_ident(), len(_SLOTS) + 1)
+
+
+def file_sizes(nodes):
+    """
+    Returns the total size (in bytes) of the files among the nodes.
+    """
+    total = 0
+    for node in nodes:
+        path = getattr(node, "abspath", None)
+        if path and os.path.isfile(path):
+            total += os.path.getsize(path)
+    return total
+
+
+def time_action(action_function, builder_name, action_contents):
+    """
+    Wrap a build action so that its telemetry is recorded.
+    """
+
+    @functools.wraps(action_function)
+    def timed_action_function(target, source, env):
+        if not env.get("BUILD_HISTORY", True):
+            return action_function(target=target, source=source, env=env)
+        _CURRENT.usage = {
+            "user_cpu": None,
+            "system_cpu": None,
+            "peak_rss": None,
+        }
+        start = time.time()
+        begin = time.perf_counter()
+        with _RECORDS_LOCK:
+            RUNNING[threading.get_ident()] = (str(target[0]), start)
+        status = 1
+        try:
+            status = action_function(target=target, source=source, env=env)
+        except subprocess.CalledProcessError as e:
+            status = e.returncode
+            raise
+        finally:
+            duration = time.perf_counter() - begin
+            record = {
+                "builder": builder_name,
+                "target": str(target[0]),
+                "start": start,
+                "end": start + duration,
+                "duration": duration,
+                "status": status or 0,
+                **_CURRENT.usage,
+                "input_bytes": file_sizes(source),
+                "output_bytes": file_sizes(target),
+                "slot": job_slot(),
+            }
+            _CURRENT.usage = None
+            with _RECORDS_LOCK:
+                RECORDS.append(record)
+                RUNNING.pop(threading.get_ident(), None)
+        return status
+
+    return timed_action_function
+
+
+def save_build_history(path=BUILD_HISTORY_FILE):
+    """
+    Write the actions run in this build to the database,
+        keeping only the builds of the last `BUILD_HISTORY_DAYS` days.
+    Returns the id of the build, or None if no action was run.
+    """
+    from SCons.Script import GetOption
+
+    with _RECORDS_LOCK:
+        records = list(RECORDS)
+    if not records:
+        return None
+    # deferred: socket is only needed when the history is written
+    import socket
+
+    connection = connect(path)
+    with connection:
+        build_id = connection.execute(
+            "INSERT INTO builds (start, end, host, jobs) VALUES (?, ?, ?, ?)",
+            (
+                BUILD_START,
+                time.time(),
+                socket.gethostname(),
+                GetOption("num_jobs"),
+            ),
+        ).lastrowid
+        columns = list(records[0])
+        connection.executemany(
+            f"INSERT INTO actions (build_id, {', '.join(columns)}) "
+            f"VALUES (?, {', '.join('?' for _ in columns)})",
+            [(build_id, *record.values()) for record in records],
+        )
+        connection.execute(
+            "DELETE FROM builds WHERE start < ?",
+            (time.time() - BUILD_HISTORY_DAYS * 86400,),
+        )
+    connection.close()
+    return build_id
+
+
+def load_durations(path=BUILD_HISTORY_FILE, runs=BUILD_HISTORY_RUNS):
+    """
+    Returns {target: median run time (in seconds) of its last `runs` successful runs}.
+    """
+    # deferred: statistics (and its imports, e.g., fractions) is slow to import
+    import statistics
+
+    if not os.path.isfile(path):
+        return {}
+    connection = connect(path)
+    rows = connection.execute(
+        "SELECT target, duration FROM ("
+        "SELECT target, duration, ROW_NUMBER() OVER ("
+        "PARTITION BY target ORDER BY build_id DESC, start DESC) AS run "
+        "FROM actions WHERE status = 0) WHERE run <= ?",
+        (runs,),
+    ).fetchall()
+    connection.close()
+    history = {}
+    for target, duration in rows:
+        history.setdefault(target, []).append(duration)
+    return {
+        target: statistics.median(durations)
+        for target, durations in history.items()
+    }
+
+
+def build_report(build_id, top=5, path=BUILD_HISTORY_FILE):
+    """
+    Returns the report of a build:
+        {"slowest": [(target, duration)], "memory": [(target, peak RSS)],
+        "regressions": [(target, previous duration, duration, previous peak RSS, peak RSS)]},
+        where the regressions are compared with the previous successful run of each target.
+    """
+    connection = connect(path)
+    slowest = connection.execute(
+        "SELECT target, duration FROM actions WHERE build_id = ? "
+        "ORDER BY duration DESC LIMIT ?",
+        (build_id, top),
+    ).fetchall()
+    memory = connection.execute(
+        "SELECT target, peak_rss FROM actions "
+        "WHERE build_id = ? AND peak_rss IS NOT NULL "
+        "ORDER BY peak_rss DESC LIMIT ?",
+        (build_id, top),
+    ).fetchall()
+    rows = connection.execute(
+        "SELECT current.target, previous.duration, current.duration, "
+        "previous.peak_rss, current.peak_rss "
+        "FROM actions AS current JOIN actions AS previous "
+        "ON previous.target = current.target AND previous.status = 0 "
+        "AND previous.build_id = ("
+        "SELECT MAX(build_id) FROM actions WHERE target = current.target "
+        "AND status = 0 AND build_id < current.build_id) "
+        "WHERE current.build_id = ? AND current.status = 0",
+        (build_id,),
+    ).fetchall()
+    connection.close()
+    regressions = [
+        row
+        for row in rows
+        if (
+            row[2] > row[1] * REGRESSION_RATIO
+            and row[2] - row[1] >= REGRESSION_MIN_SECONDS
+        )
+        or (
+            row[3] is not None
+            and row[4] is not None
+            and row[4] > row[3] * REGRESSION_RATIO
+            and row[4] - row[3] >= REGRESSION_MIN_BYTES
+        )
+    ]
+    return {"slowest": slowest, "memory": memory, "regressions": regressions}
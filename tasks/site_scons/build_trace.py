@@ -0,0 +1,140 @@
+"""
+Shih-Hsuan Hsu
+October 18, 2026
+Write the timeline of a build as a Chrome trace (`scons --trace=trace.json`),
+    which can be opened in https://ui.perfetto.dev or `chrome://tracing`.
+The trace has a track for the start-up phases (black formatter, reading the
+    SConscript files, task graph), a track for the background black formatter,
+    and one track per job slot with a span for each action (see `build_history.py`).
+Gaps in the job slot tracks are idle slots, e.g., targets waiting on a long task
+    or on a `SideEffect` shared by several targets.
+"""
+
+import os
+import json
+import time
+import startup_profile
+import build_history
+from create_task_graph import task_of
+
+WALL_OFFSET = time.time() - time.perf_counter()
+"""Offset converting `time.perf_counter()` to `time.time()`."""
+
+STARTUP_TRACK = 0
+"""Track of the start-up phases run by SCons (main thread)."""
+
+BACKGROUND_TRACK = 1000
+"""First track of the phases run in background threads (e.g., black)."""
+
+
+def trace_events(tasks=()):
+    """
+    Returns the trace events (in microseconds since the start of the build)
+        of the start-up phases and of the actions run in this build.
+    """
+    origin = build_history.BUILD_START
+
+    def microseconds(wall_time):
+        return round((wall_time - origin) * 1e6)
+
+    events = []
+    tracks = {STARTUP_TRACK: "SCons (start-up)"}
+    background = {}
+    for name, start, end, thread in startup_profile.PHASES:
+        if thread == "MainThread":
+            track = STARTUP_TRACK
+        else:
+            track = background.setdefault(
+                thread, BACKGROUND_TRACK + len(background)
+            )
+            tracks[track] = thread
+        events.append(
+            {
+                "name": name,
+                "cat": "startup",
+                "ph": "X",
+                "ts": microseconds(start + WALL_OFFSET),
+                "dur": round((end - start) * 1e6),
+                "pid": 1,
+                "tid": track,
+            }
+        )
+    # the targets are built after the last start-up phase
+    startup_end = max(
+        (
+            end
+            for _, _, end, thread in startup_profile.PHASES
+            if thread == "MainThread"
+        ),
+        default=startup_profile.START,
+    )
+    events.append(
+        {
+            "name": "building targets",
+            "cat": "build",
+            "ph": "X",
+            "ts": microseconds(startup_end + WALL_OFFSET),
+            "dur": round((time.perf_counter() - startup_end) * 1e6),
+            "pid": 1,
+            "tid": STARTUP_TRACK,
+        }
+    )
+    with build_history._RECORDS_LOCK:
+        records = list(build_history.RECORDS)
+    for record in records:
+        tracks[record["slot"]] = f"job slot {record['slot']}"
+        events.append(
+            {
+                "name": record["target"],
+                "cat": record["builder"],
+                "ph": "X",
+                "ts": microseconds(record["start"]),
+                "dur": round(record["duration"] * 1e6),
+                "pid": 1,
+                "tid": record["slot"],
+                "args": {
+                    "task": task_of(record["target"], tasks),
+                    "builder": record["builder"],
+                    "status": record["status"],
+                    "user_cpu": record["user_cpu"],
+                    "system_cpu": record["system_cpu"],
+                    "peak_rss": record["peak_rss"],
+                },
+            }
+        )
+    # name the process and the tracks, and sort the tracks by number
+    events.append(
+        {"name": "process_name", "ph": "M", "pid": 1, "args": {"name": "scons"}}
+    )
+    for track, name in tracks.items():
+        events.append(
+            {
+                "name": "thread_name",
+                "ph": "M",
+                "pid": 1,
+                "tid": track,
+                "args": {"name": name},
+            }
+        )
+        events.append(
+            {
+                "name": "thread_sort_index",
+                "ph": "M",
+                "pid": 1,
+                "tid": track,
+                "args": {"sort_index": track},
+            }
+        )
+    return events
+
+
+def write_trace(path, tasks=()):
+    """
+    Write the Chrome trace of this build to `path` (registered to be called at exit).
+    """
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(
+            {"traceEvents": trace_events(tasks), "displayTimeUnit": "ms"}, f
+        )
+    print(f"scons: Build trace written to {path}.")
@@ -0,0 +1,186 @@
+"""
+Shih-Hsuan Hsu
+October 18, 2026
+A small reference server for the shared artifact cache (see `remote_cache.py`).
+Run it on a machine everyone can reach (or on localhost for testing):
+    python cache_server.py --root <storage directory> --port 8765 \
+        --token-file ../../secrets/remote_cache.txt
+Every request must carry the shared token (`Authorization: Bearer <token>`),
+    which the clients read from `secrets/remote_cache.txt` (or `REMOTE_CACHE_TOKEN`).
+
+Endpoints:
+    GET/HEAD/PUT /cas/<sha256>  file contents, addressed by their SHA-256 hash
+    GET/PUT      /ac/<key>      manifest of a cache entry (JSON, see `artifact_store.py`)
+Uploaded files are rejected if their hash does not match the address,
+    and manifests are rejected if they refer to files that have not been uploaded.
+"""
+
+import os
+import re
+import hmac
+import json
+import hashlib
+import argparse
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from artifact_store import is_safe_path
+
+PATH_PATTERN = re.compile(r"^/(cas|ac)/([0-9a-f]{64})$")
+"""Valid request paths."""
+
+
+class CacheRequestHandler(BaseHTTPRequestHandler):
+    """
+    Handle the requests to the cache server.
+    """
+
+    root = "."
+    """Directory storing the cache (set by `main`)."""
+    token = ""
+    """Shared token every request must carry (set by `main`)."""
+
+    def authorized(self):
+        """
+        Returns True if the request carries the shared token (otherwise sends 401).
+        """
+        expected = f"Bearer {self.token}".encode("utf-8")
+        received = self.headers.get("Authorization", "").encode("utf-8")
+        if self.token and hmac.compare_digest(received, expected):
+            return True
+        self.send_error(401)
+        return False
+
+    def locate(self):
+        """
+        Returns the file path for the request, or None (and sends 401 or 404) if it is invalid.
+        """
+        if not self.authorized():
+            return None, None
+        match = PATH_PATTERN.match(self.path)
+        if match is None:
+            self.send_error(404)
+            return None, None
+        kind, name = match.groups()
+        return kind, os.path.join(self.root, kind, name[:2], name)
+
+    def do_HEAD(self):  # pylint: disable=invalid-name
+        """
+        Check if a file exists.
+        """
+        self.do_GET(send_body=False)
+
+    def do_GET(self, send_body=True):  # pylint: disable=invalid-name
+        """
+        Download a file or a manifest.
+        """
+        _, path = self.locate()
+        if path is None:
+            return
+        if not os.path.exists(path):
+            self.send_error(404)
+            return
+        self.send_response(200)
+        self.send_header("Content-Length", str(os.path.getsize(path)))
+        self.end_headers()
+        if send_body:
+            with open(path, "rb") as f:
+                while chunk := f.read(1 << 20):
+                    self.wfile.write(chunk)
+
+    def do_PUT(self):  # pylint: disable=invalid-name
+        """
+        Upload a file or a manifest.
+        """
+        kind, path = self.locate()
+        if path is None:
+            return
+        # stream the body to a temporary file, so readers never see a partial file
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = f"{path}.tmp{os.getpid()}{id(self)}"
+        sha256 = hashlib.sha256()
+        remaining = int(self.headers.get("Content-Length", 0))
+        with open(tmp_path, "wb") as f:
+            while remaining > 0:
+                chunk = self.rfile.read(min(remaining, 1 << 20))
+                if not chunk:
+                    break
+                sha256.update(chunk)
+                f.write(chunk)
+                remaining -= len(chunk)
+        error = self.validate(kind, path, tmp_path, sha256.hexdigest())
+        if error:
+            os.remove(tmp_path)
+            self.send_error(*error)
+            return
+        os.replace(tmp_path, path)
+        self.send_response(201)
+        self.send_header("Content-Length", "0")
+        self.end_headers()
+
+    def validate(self, kind, path, tmp_path, sha256):
+        """
+        Returns None if the upload is valid, otherwise (status code, message).
+        """
+        if kind == "cas":
+            if sha256 != os.path.basename(path):
+                return 400, "Hash does not match the contents."
+            return None
+        try:
+            with open(tmp_path, "r", encoding="utf-8") as f:
+                manifest = json.load(f)
+            for item in manifest["files"]:
+                if not is_safe_path(item["path"]) or not PATH_PATTERN.match(
+                    f"/cas/{item['sha256']}"
+                ):
+                    return 400, f"Invalid file in manifest: {item}"
+            missing = [
+                item["sha256"]
+                for item in manifest["files"]
+                if not os.path.exists(
+                    os.path.join(
+                        self.root, "cas", item["sha256"][:2], item["sha256"]
+                    )
+                )
+            ]
+        except (ValueError, KeyError, TypeError):
+            return 400, "Invalid manifest."
+        if missing:
+            return 409, f"Missing files: {missing}"
+        return None
+
+
+def main():
+    """
+    Start the cache server.
+    """
+    parser = argparse.ArgumentParser(
+        description="Shared artifact cache server."
+    )
+    parser.add_argument(
+        "--root", default="remote_cache", help="storage directory"
+    )
+    parser.add_argument(
+        "--host", default="127.0.0.1", help="address to listen on"
+    )
+    parser.add_argument(
+        "--port", type=int, default=8765, help="port to listen on"
+    )
+    parser.add_argument(
+        "--token-file",
+        required=True,
+        help="file storing the shared token every request must carry",
+    )
+    args = parser.parse_args()
+    with open(args.token_file, "r", encoding="utf-8") as f:
+        CacheRequestHandler.token = f.read().strip()
+    if not CacheRequestHandler.token:
+        parser.error(f"The token file {args.token_file} is empty.")
+    CacheRequestHandler.root = os.path.abspath(args.root)
+    server = ThreadingHTTPServer((args.host, args.port), CacheRequestHandler)
+    print(
+        f"Serving {CacheRequestHandler.root} on http://{args.host}:{server.server_port}"
+    )
+    server.serve_forever()
+
+
+if __name__ == "__main__":
+    main()
@@ -2,80 +2,383 @@
 Shih-Hsuan Hsu
 April 26, 2026
 Functions for creating a task graph using Graphviz.
+The task-level edges are collected while SCons starts, and the graph files
+    (`task_graph.json`, `task_graph.dot`, and `task_graph.png`) are SCons targets
+    that only depend on the edges, so they are only rebuilt
+    (in parallel with the other targets) when the edges change.
+The run time of the tasks in the previous builds (see `build_history.py`)
+    and the critical path change after every build, so they are written separately
+    (`task_times.json` and `task_graph.html`) while SCons starts, if they changed,
+    and drawn in `task_graph_times.dot` and `task_graph_times.svg`,
+    which are targets depending on the edges and the rounded run times.
 """
 
+import os
+import json
+from helpers import format_duration
 
-def create_task_graph(env):
+TASK_GRAPH_DIR = "task_graph/output"
+"""Folder storing the task graph files."""
+
+CRITICAL_COLOR = "red"
+"""Color of the tasks and edges on the critical path."""
+
+TASK_GRAPH_HTML = """<!DOCTYPE html>
+<html>
+<head>
+<meta charset="utf-8">
+<title>Task graph</title>
+<style>
+body {{ font-family: sans-serif; margin: 2em; }}
+table {{ border-collapse: collapse; }}
+th, td {{ padding: 4px 12px; border-bottom: 1px solid #ddd; text-align: left; }}
+th {{ cursor: pointer; }}
+tr.critical td {{ color: {color}; font-weight: bold; }}
+</style>
+</head>
+<body>
+<h1>Task graph</h1>
+<p>Critical path: <span id="path"></span> (<span id="critical"></span>).
+Total run time: <span id="total"></span>.
+With <input id="jobs" type="number" min="1" value="4" style="width: 4em"> jobs,
+the build takes at least <span id="bound"></span>.</p>
+<p>Click a column to sort the tasks.</p>
+<table>
+<thead><tr>
+<th data-key="task">Task</th>
+<th data-key="time">Run time</th>
+<th data-key="finish">Cumulative time</th>
+<th data-key="share">Share of total</th>
+</tr></thead>
+<tbody id="rows"></tbody>
+</table>
+<p><img src="task_graph_times.svg" alt=""></p>
+<script>
+const graph = {graph};
+const rows = Object.entries(graph.tasks).map(([task, t]) => ({{
+    task: task, time: t.time, finish: t.finish,
+    share: graph.total ? t.time / graph.total : 0,
+    critical: graph.critical_path.includes(task),
+}}));
+const format = (s) => s >= 3600 ? (s / 3600).toFixed(1) + " h"
+    : s >= 60 ? (s / 60).toFixed(1) + " min" : s.toFixed(1) + " s";
+let order = {{ key: "finish", descending: true }};
+function render() {{
+    rows.sort((a, b) => {{
+        const x = a[order.key], y = b[order.key];
+        return (x < y ? -1 : x > y ? 1 : 0) * (order.descending ? -1 : 1);
+    }});
+    document.getElementById("rows").innerHTML = rows.map((r) =>
+        `<tr class="${{r.critical ? "critical" : ""}}"><td>${{r.task}}</td>` +
+        `<td>${{format(r.time)}}</td><td>${{format(r.finish)}}</td>` +
+        `<td>${{(100 * r.share).toFixed(1)}}%</td></tr>`).join("");
+    const jobs = Math.max(1, Number(document.getElementById("jobs").value));
+    document.getElementById("bound").textContent =
+        format(Math.max(graph.critical_time, graph.total / jobs));
+}}
+document.querySelectorAll("th").forEach((th) => th.addEventListener("click", () => {{
+    const key = th.dataset.key;
+    order = {{ key: key, descending: order.key === key ? !order.descending : key !== "task" }};
+    render();
+}}));
+document.getElementById("jobs").addEventListener("input", render);
+document.getElementById("path").textContent = graph.critical_path.join(" → ") || "none";
+document.getElementById("critical").textContent = format(graph.critical_time);
+document.getElementById("total").textContent = format(graph.total);
+render();
+</script>
+</body>
+</html>
+"""
+"""Page listing the tasks, sortable by run time (filled by `write_task_times`)."""
+
+
+def task_of(path, tasks):
     """
-    Create a task graph using Graphviz.
-    Assume working directory is the project tasks directory.
+    Returns the task containing `path` (the first folder if no task contains it).
     """
-    import graphviz
+    parts = path.split("/")
+    for i in range(1, len(parts)):
+        if "/".join(parts[:i]) in tasks:
+            return "/".join(parts[:i])
+    return parts[0]
+
+
+def walk_nodes(env, tasks=()):
+    """
+    Returns ({task name: set of upstream tasks}, {node: children}, {node: path},
+        {node: task name}) for the nodes reachable from the tasks directory.
+    Folders are left out of {node: children}, since their children are their entries.
+    Nodes are visited once (by identity), and the path of each node is computed once.
+    """
+    from SCons.Node.FS import Dir
 
-    # get the root node
     root_node = env.Dir(".")
+    node_paths = {}
+    node_tasks = {}
 
-    DEPS = {}
-    """Store the children of each node"""
+    def node_task(node):
+        if node not in node_tasks:
+            node_paths[node] = str(node)
+            node_tasks[node] = task_of(node_paths[node], tasks)
+        return node_tasks[node]
 
-    # 1. Use a stack and a visited set for efficient DAG traversal
-    visited = set()
+    task_deps = {}
+    node_children = {}
+    visited = {root_node}
     stack = [root_node]
-
     while stack:
         node = stack.pop()
-        node_str = str(node)
-
-        # Skip if we have already evaluated this node's children
-        if node_str in visited:
-            continue
-        visited.add(node_str)
-
         children = node.children()
-
         if children and node is not root_node:
-            # stores the children of the node
-            DEPS[node_str] = set(map(str, children))
-
-        # Add unvisited children to the stack to be processed
+            task_name = node_task(node)
+            deps = task_deps.setdefault(task_name, set())
+            for child in children:
+                child_task_name = node_task(child)
+                # don't add self dependency
+                if child_task_name and child_task_name != task_name:
+                    deps.add(child_task_name)
+            if not isinstance(node, Dir):
+                node_children[node] = children
         for child in children:
-            if str(child) not in visited:
+            if child not in visited:
+                visited.add(child)
                 stack.append(child)
+    return task_deps, node_children, node_paths, node_tasks
+
+
+def task_times(node_children, node_paths, node_tasks, durations):
+    """
+    Returns ({task name: {"time", "finish"}}, critical path, critical path time),
+        where `time` is the sum of the run times of the actions of the task,
+        `finish` is the longest chain of actions ending in the task,
+        and the critical path is the tasks on the longest chain of actions
+        (no build can be faster than it, whatever the number of jobs).
+    `durations` are the run times of the targets (see `build_history.load_durations`).
+    """
+    finish = {}
+    upstream = {}
+    for root in node_children:
+        stack = [(root, False)]
+        while stack:
+            node, expanded = stack.pop()
+            if node in finish:
+                continue
+            children = [
+                c for c in node_children.get(node, ()) if c in node_children
+            ]
+            if not expanded:
+                stack.append((node, True))
+                stack.extend((c, False) for c in children if c not in finish)
+                continue
+            # the children were finished before (a cycle counts as zero)
+            best = max(children, key=lambda c: finish.get(c, 0), default=None)
+            upstream[node] = best
+            finish[node] = durations.get(node_paths.get(node), 0) + (
+                finish.get(best, 0) if best is not None else 0
+            )
+    times = {}
+    for node, node_finish in finish.items():
+        task = node_tasks[node]
+        task_time = times.setdefault(task, {"time": 0, "finish": 0})
+        task_time["time"] += durations.get(node_paths.get(node), 0)
+        task_time["finish"] = max(task_time["finish"], node_finish)
+    # follow the longest chain from the node finishing last
+    critical_path = []
+    node = max(finish, key=finish.get, default=None)
+    critical_time = finish.get(node, 0)
+    while node is not None and finish[node] > 0:
+        task = node_tasks[node]
+        if not critical_path or critical_path[-1] != task:
+            critical_path.append(task)
+        node = upstream.get(node)
+    return times, critical_path[::-1], critical_time
 
-    # maintain only the task level dependencies
-    task_deps = {}
-    for node, children in DEPS.items():
-        # ignore the task_graph node
-        if node == ".":
-            continue
-        # get origin task name
-        if isinstance(node, list):
-            raise ValueError(f"Unexpected node name: {node}")
-        task_name = node.split("/")[0]
-        if task_name not in task_deps:
-            task_deps[task_name] = set()
-        # get the children task names
-        for child in children:
-            child_task_name = child.split("/")[0]
-            # don't add self dependency
-            if child_task_name and child_task_name != task_name:
-                # store the task level dependencies
-                task_deps[task_name].add(child_task_name)
 
-    # create the graph
+def write_task_graph(target, source, env):
+    """
+    Action writing `task_graph.json` and `task_graph.dot` from the task-level edges.
+    """
+    import graphviz
+
+    graph = json.loads(source[0].read())
+    with open(str(target[0]), "w", encoding="utf-8") as f:
+        json.dump(graph, f, indent=4)
     G = graphviz.Digraph(comment="Task Graph")
     G.graph_attr["rankdir"] = "LR"
-    # draw the nodes
-    for task in task_deps.keys():
+    for task, deps in graph["deps"].items():
         G.node(task)
-    # draw the edges
-    for task, deps in task_deps.items():
-        # draw the edges
         for dep in deps:
             G.edge(dep, task)
+    with open(str(target[1]), "w", encoding="utf-8") as f:
+        f.write(G.source)
+    return 0
 
-    # store the graph
-    G.render("task_graph/output/task_graph", format="png", cleanup=True)
 
-    # attach the task graph to the SCons, so that it is cleaned with `scons -c`
-    env.Clean(".", "task_graph/output/task_graph.png")
+def write_task_graph_times(target, source, env):
+    """
+    Action writing `task_graph_times.dot`, with the tasks labeled with their run time
+        and the critical path highlighted.
+    """
+    import graphviz
+
+    graph = json.loads(source[0].read())
+    times = graph["times"]
+    critical_path = times["critical_path"]
+    critical_edges = set(zip(critical_path, critical_path[1:]))
+    G = graphviz.Digraph(comment="Task Graph")
+    G.graph_attr["rankdir"] = "LR"
+    # draw the nodes, with their run time if it is known
+    for task in graph["deps"]:
+        attrs = {}
+        if times["tasks"].get(task, {}).get("time"):
+            attrs["label"] = (
+                f"{task}\\n{format_duration(times['tasks'][task]['time'])}"
+            )
+        if task in critical_path:
+            attrs.update(color=CRITICAL_COLOR, penwidth="2")
+        G.node(task, **attrs)
+    # draw the edges
+    for task, deps in graph["deps"].items():
+        for dep in deps:
+            if (dep, task) in critical_edges:
+                G.edge(dep, task, color=CRITICAL_COLOR, penwidth="2")
+            else:
+                G.edge(dep, task)
+    with open(str(target[0]), "w", encoding="utf-8") as f:
+        f.write(G.source)
+    return 0
+
+
+def write_if_changed(path, text):
+    """
+    Write a text file unless it already has `text`.
+    """
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            if f.read() == text:
+                return
+    except OSError:
+        pass
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "w", encoding="utf-8") as f:
+        f.write(text)
+
+
+def write_task_times(times, task_graph_dir=TASK_GRAPH_DIR):
+    """
+    Write the run times of the tasks and the critical path
+        to `task_times.json` and `task_graph.html` (if they changed).
+    """
+    write_if_changed(
+        os.path.join(task_graph_dir, "task_times.json"),
+        json.dumps(times, indent=4),
+    )
+    write_if_changed(
+        os.path.join(task_graph_dir, "task_graph.html"),
+        TASK_GRAPH_HTML.format(
+            graph=json.dumps(times).replace("</", "<\\/"),
+            color=CRITICAL_COLOR,
+        ),
+    )
+
+
+def render_task_graph(target, source, env):
+    """
+    Action rendering a graph (e.g., `task_graph.png` from `task_graph.dot`)
+        with Graphviz `dot`, in the format given by the extension of the target.
+    """
+    from build_history import run_command
+
+    # the probed binary, since SCons does not use the `PATH` of the shell
+    dot = env["TOOL_PROBE"].get("dot")["binary"]
+    output_format = os.path.splitext(str(target[0]))[1][1:]
+    return run_command(
+        [dot, f"-T{output_format}", "-o", str(target[0]), str(source[0])]
+    ).returncode
+
+
+def create_task_graph(env, tasks=(), loaded_tasks=()):
+    """
+    Create the task graph targets (rendered with Graphviz `dot` if it is available).
+    Assume working directory is the project tasks directory.
+    `tasks` are all the tasks, and `loaded_tasks` are the tasks whose SConscript files were read;
+        the dependencies of the other tasks are taken from the previous builds.
+    Returns the task graph targets.
+    """
+    from SCons.Script import GetOption
+    from custom_warnings import missing_tool_warning
+    from task_index import save_task_deps
+    from build_history import load_durations, time_action
+
+    task_deps, node_children, node_paths, node_tasks = walk_nodes(env, tasks)
+    # record the dependencies, which are used to select the tasks to load
+    task_deps = save_task_deps(task_deps, loaded_tasks, tasks)
+    times, critical_path, critical_time = task_times(
+        node_children,
+        node_paths,
+        node_tasks,
+        load_durations(),
+    )
+    # rounded, so the annotated graph is not rebuilt for small changes
+    times = {
+        "tasks": {
+            task: {key: round(value, 1) for key, value in times[task].items()}
+            for task in sorted(times)
+        },
+        "critical_path": critical_path,
+        "critical_time": round(critical_time, 1),
+        "total": round(sum(time["time"] for time in times.values()), 1),
+    }
+    if not GetOption("clean") and not GetOption("no_exec"):
+        write_task_times(times)
+    # the graph files are rebuilt only when the edges change
+    graph = {
+        "deps": {
+            task: sorted(deps) for task, deps in sorted(task_deps.items())
+        },
+    }
+    targets = env.Command(
+        target=[
+            f"{TASK_GRAPH_DIR}/task_graph.json",
+            f"{TASK_GRAPH_DIR}/task_graph.dot",
+        ],
+        source=env.Value(json.dumps(graph)),
+        # timed like the other actions, so the rendering shows in the build trace
+        action=env.Action(
+            time_action(write_task_graph, "TaskGraph", None),
+            "Writing the task graph",
+        ),
+    )
+    # the annotated graph is rebuilt when the edges or the rounded run times change
+    times_targets = env.Command(
+        target=f"{TASK_GRAPH_DIR}/task_graph_times.dot",
+        source=env.Value(json.dumps({**graph, "times": times})),
+        action=env.Action(
+            time_action(write_task_graph_times, "TaskGraph", None),
+            "Writing the task graph with the run times",
+        ),
+    )
+    targets += times_targets
+    if not env["TOOL_PROBE"].available("dot"):
+        missing_tool_warning(
+            "dot", "install Graphviz to render the task graph."
+        )
+        return targets
+    targets += env.Command(
+        target=f"{TASK_GRAPH_DIR}/task_graph.png",
+        source=targets[1],
+        action=env.Action(
+            time_action(render_task_graph, "TaskGraph", None),
+            "Rendering the task graph",
+        ),
+    )
+    targets += env.Command(
+        target=f"{TASK_GRAPH_DIR}/task_graph_times.svg",
+        source=times_targets,
+        action=env.Action(
+            time_action(render_task_graph, "TaskGraph", None),
+            "Rendering the task graph with the run times",
+        ),
+    )
+    return targets
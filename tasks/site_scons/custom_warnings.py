@@ -59,6 +59,26 @@ class NoBuildWarning(CustomWarning):
     """
 
 
+class RemoteCacheWarning(CustomWarning):
+    """
+    A warning class for SCons to warn users when the remote cache is unavailable.
+    This is used in the `RemoteCache` class.
+    """
+
+
+class MissingToolWarning(CustomWarning):
+    """
+    A warning class for SCons to warn users when a tool is not installed.
+    """
+
+
+class AutoJobsWarning(CustomWarning):
+    """
+    A warning class for SCons to warn users when AUTO_JOBS is not supported.
+    This is used in the `start_auto_jobs` function.
+    """
+
+
 def warn(warning_obj, message):
     """
     Issue the warning message.
@@ -101,9 +121,33 @@ def no_build_warning(message):
     warn(NoBuildWarning, message)
 
 
+def remote_cache_warning(message):
+    """
+    Issue a warning message when the remote cache is unavailable.
+    """
+    warn(RemoteCacheWarning, message)
+
+
+def missing_tool_warning(tool, message):
+    """
+    Issue a warning message when a tool is not installed.
+    """
+    warn(MissingToolWarning, f"`{tool}` is not available: {message}")
+
+
+def auto_jobs_warning(message):
+    """
+    Issue a warning message when AUTO_JOBS is not supported.
+    """
+    warn(AutoJobsWarning, message)
+
+
 # enable the warning class
 SCons.Warnings.enableWarningClass(SymLinkWarning)
 SCons.Warnings.enableWarningClass(NoPDFCompilerWarning)
 SCons.Warnings.enableWarningClass(FileNotFoundWarning)
 SCons.Warnings.enableWarningClass(SpaceInArgWarning)
 SCons.Warnings.enableWarningClass(NoBuildWarning)
+SCons.Warnings.enableWarningClass(RemoteCacheWarning)
+SCons.Warnings.enableWarningClass(MissingToolWarning)
+SCons.Warnings.enableWarningClass(AutoJobsWarning)
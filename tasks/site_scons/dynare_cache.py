@@ -0,0 +1,123 @@
+"""
+Shih-Hsuan Hsu
+October 18, 2026
+Cache for the files generated by the Dynare preprocessor.
+The `+<model>` package (including `driver.m`) and the `<model>/model` folder
+    (e.g., the bytecode and JSON output) are stored in an artifact store,
+    keyed on the `.mod` file, the files it includes (`@#include`), and `DYNARE_VERSION`,
+    which must be set (the version cannot be read without starting MATLAB).
+On a hit, the files are restored and the driver runs without preprocessing the model.
+Models compiled to MEX files (`use_dll`) are not cached,
+    since the MEX files depend on the local compiler and MATLAB.
+"""
+
+import os
+import re
+import hashlib
+from artifact_store import get_store
+from helpers import CACHE_DIR, parse_size
+
+DYNARE_CACHE_SIZE = "2GB"
+"""Default size limit of the cache (`DYNARE_CACHE_SIZE`)."""
+
+INCLUDE_PATTERN = re.compile(r'@#\s*include\s+"([^"]+)"')
+"""Pattern for the included files in a `.mod` file."""
+
+MEX_PATTERN = re.compile(r"\.mex\w*$")
+"""Pattern for the MEX files compiled with `use_dll` (e.g., `.mexa64`, `.mexw64`)."""
+
+
+def dynare_version(env):
+    """
+    Returns `DYNARE_VERSION`, which the cache requires
+        to avoid reusing files generated by another version of Dynare.
+    """
+    version = str(env.get("DYNARE_VERSION", "") or "")
+    if not version:
+        raise ValueError(
+            "DYNARE_CACHE=True requires DYNARE_VERSION to be set to the installed "
+            'Dynare version (e.g., env["DYNARE_VERSION"] = "6.2").'
+        )
+    return version
+
+
+def find_includes(mod_file, found=None):
+    """
+    Returns the `.mod` file and all the files it includes (recursively).
+    Included files are relative to the directory of the `.mod` file.
+    """
+    found = found if found is not None else []
+    mod_file = os.path.abspath(mod_file)
+    if mod_file in found or not os.path.exists(mod_file):
+        return found
+    found.append(mod_file)
+    with open(mod_file, "r", encoding="utf-8", errors="replace") as f:
+        content = f.read()
+    base_dir = os.path.dirname(mod_file)
+    for include in INCLUDE_PATTERN.findall(content):
+        find_includes(os.path.join(base_dir, include), found)
+    return found
+
+
+def dynare_cache_key(mod_file, version):
+    """
+    Returns the cache key for a `.mod` file and a Dynare version.
+    """
+    key = hashlib.sha256(f"dynare {version}".encode("utf-8"))
+    for path in find_includes(mod_file):
+        key.update(os.path.basename(path).encode("utf-8"))
+        with open(path, "rb") as f:
+            key.update(f.read())
+    return key.hexdigest()
+
+
+def get_dynare_store(env):
+    """
+    Returns the artifact store for the Dynare preprocessor output.
+    """
+    return get_store(
+        "Dynare preprocessor cache",
+        os.path.join(CACHE_DIR, "dynare"),
+        parse_size(env.get("DYNARE_CACHE_SIZE", DYNARE_CACHE_SIZE)),
+    )
+
+
+def restore_preprocessed(env, mod_file):
+    """
+    Restore the preprocessor output of a `.mod` file next to it.
+    Returns True if the output was restored from the cache.
+    """
+    key = dynare_cache_key(mod_file, dynare_version(env))
+    return get_dynare_store(env).get(key, os.path.dirname(mod_file))
+
+
+def preprocessed_files(mod_file):
+    """
+    Returns {path relative to the folder of the `.mod` file: path}
+        of the preprocessor output: the `+<model>` package and the `<model>/model` folder.
+    """
+    model = os.path.splitext(os.path.basename(mod_file))[0]
+    code_dir = os.path.dirname(os.path.abspath(mod_file))
+    files = {}
+    for folder in [f"+{model}", os.path.join(model, "model")]:
+        for dir_path, _, file_names in os.walk(os.path.join(code_dir, folder)):
+            for file_name in file_names:
+                path = os.path.join(dir_path, file_name)
+                files[os.path.relpath(path, code_dir)] = path
+    return files
+
+
+def store_preprocessed(env, mod_file):
+    """
+    Store the preprocessor output of a `.mod` file.
+    Nothing is stored if the package does not have a driver (Dynare < 4.6)
+        or if the model is compiled to MEX files (`use_dll`).
+    """
+    model = os.path.splitext(os.path.basename(mod_file))[0]
+    files = preprocessed_files(mod_file)
+    if os.path.join(f"+{model}", "driver.m") not in files:
+        return
+    if any(MEX_PATTERN.search(path) for path in files):
+        return
+    key = dynare_cache_key(mod_file, dynare_version(env))
+    get_dynare_store(env).put(key, files, {"mod_file": mod_file})
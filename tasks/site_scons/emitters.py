@@ -6,8 +6,14 @@ This file contains all the emitters that can be used
 """
 
 import os
-from helpers import create_log_file_path, create_md5_file_path
+from helpers import (
+    create_log_file_path,
+    create_md5_file_path,
+    create_target_log_file_path,
+)
 from actions import check_pdf_compiler_action
+from dynare_cache import dynare_version
+from sconscript_cache import probe_exists
 
 
 def add_log_to_target(target, source, env, ext):
@@ -54,10 +60,25 @@ def matlab_emitter(target, source, env):
 def dynare_emitter(target, source, env):
     """
     This function is used to add the log file as a target.
+    With `DYNARE_CACHE=True`, it also checks that `DYNARE_VERSION` is set.
     """
+    if env.get("DYNARE_CACHE", False):
+        dynare_version(env)
     return add_log_to_target(target, source, env, "mod")
 
 
+def julia_sysimage_emitter(target, source, env):
+    """
+    This function is used to add the log file (named after the sysimage) as a target.
+    """
+    target += [create_target_log_file_path(env, target)]
+    if env.get("SUCCESS", False):
+        # SUCCESS = True means build is marked as successful WITHOUT running the actual command,
+        # so we want to prevent output files from being deleted.
+        env.Precious(target)
+    return target, source
+
+
 def link_emitter(target, source, *_, **__):
     """
     This function checks the number of source files and target files.
@@ -108,7 +129,7 @@ def pdf_emitter(target, source, env):
     source_path = os.path.abspath(str(source[0])).replace(".tex", "")
     # remove the fls file if it exists
     fls_path = f"{target_path}.fls"
-    if os.path.exists(fls_path):
+    if probe_exists(fls_path):
         os.remove(fls_path)
     if not check_pdf_compiler_action(env):
         # add log and aux files as targets
@@ -130,11 +151,11 @@ def pdf_emitter(target, source, env):
             "out",
             "vrb",
         ]:
-            if os.path.exists(f"{target_path}.{ext}"):
+            if probe_exists(f"{target_path}.{ext}"):
                 add_targets.append(f"{target_path}.{ext}")
         # handle minted folder
         minted_folder = source_path.split("code")[0] + "code/_minted"
-        if os.path.exists(minted_folder):
+        if probe_exists(minted_folder):
             env.Clean(target, minted_folder)
         return target + add_targets, source
     else:
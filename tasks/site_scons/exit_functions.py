@@ -8,6 +8,7 @@ import sys
 import re
 from SCons.Script import GetBuildFailures
 from monkey_patches import WARNINGS
+from helpers import format_duration, format_size
 
 
 def print_fail_summary():
@@ -26,6 +27,9 @@ def print_fail_summary():
             print(f"\t{RED}scons: {msg}{RESET}", file=sys.stderr)
             # extract the log file if it exists
             action = bf.command
+            # command-line actions are lists of arguments
+            if isinstance(action, list):
+                action = " ".join(map(str, action))
             if action:
                 log_files = re.findall(r"([a-zA-Z0-9_\.\/]+\.log)", action)
                 if log_files:
@@ -75,3 +79,100 @@ def print_warning_summary():
                 )
         else:
             print(f"\t{YELLOW}scons: Unknown warning{RESET}", file=sys.stderr)
+
+
+def print_cache_summary():
+    """
+    Print the hit/miss statistics of the artifact caches used in this build,
+        and add them to the statistics of all builds.
+    """
+    # deferred: only imported at exit, not while SCons starts
+    from artifact_store import STORES
+
+    CYAN = "\033[96m"
+    RESET = "\033[0m"
+    first = True
+    for store in STORES.values():
+        if store.hits + store.misses + store.stored == 0:
+            continue
+        if first:
+            first = False
+            print(f"{CYAN}scons: Cache summary:{RESET}", file=sys.stderr)
+        print(f"\t{CYAN}scons: {store.summary()}{RESET}", file=sys.stderr)
+        store.save_stats()
+    # the remote cache module is only imported if it was used
+    remote_cache = sys.modules.get("remote_cache")
+    remotes = remote_cache.REMOTES.values() if remote_cache else []
+    for remote in remotes:
+        if first:
+            first = False
+            print(f"{CYAN}scons: Cache summary:{RESET}", file=sys.stderr)
+        print(f"\t{CYAN}scons: {remote.summary()}{RESET}", file=sys.stderr)
+
+
+def print_build_summary():
+    """
+    Save the telemetry of the actions run in this build (see `build_history.py`),
+        and print the slowest and most memory-hungry targets
+        and the targets that regressed since their previous run.
+    """
+    from build_history import save_build_history, build_report
+    from resources import RESOURCE_WAIT_THRESHOLD, time_waited
+    from job_pools import JOB_POOLS
+
+    MAGENTA = "\033[95m"
+    RESET = "\033[0m"
+    build_id = save_build_history()
+    if build_id is None:
+        return
+    report = build_report(build_id)
+    print(f"{MAGENTA}scons: Build summary:{RESET}", file=sys.stderr)
+    print(f"\t{MAGENTA}scons: Slowest targets:{RESET}", file=sys.stderr)
+    for target, duration in report["slowest"]:
+        print(
+            f"\t\t{MAGENTA}{format_duration(duration):>9}  {target}{RESET}",
+            file=sys.stderr,
+        )
+    if report["memory"]:
+        print(f"\t{MAGENTA}scons: Peak memory:{RESET}", file=sys.stderr)
+    for target, peak_rss in report["memory"]:
+        print(
+            f"\t\t{MAGENTA}{format_size(peak_rss):>9}  {target}{RESET}",
+            file=sys.stderr,
+        )
+    if report["regressions"]:
+        print(
+            f"\t{MAGENTA}scons: Regressions since the previous run:{RESET}",
+            file=sys.stderr,
+        )
+    for target, before, after, rss_before, rss_after in report["regressions"]:
+        change = f"{format_duration(before)} -> {format_duration(after)}"
+        if rss_before is not None and rss_after is not None:
+            change += f", {format_size(rss_before)} -> {format_size(rss_after)}"
+        print(f"\t\t{MAGENTA}{target}: {change}{RESET}", file=sys.stderr)
+    for pool in JOB_POOLS.values():
+        if pool.targets:
+            print(f"\t{MAGENTA}scons: {pool.summary()}{RESET}", file=sys.stderr)
+    waited = time_waited()
+    if waited >= RESOURCE_WAIT_THRESHOLD:
+        print(
+            f"\t{MAGENTA}scons: Time waited for CPUs and memory "
+            f"(CPUS=, MEM=): {format_duration(waited)}{RESET}",
+            file=sys.stderr,
+        )
+
+
+def print_auto_jobs_summary():
+    """
+    Print the changes of the limit of running actions (`AUTO_JOBS=1`, see `auto_jobs.py`).
+    """
+    import auto_jobs
+
+    BLUE = "\033[94m"
+    RESET = "\033[0m"
+    if auto_jobs.CONTROLLER is None:
+        return
+    first, *decisions = auto_jobs.CONTROLLER.summary()
+    print(f"{BLUE}scons: {first}{RESET}", file=sys.stderr)
+    for line in decisions:
+        print(f"{BLUE}{line}{RESET}", file=sys.stderr)
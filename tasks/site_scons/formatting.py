@@ -0,0 +1,150 @@
+"""
+Shih-Hsuan Hsu
+October 18, 2026
+Incremental black formatting for the Python and SCons files in the tasks directory.
+A cache of (size, modification time, content hash) of each file lets us
+    send only the changed files to black, in one call: a file whose size or
+    modification time changed is hashed again, and only sent to black if its content changed
+    (e.g., not after `touch` or `git checkout`).
+Data folders (`input`, `output`, `logs`, `md5`) are never searched.
+"""
+
+import os
+import json
+import hashlib
+import threading
+import subprocess
+from helpers import CACHE_DIR
+from startup_profile import profile_phase
+
+FORMAT_EXCLUDED_DIRS = {"input", "output", "logs", "md5", "__pycache__"}
+"""Folders that are not searched for files to format (hidden folders are skipped too)."""
+
+SCONS_FILES = {"SConstruct", "SConscript"}
+"""SCons files (without the `.py` extension) to format."""
+
+BLACK_CACHE = os.path.join(CACHE_DIR, "black_cache.json")
+"""File storing (size, modification time, content hash) of formatted files."""
+
+
+def find_format_files(root):
+    """
+    Returns the Python and SCons files under `root`,
+        skipping hidden folders and the folders in `FORMAT_EXCLUDED_DIRS`.
+    """
+    files = []
+    for dir_path, dir_names, file_names in os.walk(root):
+        # prune the folders in place, so os.walk does not descend into them
+        dir_names[:] = [
+            name
+            for name in dir_names
+            if name not in FORMAT_EXCLUDED_DIRS and not name.startswith(".")
+        ]
+        for name in file_names:
+            if name.endswith(".py") or name in SCONS_FILES:
+                files.append(os.path.normpath(os.path.join(dir_path, name)))
+    return files
+
+
+def file_state(path, previous=None):
+    """
+    Returns [size, modification time, content hash] of a file.
+    The hash is reused from `previous` if the size and modification time match.
+    """
+    stat = os.stat(path)
+    if previous and previous[:2] == [stat.st_size, stat.st_mtime_ns]:
+        return previous
+    with open(path, "rb") as f:
+        content_hash = hashlib.sha256(f.read()).hexdigest()
+    return [stat.st_size, stat.st_mtime_ns, content_hash]
+
+
+def load_black_cache(line_length, cache_path=BLACK_CACHE):
+    """
+    Returns the cached file states (empty if the line length changed).
+    """
+    try:
+        with open(cache_path, "r", encoding="utf-8") as f:
+            cache = json.load(f)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return {}
+    if cache.get("line_length") != line_length:
+        return {}
+    return cache.get("files", {})
+
+
+def save_black_cache(line_length, states, cache_path=BLACK_CACHE):
+    """
+    Store the file states.
+    """
+    os.makedirs(os.path.dirname(cache_path), exist_ok=True)
+    with open(cache_path, "w", encoding="utf-8") as f:
+        json.dump({"line_length": line_length, "files": states}, f)
+
+
+def run_black(files, line_length):
+    """
+    Format the files with black (in one call) and return the files formatted successfully.
+    """
+    if not files:
+        return []
+    print(f"Running black formatter on {len(files)} changed file(s)...")
+    runner = subprocess.run(["black", f"--line-length={line_length}"] + files)
+    if runner.returncode == 0:
+        return files
+    # black failed on some files (e.g., syntax errors); retry them next time
+    return [
+        path
+        for path in files
+        if subprocess.run(
+            ["black", "--check", "-q", f"--line-length={line_length}", path]
+        ).returncode
+        == 0
+    ]
+
+
+def start_formatter(root=".", line_length=80):
+    """
+    Format the changed Python and SCons files under `root`.
+    Changed SCons files are formatted before returning, since SCons is about to read them;
+        the Python files are formatted in a background thread, which is returned.
+    Join the thread before building, so that the targets see the formatted files.
+    """
+    # SCons changes the working directory while reading the SConscript files,
+    # so the thread must only use absolute paths
+    root = os.path.abspath(root)
+    cache_path = os.path.abspath(BLACK_CACHE)
+    cache = load_black_cache(line_length, cache_path)
+    states = {}
+    changed = []
+    for path in find_format_files(root):
+        try:
+            states[path] = file_state(path, cache.get(path))
+        except OSError:
+            continue  # e.g., a broken symbolic link
+        # the size and modification time only tell us whether to hash the file
+        if path not in cache or states[path][2] != cache[path][2]:
+            changed.append(path)
+    scons_files = [
+        path for path in changed if os.path.basename(path) in SCONS_FILES
+    ]
+    python_files = [path for path in changed if path not in scons_files]
+
+    # SCons files are formatted now, since SCons is about to read them
+    formatted_scons_files = run_black(scons_files, line_length)
+
+    def format_python_files():
+        with profile_phase("black formatter (Python files, in the background)"):
+            formatted = formatted_scons_files + run_black(
+                python_files, line_length
+            )
+        for path in formatted:
+            states[path] = file_state(path)
+        # do not cache the files that black failed to format
+        for path in set(changed) - set(formatted):
+            states.pop(path, None)
+        save_black_cache(line_length, states, cache_path)
+
+    thread = threading.Thread(target=format_python_files, name="black")
+    thread.start()
+    return thread
@@ -5,11 +5,15 @@ Helper functions for SCons environment.
 """
 
 import os
+import ast
 import hashlib
 from pathlib import Path
 from datetime import datetime
 from custom_warnings import space_in_arg_warning
 
+CACHE_DIR = ".scons_cache"
+"""Directory (relative to the tasks directory) for caches kept between builds."""
+
 
 def convert_scons_path(env, path_str):
     """
@@ -52,6 +56,19 @@ def create_log_file_path(env, source, ext):
     return log_file
 
 
+def create_target_log_file_path(env, target):
+    """
+    This function creates a log file path based on the first target,
+        for builders whose source is not a script (e.g., `JuliaSysimage`).
+    The log file replaces `output` with the log directory in the target path.
+    """
+    if env.get("LOG_FILE", ""):
+        return create_log_file_path(env, [target[0]], "")
+    log_dir = env.get("LOG_DIR", "logs")
+    parts = Path(os.path.abspath(str(target[0]))).with_suffix(".log").parts
+    return str(Path(*[part.replace("output", log_dir) for part in parts]))
+
+
 def parse_args(env, wrap_in_quotes=False):
     """
     This function is used to parse the command line arguments.
@@ -75,6 +92,77 @@ def parse_args(env, wrap_in_quotes=False):
     return parsed_args
 
 
+def parse_size(size: int | float | str) -> int:
+    """
+    Convert a size such as `2GB`, `500 MB`, or `1024` (bytes) to bytes.
+    Args:
+        size (int, float, or str): The size, optionally with a unit (B, KB, MB, GB, TB).
+    Returns:
+        int: The size in bytes.
+    Raises:
+        ValueError: If the size cannot be parsed.
+    """
+    if isinstance(size, (int, float)):
+        return int(size)
+    units = {"TB": 1e12, "GB": 1e9, "MB": 1e6, "KB": 1e3, "B": 1}
+    text = size.strip().upper()
+    for unit, multiplier in units.items():
+        if text.endswith(unit):
+            return int(float(text[: -len(unit)].strip()) * multiplier)
+    try:
+        return int(float(text))
+    except ValueError:
+        raise ValueError(f"Cannot parse the size `{size}`.") from None
+
+
+def format_duration(seconds: float) -> str:
+    """
+    Returns a run time such as `12.3 s`, `4.5 min`, or `1.2 h`.
+    """
+    if seconds >= 3600:
+        return f"{seconds / 3600:.1f} h"
+    if seconds >= 60:
+        return f"{seconds / 60:.1f} min"
+    return f"{seconds:.1f} s"
+
+
+def format_size(size: int | float) -> str:
+    """
+    Returns a size in bytes such as `512 B`, `1.5 MB`, or `2.0 GB`.
+    """
+    for unit, multiplier in [
+        ("TB", 1e12),
+        ("GB", 1e9),
+        ("MB", 1e6),
+        ("KB", 1e3),
+    ]:
+        if size >= multiplier:
+            return f"{size / multiplier:.1f} {unit}"
+    return f"{int(size)} B"
+
+
+def read_constant(path: str | Path, name: str):
+    """
+    Read a constant (e.g., `IMAGE_FORMATS`) assigned in a Python file without importing it,
+        so that SCons does not import the heavy libraries the file depends on.
+    Args:
+        path (str or Path): The Python file.
+        name (str): The name of the constant, which must be a literal.
+    Returns:
+        The value of the constant.
+    Raises:
+        KeyError: If the constant is not assigned in the file.
+    """
+    with open(path, "r", encoding="utf-8") as f:
+        tree = ast.parse(f.read(), filename=str(path))
+    for node in tree.body:
+        if isinstance(node, ast.Assign) and any(
+            isinstance(t, ast.Name) and t.id == name for t in node.targets
+        ):
+            return ast.literal_eval(node.value)
+    raise KeyError(f"`{name}` is not assigned in {path}.")
+
+
 def calculate_md5(filepath: str | Path) -> dict[str, str]:
     """
     Calculate MD5 hash of a file.
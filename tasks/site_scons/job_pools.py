@@ -0,0 +1,117 @@
+"""
+Shih-Hsuan Hsu
+October 18, 2026
+Named concurrency pools: at most `size` targets of a pool run at once,
+    while the other targets keep running in parallel
+    (e.g., rate-limited APIs or license-limited Stata seats).
+Define a pool with `env.DefinePool("fred", size=3)` and add a target to it
+    with `POOL="fred"` on any builder; a pool that is not defined has size 1.
+Targets waiting for their pool do not take a job slot: like targets waiting for
+    a `SideEffect`, they are set aside by the Taskmaster and put back on its
+    candidates when a target of the pool finishes (see `monkey_patches.py`).
+"""
+
+import time
+from helpers import format_duration
+
+JOB_POOLS = {}
+"""Store the pools, keyed by name."""
+
+RUNNING = {}
+"""Pools of the running targets: {node: pool}
+    (the executor of a node is released before its task is postprocessed)."""
+
+
+class JobPool:
+    """
+    A pool of at most `size` targets running at once.
+    """
+
+    def __init__(self, name, size=1):
+        self.name = name
+        self.size = size
+        self.running = 0
+        """Number of targets of the pool that are running."""
+        self.waiting = []
+        """Nodes set aside until a target of the pool finishes."""
+        self.waiting_since = {}
+        self.waited = 0.0
+        """Total time (in seconds) the targets waited for the pool."""
+        self.targets = 0
+        """Number of targets of the pool that were started."""
+
+    def try_acquire(self, node):
+        """
+        Returns True if the target can start now (the pool has a free slot),
+            otherwise sets the node aside and returns False.
+        """
+        if self.running >= self.size:
+            self.waiting.append(node)
+            self.waiting_since.setdefault(node, time.perf_counter())
+            return False
+        self.running += 1
+        self.targets += 1
+        RUNNING[node] = self
+        if node in self.waiting_since:
+            self.waited += time.perf_counter() - self.waiting_since.pop(node)
+        return True
+
+    def release(self):
+        """
+        Free the slot of a finished target.
+        Returns the nodes to put back on the candidates of the Taskmaster.
+        """
+        self.running -= 1
+        free = self.size - self.running
+        ready, self.waiting = self.waiting[:free], self.waiting[free:]
+        return ready
+
+    def summary(self):
+        """
+        Returns the summary of the pool.
+        """
+        return (
+            f"Pool {self.name} (size {self.size}): {self.targets} target(s), "
+            f"waited {format_duration(self.waited)}"
+        )
+
+
+def define_pool(env, name, size=1):
+    """
+    Define the pool `name`, which runs at most `size` targets at once
+        (attached to the environment as `DefinePool`).
+    """
+    size = int(size)
+    if size < 1:
+        raise ValueError(f"The size of the pool `{name}` must be at least 1.")
+    if name in JOB_POOLS:
+        JOB_POOLS[name].size = size
+    else:
+        JOB_POOLS[name] = JobPool(name, size)
+    return JOB_POOLS[name]
+
+
+def node_pool(node):
+    """
+    Returns the pool of a node (given by `POOL`), or None.
+    """
+    if not node.has_builder():
+        return None
+    executor = node.get_executor()
+    if executor is None:
+        return None
+    name = executor.get_build_env().get("POOL")
+    if not name:
+        return None
+    if name not in JOB_POOLS:
+        JOB_POOLS[name] = JobPool(name)
+    return JOB_POOLS[name]
+
+
+def release_node(node):
+    """
+    Free the pool slot of a finished target.
+    Returns the nodes to put back on the candidates of the Taskmaster.
+    """
+    pool = RUNNING.pop(node, None)
+    return pool.release() if pool is not None else []
@@ -0,0 +1,79 @@
+#=
+Shih-Hsuan Hsu
+October 18, 2026
+A resident Julia server for the Julia builder (see `worker_pool.py` for the protocol).
+Packages loaded and methods compiled by earlier scripts stay loaded,
+    so later scripts skip most of the package loading and JIT compilation.
+Each script runs in a fresh module, so variables do not leak between scripts.
+**NOTE**: calling `exit()` in a script stops the server; the builder then reports a failure.
+=#
+
+using Sockets
+
+"""
+Run `script` in a fresh module as `julia <script> <args>` would,
+    with the working directory set to `cwd` and the output appended to `log_file`.
+Returns 0 on success and 1 if the script throws an error.
+"""
+function run_script(cwd, log_file, script, args)
+    mod = Module(gensym("task"))
+    # mimic the `include` and `eval` available in `Main`
+    Core.eval(mod, :(include(path) = Base.include($mod, path)))
+    Core.eval(mod, :(eval(x) = Core.eval($mod, x)))
+    empty!(ARGS)
+    append!(ARGS, args)
+    returncode = 0
+    open(log_file, "a") do log
+        redirect_stdio(stdout=log, stderr=log) do
+            try
+                cd(cwd) do
+                    Base.include(mod, script)
+                end
+            catch error
+                showerror(stderr, error, catch_backtrace())
+                println(stderr)
+                returncode = 1
+            end
+        end
+    end
+    return returncode
+end
+
+"""
+Returns true if the strings are equal, in a time that does not depend on where they differ.
+"""
+function same_token(a, b)
+    a, b = codeunits(a), codeunits(b)
+    return length(a) == length(b) && reduce(|, a .⊻ b; init=0x00) == 0x00
+end
+
+"""
+Serve the scripts sent by SCons forever (only the requests carrying `WORKER_TOKEN`).
+"""
+function serve()
+    # the scripts (and their subprocesses) do not need the token
+    token = pop!(ENV, "WORKER_TOKEN", "")
+    isempty(token) && error("WORKER_TOKEN is not set; start workers from SCons.")
+    port, server = listenany(ip"127.0.0.1", 0)
+    println("PORT $port")
+    flush(stdout)
+    # nothing should be written to the console while idle
+    redirect_stdout(devnull)
+    redirect_stderr(devnull)
+    while true
+        conn = accept(server)
+        try
+            fields = String.(split(readline(conn), '\0'))
+            # ignore the requests not sent by SCons
+            if length(fields) >= 4 && same_token(fields[1], token)
+                cwd, log_file, script = fields[2:4]
+                returncode = run_script(cwd, log_file, script, fields[5:end])
+                write(conn, "$returncode\n")
+            end
+        finally
+            close(conn)
+        end
+    end
+end
+
+serve()
@@ -0,0 +1,143 @@
+"""
+Shih-Hsuan Hsu
+October 18, 2026
+A resident MATLAB session for the Matlab and Dynare builders
+    (see `worker_pool.py` for the protocol).
+The session is driven through `matlab.engine` if it is installed;
+    otherwise, the MATLAB command given in the command line
+    (e.g., `matlab -nodesktop -nosplash`) is started and fed statements over a pipe.
+Usage: python matlab_worker.py <MATLAB command>
+"""
+
+import io
+import os
+import sys
+import subprocess
+from worker_pool import ProcessUsage, serve
+
+DONE = "__SCONS_MATLAB_DONE__"
+"""Printed by the piped MATLAB session after each statement."""
+
+
+class EngineSession:
+    """
+    A MATLAB session driven through `matlab.engine`.
+    """
+
+    pid = None
+    """The MATLAB process is not known, so the usage of the jobs is not measured."""
+
+    def __init__(self):
+        import matlab.engine  # pylint: disable=import-error
+
+        self.engine = matlab.engine.start_matlab("-nodesktop -nosplash")
+
+    def eval(self, statement):
+        """
+        Evaluate the statement and return the output and the return code.
+        """
+        output = io.StringIO()
+        try:
+            self.engine.eval(statement, nargout=0, stdout=output, stderr=output)
+        except Exception as e:  # pylint: disable=broad-except
+            print(e, file=output)
+            return output.getvalue(), 1
+        return output.getvalue(), 0
+
+
+class PipeSession:
+    """
+    A MATLAB session that reads statements from its stdin.
+    """
+
+    def __init__(self, command):
+        self.process = subprocess.Popen(
+            command,
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.STDOUT,
+            text=True,
+            bufsize=1,
+        )
+        self.pid = self.process.pid
+        """The MATLAB process, whose usage is measured for each job."""
+
+    def eval(self, statement):
+        """
+        Evaluate the statement and return the output and the return code.
+        """
+        self.process.stdin.write(
+            f"try, {statement}, disp('{DONE} 0'), "
+            f"catch ERROR, disp(getReport(ERROR,'extended')), disp('{DONE} 1'), end\n"
+        )
+        self.process.stdin.flush()
+        output = []
+        for line in self.process.stdout:
+            if line.strip().endswith((f"{DONE} 0", f"{DONE} 1")):
+                return "".join(output), int(line.strip()[-1])
+            output.append(line)
+        # MATLAB exited (e.g., `exit` was called in the script)
+        output.append("MATLAB session exited.\n")
+        return "".join(output), 1
+
+
+def quote(text):
+    """
+    Quote a string for MATLAB.
+    """
+    return "'" + text.replace("'", "''") + "'"
+
+
+def args_statement(args):
+    """
+    Returns the statement setting `ARGS` to the arguments of the script,
+        or, without arguments, restoring the `ARGS` the session started with
+        (unset if none), so that the arguments of a job do not leak into the next one.
+    """
+    if args:
+        return f"setenv('ARGS', {quote(args[0])});"
+    if "ARGS" in os.environ:
+        return f"setenv('ARGS', {quote(os.environ['ARGS'])});"
+    # `unsetenv` was added in MATLAB R2022b
+    return (
+        "if exist('unsetenv'), unsetenv('ARGS'); else, setenv('ARGS', ''); end;"
+    )
+
+
+def job_statement(cwd, statement, args):
+    """
+    Returns the statement running `statement` in a cleared workspace in `cwd`,
+        with `ARGS` set to the arguments (if any).
+    """
+    return (
+        "clear all; close all force; "
+        f"cd({quote(cwd)}); {args_statement(args)} {statement}"
+    )
+
+
+def start_session(command):
+    """
+    Start a MATLAB session, preferring `matlab.engine`.
+    """
+    try:
+        return EngineSession()
+    except ImportError:
+        return PipeSession(command)
+
+
+if __name__ == "__main__":
+    session = start_session(sys.argv[1:])
+
+    def run_statement(cwd, log_file, statement, args):
+        """
+        Run the statement in a cleared workspace with `ARGS` set (if given),
+            and append the output to the log file.
+        Returns (return code, usage of the MATLAB process, if known).
+        """
+        usage = ProcessUsage(session.pid) if session.pid else None
+        output, returncode = session.eval(job_statement(cwd, statement, args))
+        with open(log_file, "a", encoding="utf-8") as log:
+            log.write(output)
+        return returncode, usage.stop() if usage else None
+
+    serve(run_statement)
@@ -5,6 +5,7 @@ This file stores the methods for the SCons environment.
 """
 
 import os
+import json
 from pathlib import Path
 from itertools import chain
 import filecmp
@@ -97,9 +98,7 @@ def make_links(
         return list(
             chain(
                 *[
-                    make_link_now(
-                        self=self, target=t, source=s, COPY=COPY, SUBS=SUBS
-                    )
+                    self.LinkNow(target=t, source=s, COPY=COPY, SUBS=SUBS)
                     for t, s in zip(target, source)
                 ]
             )
@@ -171,3 +170,75 @@ def download_files(self, target: list, source: list, *args, **kwargs):
             ]
         )
     )
+
+
+def fred_downloads(self, target: list, source: list, *args, **kwargs):
+    """
+    Download FRED series (source, e.g., `"FEDFUNDS"`) to CSV or Parquet files (target)
+        in one process that fetches them concurrently (see `common/code/fred_batch.py`).
+    The order of the target files and the series must match.
+    The downloads share the pool `fred` (one batch at a time unless `env.DefinePool`
+        gives it more), since the batches share the rate limit of the API keys.
+    Set `FULL_REFRESH=True` to download the full history of the series at every build
+        instead of refreshing the cached series (see `common/code/fred_cache.py`).
+    """
+    # type conversion
+    if not isinstance(target, list):
+        target = [target]
+    if not isinstance(source, list):
+        source = [source]
+    # check if the number of target files is the same as the number of series
+    if len(target) != len(source):
+        raise ValueError(
+            "The number of target files must be the same as the number of series."
+        )
+    # convert '#' to project root path
+    target_abspaths = [
+        Path(os.path.abspath(convert_scons_path(self, t))) for t in target
+    ]
+    # use the first target name as the log file name
+    log_file = self.get("LOG_FILE", None)
+    log_dir = self.get("LOG_DIR", "logs")
+    if log_file is None:
+        parts = target_abspaths[0].with_suffix(".log").parts
+        log_file = Path(*[part.replace("output", log_dir) for part in parts])
+    kwargs.setdefault("POOL", "fred")
+    full_refresh = kwargs.pop("FULL_REFRESH", self.get("FULL_REFRESH", False))
+    if full_refresh:
+        # the artifact cache would restore the previous download
+        kwargs["CACHE"] = False
+    nodes = self.Python(
+        target=[str(path) for path in target_abspaths],
+        # the script runs first; the modules it imports are also sources
+        source=["#/common/code/fred_batch.py", "#/common/code/fred_cache.py"],
+        ARGS=[f"{s}={path}" for s, path in zip(source, target_abspaths)]
+        + (["--full"] if full_refresh else []),
+        LOG_FILE=str(log_file),
+        **kwargs,
+    )
+    if full_refresh:
+        # download the full history at every build, ignoring the local cache
+        self.AlwaysBuild(nodes)
+    # rebuild when the series change (the arguments are not part of the signature)
+    self.Depends(
+        nodes, self.Value(json.dumps(list(zip(source, map(str, target)))))
+    )
+    # keep the files before the rebuild, so that unchanged series are not rewritten
+    self.Precious(nodes)
+    return nodes
+
+
+def julia_sysimage(self, target, source, *args, **kwargs):
+    """
+    Build a Julia sysimage with PackageCompiler and start all Julia targets with it.
+    The first source must be the `Project.toml` of the Julia project
+        (also pass `Manifest.toml`, so the sysimage is rebuilt when it changes).
+    Set `PACKAGES` to choose the packages (default: all packages in `Project.toml`).
+    """
+    if isinstance(target, list):
+        if len(target) != 1:
+            raise ValueError("The target must be one sysimage file.")
+        target = target[0]
+    # Julia builders look up the sysimage in the environment when they run
+    self["JULIA_SYSIMAGE"] = self.File(convert_scons_path(self, target)).abspath
+    return self.Sysimage(target=target, source=source, *args, **kwargs)
@@ -27,3 +27,114 @@ def override_warn():
 
     # Override the SCons warning function
     SCons.Warnings.warn = collecting_warn
+
+
+def patch_set_aside():
+    """
+    Patch the SCons Taskmaster so that a target whose pool (`POOL=`) is full,
+        or whose declared resources (`CPUS=`, `MEM=`) do not fit, is set aside
+        instead of taking a job slot (see `job_pools.py` and `resources.py`).
+    """
+    import SCons.Taskmaster
+    import job_pools
+    import resources
+
+    orig_find_next_ready_node = (
+        SCons.Taskmaster.Taskmaster._find_next_ready_node
+    )
+    orig_postprocess = SCons.Taskmaster.Task.postprocess
+
+    def find_next_ready_node(self):
+        """
+        Returns the next ready node whose pool has a free slot
+            and whose declared resources fit.
+        """
+        while True:
+            node = orig_find_next_ready_node(self)
+            if node is None or self.ready_exc is not None:
+                # a node that failed (e.g., to scan) is returned to report its error
+                return node
+            if not resources.try_acquire_node(node):
+                continue
+            pool = job_pools.node_pool(node)
+            if pool is not None and not pool.try_acquire(node):
+                resources.release_node(node)
+                continue
+            # the targets waiting for resources may fit next to this one
+            self.candidates.extend(reversed(resources.waiting_nodes()))
+            return node
+
+    def postprocess(self):
+        """
+        Free the pool slot and the resources of the target and put the waiting targets back
+            (the first target to wait is tried first, since SCons pops the candidates).
+        """
+        orig_postprocess(self)
+        resources.release_node(self.node)
+        self.tm.candidates.extend(
+            reversed(
+                job_pools.release_node(self.node) + resources.waiting_nodes()
+            )
+        )
+
+    SCons.Taskmaster.Taskmaster._find_next_ready_node = find_next_ready_node
+    SCons.Taskmaster.Task.postprocess = postprocess
+
+
+def patch_critical_path_first():
+    """
+    Patch the SCons Taskmaster so that, among the ready targets, the one with the
+        longest remaining critical path is started first (see `scheduling.py`).
+    """
+    import heapq
+    import itertools
+    import SCons.Taskmaster
+    from scheduling import critical_path_priorities, unit_of
+
+    orig_find_next_ready_node = (
+        SCons.Taskmaster.Taskmaster._find_next_ready_node
+    )
+
+    def find_next_ready_node(self):
+        """
+        Returns the ready node with the longest remaining critical path.
+        """
+        if not hasattr(self, "ready_nodes"):
+            self.ready_nodes = []
+            # ready nodes stay pending until started, so SCons can find them
+            # (or another target of their builder call) again
+            self.queued_units = set()
+            # ties are started in the order SCons found them ready
+            self.ready_order = itertools.count()
+            self.priorities = critical_path_priorities(self.original_top)
+        # collect all the nodes that are ready now
+        while True:
+            node = orig_find_next_ready_node(self)
+            if node is None:
+                break
+            if self.ready_exc is not None:
+                # the node failed to scan (or asked to exit): return it now, since
+                #   the next call would clear `ready_exc` and the node would run
+                return node
+            unit = unit_of(node)
+            if unit in self.queued_units:
+                continue
+            self.queued_units.add(unit)
+            priority = self.priorities.get(unit, 0)
+            heapq.heappush(
+                self.ready_nodes, (-priority, next(self.ready_order), node)
+            )
+        while self.ready_nodes:
+            node = heapq.heappop(self.ready_nodes)[2]
+            self.queued_units.discard(unit_of(node))
+            # a side effect of the node may have started since it was ready
+            wait_side_effects = False
+            for side_effect in node.get_executor().get_action_side_effects():
+                if side_effect.get_state() == SCons.Taskmaster.NODE_EXECUTING:
+                    side_effect.add_to_waiting_s_e(node)
+                    wait_side_effects = True
+            if not wait_side_effects:
+                return node
+        return None
+
+    SCons.Taskmaster.Taskmaster._find_next_ready_node = find_next_ready_node
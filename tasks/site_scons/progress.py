@@ -0,0 +1,206 @@
+"""
+Shih-Hsuan Hsu
+October 18, 2026
+Estimate the cost of a build from the run times of the previous builds
+    (see `build_history.py`), and show the progress of the build.
+`scons --estimate` prints the targets that would be rebuilt and the predicted
+    wall time with the current `-j`, without building anything.
+`scons --progress` prints, every few seconds, the targets done, the running targets
+    (elapsed time versus expected time), and the estimated time remaining.
+"""
+
+import sys
+import time
+import threading
+import statistics
+import build_history
+from helpers import format_duration
+
+PROGRESS_INTERVAL = 10
+"""Seconds between two progress reports (`PROGRESS_INTERVAL`)."""
+
+
+def rebuild_set(env, targets):
+    """
+    Returns {node: [children to rebuild]} of the targets that would be rebuilt
+        to build `targets`: the out-of-date targets and the targets downstream of them.
+    Only the targets whose upstream targets are all up to date are checked,
+        so the signatures computed here do not change during the build.
+    """
+    from SCons.Node.FS import Dir
+
+    roots = env.arg2nodes(targets or ["."], env.fs.Entry)
+    rebuild = {}
+    done = set()
+    stack = [(node, False) for node in roots]
+    while stack:
+        node, expanded = stack.pop()
+        if node in done:
+            continue
+        children = node.children()
+        if not expanded:
+            stack.append((node, True))
+            stack.extend((c, False) for c in children if c not in done)
+            continue
+        done.add(node)
+        # folders only collect their entries
+        if isinstance(node, Dir) or not node.has_builder():
+            continue
+        upstream = [child for child in children if child in rebuild]
+        if upstream or node.always_build or not node.is_up_to_date():
+            rebuild[node] = upstream
+    return rebuild
+
+
+def action_nodes(rebuild):
+    """
+    Returns the nodes of `rebuild` that run an action
+        (the first target of each builder call; aliases and side targets are skipped).
+    """
+    from SCons.Node.Alias import Alias
+
+    return [
+        node
+        for node in rebuild
+        if not isinstance(node, Alias)
+        and node.get_executor().get_all_targets()[0] is node
+    ]
+
+
+def expected_durations(nodes, durations):
+    """
+    Returns ({node: expected run time}, number of nodes without a previous run).
+    The nodes without a previous run are expected to take the median run time.
+    """
+    default = statistics.median(durations.values()) if durations else 0
+    expected = {}
+    unknown = 0
+    for node in nodes:
+        path = str(node)
+        if path not in durations:
+            unknown += 1
+        expected[node] = durations.get(path, default)
+    return expected, unknown
+
+
+def critical_time(rebuild, expected):
+    """
+    Returns the run time of the longest chain of targets to rebuild.
+    """
+    finish = {}
+    # `rebuild` is in post-order, so upstream targets come first
+    for node, upstream in rebuild.items():
+        finish[node] = expected.get(node, 0) + max(
+            (finish[child] for child in upstream), default=0
+        )
+    return max(finish.values(), default=0)
+
+
+def estimate(env, targets, jobs):
+    """
+    Returns the estimate of a build:
+        {"targets", "unknown", "work", "critical", "wall", "expected"},
+        where `work` is the sum of the run times, `critical` the longest chain,
+        and `wall` the predicted wall time with `jobs` jobs.
+    """
+    rebuild = rebuild_set(env, targets)
+    nodes = action_nodes(rebuild)
+    expected, unknown = expected_durations(
+        nodes, build_history.load_durations()
+    )
+    work = sum(expected.values())
+    critical = critical_time(rebuild, expected)
+    return {
+        "targets": len(nodes),
+        "unknown": unknown,
+        "work": work,
+        "critical": critical,
+        "wall": max(critical, work / max(jobs, 1)),
+        "expected": {str(node): time for node, time in expected.items()},
+    }
+
+
+def print_estimate(result, jobs, top=10):
+    """
+    Print the estimate of a build (`scons --estimate`).
+    """
+    print(f"scons: Estimate ({jobs} job{'s' if jobs > 1 else ''}):")
+    print(f"\t{result['targets']} target(s) to build", end="")
+    if result["unknown"]:
+        print(
+            f", {result['unknown']} never built before "
+            "(counted at the median run time)",
+            end="",
+        )
+    print()
+    print(f"\t{format_duration(result['work']):>9}  total run time")
+    print(f"\t{format_duration(result['critical']):>9}  longest chain")
+    print(f"\t{format_duration(result['wall']):>9}  predicted wall time")
+    slowest = sorted(result["expected"].items(), key=lambda item: -item[1])
+    for target, seconds in slowest[:top]:
+        print(f"\t\t{format_duration(seconds):>9}  {target}")
+
+
+class ProgressReporter:
+    """
+    Print the progress of the build every `interval` seconds (in a daemon thread).
+    """
+
+    def __init__(self, result, jobs, interval=PROGRESS_INTERVAL):
+        self.expected = result["expected"]
+        self.jobs = max(jobs, 1)
+        self.interval = interval
+        self.start = time.time()
+        self.thread = threading.Thread(
+            target=self.run, name="progress", daemon=True
+        )
+
+    def report(self):
+        """
+        Returns the progress report.
+        """
+        now = time.time()
+        with build_history._RECORDS_LOCK:
+            finished = {record["target"] for record in build_history.RECORDS}
+            running = list(build_history.RUNNING.values())
+        started = finished | {target for target, _ in running}
+        # the remaining time of the running targets, and all of the others
+        running_remaining = [
+            max(self.expected.get(target, 0) - (now - start), 0)
+            for target, start in running
+        ]
+        remaining = sum(running_remaining) + sum(
+            seconds
+            for target, seconds in self.expected.items()
+            if target not in started
+        )
+        # the build cannot end before its slowest running target
+        eta = max([remaining / self.jobs] + running_remaining)
+        done = len(finished & self.expected.keys())
+        lines = [
+            f"scons: [{done}/{len(self.expected)} targets, {len(running)} running] "
+            f"elapsed {format_duration(now - self.start)}, "
+            f"ETA {format_duration(eta)}"
+        ]
+        for target, start in sorted(running, key=lambda item: item[1]):
+            expected = self.expected.get(target)
+            expected = f"~{format_duration(expected)}" if expected else "?"
+            lines.append(
+                f"\t{format_duration(now - start):>9} / {expected:<10} {target}"
+            )
+        return "\n".join(lines)
+
+    def run(self):
+        """
+        Print a progress report every `interval` seconds.
+        """
+        while True:
+            time.sleep(self.interval)
+            print(self.report(), file=sys.stderr, flush=True)
+
+    def start_reporting(self):
+        """
+        Start printing the progress reports.
+        """
+        if self.expected:
+            self.thread.start()
@@ -0,0 +1,96 @@
+"""
+Shih-Hsuan Hsu
+October 18, 2026
+A prefork server for the Python builder.
+The server imports the heavy libraries once, then forks a child for each script,
+    so the scripts do not pay the import cost again.
+Usage: python python_worker.py <module to preload> <module to preload> ...
+"""
+
+import os
+import sys
+import runpy
+import atexit
+import threading
+import traceback
+import importlib
+from worker_pool import serve
+
+
+def preload(modules: list):
+    """
+    Import the modules so that the forked children inherit them.
+    Modules that cannot be imported are skipped.
+    """
+    for module in modules:
+        try:
+            importlib.import_module(module)
+        except ImportError as e:
+            print(f"Skip preloading {module}: {e}", file=sys.stderr)
+
+
+def exit_code(e: SystemExit) -> int:
+    """
+    Convert the code of a SystemExit to a return code like `python` does.
+    """
+    if e.code is None:
+        return 0
+    if isinstance(e.code, int):
+        return e.code
+    print(e.code, file=sys.stderr)
+    return 1
+
+
+def run_script(
+    cwd: str, log_file: str, script: str, args: list
+) -> tuple[int, tuple[float, float, int]]:
+    """
+    Fork a child to run the script as `python <script> <args>` in `cwd`,
+        with the output appended to the log file.
+    The child exits like `python` (threads joined, atexit functions run, output flushed).
+    Returns (return code, (user CPU, system CPU, peak RSS in bytes)) of the child.
+    """
+    pid = os.fork()
+    if pid == 0:
+        returncode = 1
+        try:
+            with open(log_file, "a", encoding="utf-8") as log:
+                os.dup2(log.fileno(), 1)
+                os.dup2(log.fileno(), 2)
+            os.chdir(cwd)
+            # mimic `python <script> <args>`
+            sys.argv = [script] + args
+            sys.path[0] = cwd
+            try:
+                runpy.run_path(script, run_name="__main__")
+                returncode = 0
+            except SystemExit as e:
+                returncode = exit_code(e)
+            except BaseException:
+                traceback.print_exc()
+        finally:
+            # exit like `python` does: wait for the non-daemon threads and run
+            #   the atexit functions (e.g., flushing files and logging handlers)
+            try:
+                threading._shutdown()  # pylint: disable=protected-access
+                atexit._run_exitfuncs()  # pylint: disable=protected-access
+            except BaseException:  # pylint: disable=broad-except
+                traceback.print_exc()
+            sys.stdout.flush()
+            sys.stderr.flush()
+            os._exit(returncode)
+    _, status, rusage = os.wait4(pid, 0)
+    peak_rss = rusage.ru_maxrss
+    if sys.platform != "darwin":
+        # kilobytes on Linux
+        peak_rss *= 1024
+    return os.waitstatus_to_exitcode(status), (
+        rusage.ru_utime,
+        rusage.ru_stime,
+        peak_rss,
+    )
+
+
+if __name__ == "__main__":
+    preload(sys.argv[1:])
+    serve(run_script)
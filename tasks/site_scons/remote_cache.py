@@ -0,0 +1,218 @@
+"""
+Shih-Hsuan Hsu
+October 18, 2026
+Client for a shared artifact cache served over HTTP (see `cache_server.py`).
+Entries are pulled into (and pushed from) the local artifact cache,
+    using the same keys, so a new machine can download targets built by others.
+Files are transferred in parallel and verified with their SHA-256 hash.
+Every request carries the shared token of the server (`REMOTE_CACHE_TOKEN`,
+    default: the contents of `secrets/remote_cache.txt`), and manifests that would
+    restore other files than the targets of the action are rejected.
+If the server cannot be reached, the build continues with the local cache only.
+"""
+
+import os
+import json
+import shutil
+import tempfile
+import threading
+import http.client
+import urllib.error
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+from artifact_store import hash_file, check_manifest
+from custom_warnings import remote_cache_warning
+
+REMOTES = {}
+"""Store the remote caches that have been used, keyed by URL."""
+
+_REMOTES_LOCK = threading.Lock()
+
+REMOTE_CACHE_JOBS = 8
+"""Default number of parallel transfers (`REMOTE_CACHE_JOBS`)."""
+
+REMOTE_CACHE_TIMEOUT = 10
+"""Default timeout in seconds for each request (`REMOTE_CACHE_TIMEOUT`)."""
+
+TOKEN_FILE = "#/../secrets/remote_cache.txt"
+"""File storing the shared token of the server (if `REMOTE_CACHE_TOKEN` is not set)."""
+
+
+class RemoteCache:
+    """
+    A shared artifact cache on an HTTP server.
+    """
+
+    def __init__(self, url, jobs, timeout, token=""):
+        self.url = url.rstrip("/")
+        self.jobs = jobs
+        self.timeout = timeout
+        self.headers = {"Authorization": f"Bearer {token}"} if token else {}
+        self.available = True
+        self.hits = 0
+        self.misses = 0
+        self.pushed = 0
+        self.lock = threading.Lock()
+
+    def request(self, method, path, data=None):
+        """
+        Send a request and return the response body (None if not found).
+        """
+        request = urllib.request.Request(
+            f"{self.url}{path}", data=data, method=method, headers=self.headers
+        )
+        try:
+            with urllib.request.urlopen(request, timeout=self.timeout) as r:
+                return r.read()
+        except urllib.error.HTTPError as e:
+            if e.code == 404:
+                return None
+            raise
+
+    def disable(self, error):
+        """
+        Stop using the server for the rest of the build.
+        """
+        with self.lock:
+            if self.available:
+                self.available = False
+                remote_cache_warning(
+                    f"Remote cache {self.url} is unavailable ({error}); "
+                    "using the local cache only."
+                )
+
+    def download(self, sha256, path):
+        """
+        Download a file and verify its hash.
+        """
+        request = urllib.request.Request(
+            f"{self.url}/cas/{sha256}", headers=self.headers
+        )
+        with urllib.request.urlopen(request, timeout=self.timeout) as r, open(
+            path, "wb"
+        ) as f:
+            shutil.copyfileobj(r, f)
+        if hash_file(path) != sha256:
+            raise ValueError(f"Corrupted download: {sha256}")
+
+    def upload(self, sha256, path):
+        """
+        Upload a file unless the server already has it.
+        """
+        if self.request("HEAD", f"/cas/{sha256}") is not None:
+            return
+        with open(path, "rb") as f:
+            self.request("PUT", f"/cas/{sha256}", f.read())
+
+    def pull(self, key, store, allowed_paths=None):
+        """
+        Download an entry into the local store.
+        Only entries restoring exactly `allowed_paths` (relative paths) are accepted.
+        Returns True if the entry was found on the server.
+        """
+        if not self.available:
+            return False
+        try:
+            body = self.request("GET", f"/ac/{key}")
+            if body is None:
+                with self.lock:
+                    self.misses += 1
+                return False
+            manifest = json.loads(body)
+            try:
+                check_manifest(manifest, allowed_paths)
+            except ValueError as e:
+                print(f"Ignoring remote cache entry {key}: {e}")
+                with self.lock:
+                    self.misses += 1
+                return False
+            with tempfile.TemporaryDirectory() as tmp_dir:
+                files = {
+                    item["path"]: os.path.join(tmp_dir, item["sha256"])
+                    for item in manifest["files"]
+                }
+                hashes = {item["sha256"] for item in manifest["files"]}
+                with ThreadPoolExecutor(self.jobs) as executor:
+                    list(
+                        executor.map(
+                            lambda sha256: self.download(
+                                sha256, os.path.join(tmp_dir, sha256)
+                            ),
+                            hashes,
+                        )
+                    )
+                store.put(key, files, manifest.get("metadata"))
+        except (OSError, ValueError, KeyError, http.client.HTTPException) as e:
+            # OSError includes URLError and timeouts,
+            # HTTPException includes responses cut short (IncompleteRead)
+            self.disable(e)
+            return False
+        with self.lock:
+            self.hits += 1
+        return True
+
+    def push(self, key, store):
+        """
+        Upload an entry of the local store to the server.
+        """
+        if not self.available:
+            return
+        manifest = store.manifest(key)
+        if manifest is None:
+            return
+        entry_dir = store.entry_dir(key)
+        try:
+            hashes = {item["sha256"] for item in manifest["files"]}
+            with ThreadPoolExecutor(self.jobs) as executor:
+                list(
+                    executor.map(
+                        lambda sha256: self.upload(
+                            sha256, os.path.join(entry_dir, sha256)
+                        ),
+                        hashes,
+                    )
+                )
+            # upload the manifest last, so it only refers to uploaded files
+            self.request(
+                "PUT", f"/ac/{key}", json.dumps(manifest).encode("utf-8")
+            )
+        except (OSError, http.client.HTTPException) as e:
+            self.disable(e)
+            return
+        with self.lock:
+            self.pushed += 1
+
+    def summary(self):
+        """
+        Returns a one-line summary of the remote cache statistics.
+        """
+        status = "" if self.available else " (unavailable)"
+        return (
+            f"Remote cache {self.url}{status}: {self.hits} hit(s), "
+            f"{self.misses} miss(es), {self.pushed} pushed"
+        )
+
+
+def get_remote_cache(env):
+    """
+    Returns the remote cache at `REMOTE_CACHE_URL`, or None if it is not set.
+    """
+    url = env.get("REMOTE_CACHE_URL", "")
+    if not url:
+        return None
+    token = env.get("REMOTE_CACHE_TOKEN", "")
+    token_file = env.File(TOKEN_FILE).abspath
+    if not token and os.path.exists(token_file):
+        with open(token_file, "r", encoding="utf-8") as f:
+            token = f.read().strip()
+    with _REMOTES_LOCK:
+        if url not in REMOTES:
+            REMOTES[url] = RemoteCache(
+                url,
+                jobs=int(env.get("REMOTE_CACHE_JOBS", REMOTE_CACHE_JOBS)),
+                timeout=float(
+                    env.get("REMOTE_CACHE_TIMEOUT", REMOTE_CACHE_TIMEOUT)
+                ),
+                token=token,
+            )
+        return REMOTES[url]
@@ -0,0 +1,245 @@
+"""
+Shih-Hsuan Hsu
+October 18, 2026
+Resource-aware scheduling of the build actions.
+Targets can declare the CPUs and memory they use, e.g.,
+    `env.Stata(..., CPUS=8)` or `env.Python(..., MEM="60GB")`
+    (a target of these builders that declares nothing counts as 1 CPU;
+    the other builders, e.g., `Copy`, are only limited by `-j`).
+A target only starts when its declaration fits in what the other running
+    targets left of the machine (`MACHINE_CPUS` and `MACHINE_MEM`, default: all the CPUs
+    and the physical memory). Like targets waiting for their pool (see `job_pools.py`),
+    it is set aside by the Taskmaster without taking a job slot, and the waiting targets
+    start in the order they became ready, so a large declaration is not starved
+    by a stream of small ones.
+The scripts are also told how many threads to use (BLAS, OpenMP, Julia, and Stata MP):
+    the CPUs declared with `CPUS`, or the CPUs of the machine divided by the jobs
+    (disable it with `THREAD_BUDGET=False`).
+"""
+
+import os
+import time
+import threading
+import auto_jobs
+from helpers import parse_size
+
+RESOURCE_BUILDERS = [
+    "Python",
+    "Stata",
+    "Julia",
+    "Sysimage",
+    "Matlab",
+    "Dynare",
+    "PDF",
+]
+"""Builders that accept `CPUS=` and `MEM=`."""
+
+THREAD_VARIABLES = [
+    "OMP_NUM_THREADS",
+    "OPENBLAS_NUM_THREADS",
+    "MKL_NUM_THREADS",
+    "VECLIB_MAXIMUM_THREADS",
+    "NUMEXPR_NUM_THREADS",
+    "JULIA_NUM_THREADS",
+    "STATA_PROCESSORS",
+]
+"""Environment variables set to the thread budget of a script
+    (`STATA_PROCESSORS` is read by `run_do_file.py` to `set processors`)."""
+
+GATES = {}
+"""Store the resource gates, keyed by (CPUs, memory)."""
+
+_GATES_LOCK = threading.Lock()
+
+RUNNING = {}
+"""Reservations of the running targets: {node: (gate, CPUs, memory)}."""
+
+RESOURCE_WAIT_THRESHOLD = 1.0
+"""The time waited for resources is only reported above this many seconds."""
+
+
+def physical_memory():
+    """
+    Returns the physical memory of the machine in bytes (None if unknown).
+    """
+    try:
+        return os.sysconf("SC_PHYS_PAGES") * os.sysconf("SC_PAGE_SIZE")
+    except (ValueError, OSError, AttributeError):
+        # e.g., on Windows
+        return None
+
+
+class ResourceGate:
+    """
+    Admit targets while their declared CPUs and memory fit in the totals,
+        in the order they became ready.
+    """
+
+    def __init__(self, cpus, mem):
+        self.cpus = cpus
+        self.mem = mem
+        self.used_cpus = 0
+        self.used_mem = 0
+        self.queue = {}
+        """Targets set aside, in the order they became ready: {unit: node}
+            (keyed by their builder call, since SCons may return any of its targets)."""
+        self.waiting_since = {}
+        self.waited = 0.0
+        """Total time (in seconds) targets waited for resources."""
+
+    def try_acquire(self, node, cpus, mem):
+        """
+        Returns True and reserves the resources if the target can start now,
+            otherwise sets the node aside and returns False.
+        A target starts if it fits and no target that became ready before it is waiting.
+        A declaration larger than the totals is reduced to the totals,
+            so that the target runs alone instead of waiting forever.
+        """
+        from scheduling import unit_of
+
+        unit = unit_of(node)
+        cpus = min(cpus, self.cpus)
+        mem = min(mem, self.mem) if self.mem is not None else 0
+        first = not self.queue or next(iter(self.queue)) is unit
+        fits = self.used_cpus + cpus <= self.cpus and (
+            self.mem is None or self.used_mem + mem <= self.mem
+        )
+        if not first or not fits:
+            self.queue.setdefault(unit, node)
+            self.waiting_since.setdefault(unit, time.perf_counter())
+            return False
+        self.queue.pop(unit, None)
+        if unit in self.waiting_since:
+            self.waited += time.perf_counter() - self.waiting_since.pop(unit)
+        self.used_cpus += cpus
+        self.used_mem += mem
+        RUNNING[node] = (self, cpus, mem)
+        return True
+
+    def waiting_nodes(self):
+        """
+        Returns the nodes set aside, in the order they became ready.
+        """
+        return list(self.queue.values())
+
+    def release(self, cpus, mem):
+        """
+        Release the resources reserved by `try_acquire`.
+        """
+        self.used_cpus -= cpus
+        self.used_mem -= mem
+
+
+def machine_cpus(env):
+    """
+    Returns the CPUs shared by the targets (`MACHINE_CPUS`, default: all the CPUs),
+        also used by `AUTO_JOBS=1` (see `auto_jobs.py`).
+    """
+    return int(env.get("MACHINE_CPUS", 0) or os.cpu_count() or 1)
+
+
+def get_gate(env):
+    """
+    Returns the resource gate for the machine totals of the environment.
+    """
+    cpus = machine_cpus(env)
+    mem = env.get("MACHINE_MEM", 0)
+    mem = parse_size(mem) if mem else physical_memory()
+    with _GATES_LOCK:
+        if (cpus, mem) not in GATES:
+            GATES[(cpus, mem)] = ResourceGate(cpus, mem)
+        return GATES[(cpus, mem)]
+
+
+def declared_resources(env):
+    """
+    Returns the (CPUs, memory in bytes) declared by a target with `CPUS` and `MEM`
+        (1 CPU and no memory if not declared).
+    """
+    cpus = int(env.get("CPUS", 1) or 0)
+    if cpus < 1:
+        raise ValueError(f"CPUS must be at least 1, got {env['CPUS']}.")
+    return cpus, parse_size(env.get("MEM", 0) or 0)
+
+
+def is_resource_target(node, env):
+    """
+    Returns True if the target is built by one of `RESOURCE_BUILDERS`.
+    """
+    for name in RESOURCE_BUILDERS:
+        builder = env["BUILDERS"].get(name)
+        # the builders are wrapped by `site_init.add_post_action_to_all`
+        if builder is not None and node.builder is getattr(
+            builder, "builder", builder
+        ):
+            return True
+    return False
+
+
+def try_acquire_node(node):
+    """
+    Returns True if the target can start now (it is not built by one of
+        `RESOURCE_BUILDERS`, or its resources fit), otherwise sets the node aside
+        and returns False.
+    """
+    if not node.has_builder():
+        return True
+    executor = node.get_executor()
+    if executor is None:
+        return True
+    env = executor.get_build_env()
+    if not is_resource_target(node, env):
+        return True
+    cpus, mem = declared_resources(env)
+    return get_gate(env).try_acquire(node, cpus, mem)
+
+
+def release_node(node):
+    """
+    Release the resources reserved by a target that finished (or did not start).
+    """
+    reservation = RUNNING.pop(node, None)
+    if reservation is not None:
+        gate, cpus, mem = reservation
+        gate.release(cpus, mem)
+
+
+def waiting_nodes():
+    """
+    Returns the nodes waiting for resources, in the order they became ready.
+    """
+    return [node for gate in GATES.values() for node in gate.waiting_nodes()]
+
+
+def time_waited():
+    """
+    Returns the total time (in seconds) targets waited for resources.
+    """
+    return sum(gate.waited for gate in GATES.values())
+
+
+def thread_budget(env):
+    """
+    Returns the number of threads of a script: the CPUs declared with `CPUS`,
+        or the CPUs of the machine divided by the jobs that can run at once
+        (`-j`, or the current limit with `AUTO_JOBS=1`).
+    """
+    from SCons.Script import GetOption
+
+    if "CPUS" in env:
+        return declared_resources(env)[0]
+    cpus = machine_cpus(env)
+    controller = auto_jobs.CONTROLLER
+    jobs = controller.limit if controller else GetOption("num_jobs") or 1
+    return max(cpus // jobs, 1)
+
+
+def thread_environment(env):
+    """
+    Returns the environment of a script with its thread budget,
+        or None to inherit the environment of SCons (`THREAD_BUDGET=False`).
+    """
+    if not env.get("THREAD_BUDGET", True):
+        return None
+    threads = str(thread_budget(env))
+    return {**os.environ, **{name: threads for name in THREAD_VARIABLES}}
@@ -7,6 +7,7 @@ This file contains a function that runs a Stata do file.
 
 import sys
 import os
+from worker_pool import ProcessUsage, serve, redirect_output
 
 # run the Stata configuration (stata_config.py)
 with open(os.environ["STATA_CONFIG_PATH"], "r", encoding="utf-8") as f:
@@ -21,6 +22,12 @@ def run_do_file(stata_file: str, stata_args: str) -> int:
     """
     # initialize a Stata session
     stata = stata_init()
+    # use the thread budget of the do file (Stata MP, see `resources.py`)
+    if os.environ.get("STATA_PROCESSORS"):
+        stata.run(
+            f"capture set processors {os.environ['STATA_PROCESSORS']}",
+            quietly=True,
+        )
     # convert list of arguments to a string
     if isinstance(stata_args, list):
         stata_args = " ".join(stata_args)
@@ -34,7 +41,34 @@ def run_do_file(stata_file: str, stata_args: str) -> int:
     return 0
 
 
+def run_job(
+    cwd: str, log_file: str, stata_file: str, stata_args: list
+) -> tuple:
+    """
+    This function is used by the Stata worker to run a do file
+        in a cleared Stata session, with the output appended to the log file.
+    cwd (str): the directory to run the do file in.
+    log_file (str): the path to the log file.
+    stata_file (str): the path to the Stata do file (relative to cwd).
+    stata_args (list): the arguments to pass to the Stata do file.
+    Returns (return code, usage of the worker process while running the do file).
+    """
+    # Stata runs in this process, so its usage is the usage of the job
+    usage = ProcessUsage(os.getpid())
+    with redirect_output(log_file):
+        os.chdir(cwd)
+        stata = stata_init()
+        # start from a clean session and the same working directory
+        stata.run("clear all", quietly=True)
+        stata.run(f'cd "{cwd}"', quietly=True)
+        returncode = run_do_file(stata_file, stata_args)
+    return returncode, usage.stop()
+
+
 if __name__ == "__main__":
+    if sys.argv[1] == "--worker":
+        # keep the Stata session alive and run do files sent by SCons
+        serve(run_job)
     # get the do file and arguments
     do_file = sys.argv[1]
     args = sys.argv[2:]
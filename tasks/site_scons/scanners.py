@@ -5,6 +5,7 @@ Scanners that are used in the SCons environment.
 """
 
 import copy
+from SCons.Scanner import Scanner
 
 
 def remove_latex_scanner(scanner_obj):
@@ -18,3 +19,18 @@ def remove_latex_scanner(scanner_obj):
         if skey not in [".tex", ".ltx", ".latex"]
     ]
     return cloned_obj
+
+
+def scan_julia_sysimage(node, env, path):
+    """
+    Returns the sysimage set by `env.JuliaSysimage` (if any),
+        so that Julia targets are built after it (they start with `--sysimage`).
+    """
+    sysimage = env.get("JULIA_SYSIMAGE", "")
+    return [env.File(sysimage)] if sysimage else []
+
+
+julia_sysimage_scanner = Scanner(
+    function=scan_julia_sysimage, name="JuliaSysimage"
+)
+"""Scanner adding the sysimage to the dependencies of the Julia targets."""
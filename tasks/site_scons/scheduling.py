@@ -0,0 +1,211 @@
+"""
+Shih-Hsuan Hsu
+October 18, 2026
+Critical-path-first scheduling of the targets (`scons --schedule=critical-path`).
+Each target gets the length of its remaining critical path: its expected run time
+    (from the previous builds, see `build_history.py`) plus the longest remaining path
+    of the targets that depend on it.
+Among the ready targets, SCons starts the one with the longest remaining path first
+    (see `monkey_patches.py`), so a long estimation at the head of a chain starts early
+    instead of in the order the targets are declared.
+`scons --simulate` replays the recorded run times under both policies for several `-j`
+    and prints the predicted wall time of each.
+"""
+
+import heapq
+import build_history
+from helpers import format_duration
+from progress import expected_durations
+
+SIMULATE_JOBS = "1,2,4,8,16"
+"""Numbers of jobs simulated by `scons --simulate` (`SIMULATE_JOBS`)."""
+
+
+def unit_of(node):
+    """
+    Returns the node standing for the action that builds `node`
+        (the first target of its builder call), or the node itself.
+    """
+    if node.has_builder():
+        executor = node.get_executor()
+        if executor is not None:
+            return executor.get_all_targets()[0]
+    return node
+
+
+def action_graph(roots):
+    """
+    Returns {unit: [units it depends on]} of the actions needed by `roots`,
+        in post-order (the dependencies come first), where a unit is one builder call.
+    """
+    graph = {}
+    expanded = set()
+    stack = [(unit_of(node), None) for node in reversed(roots)]
+    while stack:
+        unit, deps = stack.pop()
+        if unit in graph:
+            continue
+        if deps is not None:
+            graph[unit] = deps
+            continue
+        if unit in expanded:
+            # a dependency cycle, which SCons reports itself
+            continue
+        expanded.add(unit)
+        if unit.has_builder():
+            children = unit.get_executor().get_all_children()
+        else:
+            children = unit.children()
+        deps = [
+            dep
+            for dep in dict.fromkeys(map(unit_of, children))
+            if dep is not unit
+        ]
+        stack.append((unit, deps))
+        stack.extend((dep, None) for dep in reversed(deps) if dep not in graph)
+    return graph
+
+
+def unit_durations(graph, durations):
+    """
+    Returns {unit: expected run time} of the units that run an action
+        (those never built before are expected to take the median run time).
+    """
+    from SCons.Node.Alias import Alias
+    from SCons.Node.FS import Dir
+
+    # folders and aliases only collect their entries
+    actions = [
+        unit
+        for unit in graph
+        if unit.has_builder() and not isinstance(unit, (Alias, Dir))
+    ]
+    return expected_durations(actions, durations)[0]
+
+
+def remaining_paths(graph, expected):
+    """
+    Returns {unit: run time of the longest chain from the unit to the end of the build}.
+    """
+    downstream = {}
+    remaining = {}
+    # in reverse post-order, the units depending on a unit come before it
+    for unit in reversed(graph):
+        remaining[unit] = expected.get(unit, 0) + downstream.get(unit, 0)
+        for dep in graph[unit]:
+            if remaining[unit] > downstream.get(dep, 0):
+                downstream[dep] = remaining[unit]
+    return remaining
+
+
+def critical_path_priorities(roots):
+    """
+    Returns {unit: remaining critical path} of the actions needed by `roots`.
+    """
+    graph = action_graph(roots)
+    expected = unit_durations(graph, build_history.load_durations())
+    return remaining_paths(graph, expected)
+
+
+def simulate(graph, expected, jobs, priority=None):
+    """
+    Returns the wall time of building `graph` with `jobs` jobs when the ready units
+        start in increasing order of `priority` (default: the order of the graph,
+        i.e., roughly the order in which SCons reaches the targets).
+    Pools and declared resources (`POOL=`, `CPUS=`, `MEM=`) are not simulated.
+    """
+    if jobs < 1:
+        raise ValueError(f"Cannot simulate {jobs} jobs (at least 1).")
+    units = list(graph)
+    index = {unit: i for i, unit in enumerate(units)}
+    priority = priority or index
+    parents = {}
+    waiting = {}
+    ready = []
+    for unit, deps in graph.items():
+        waiting[unit] = len(deps)
+        for dep in deps:
+            parents.setdefault(dep, []).append(unit)
+        if not deps:
+            ready.append((priority[unit], index[unit]))
+    heapq.heapify(ready)
+    now = 0.0
+    running = []
+    while ready or running:
+        while ready and len(running) < jobs:
+            _, i = heapq.heappop(ready)
+            heapq.heappush(running, (now + expected.get(units[i], 0), i))
+        now, i = heapq.heappop(running)
+        for parent in parents.get(units[i], ()):
+            waiting[parent] -= 1
+            if not waiting[parent]:
+                heapq.heappush(ready, (priority[parent], index[parent]))
+    return now
+
+
+def parse_jobs_list(text):
+    """
+    Returns the numbers of jobs in `SIMULATE_JOBS` (e.g., `"1,2,4"`).
+    """
+    try:
+        jobs_list = [int(jobs) for jobs in text.split(",") if jobs.strip()]
+    except ValueError:
+        jobs_list = []
+    if not jobs_list or min(jobs_list) < 1:
+        raise ValueError(
+            f"SIMULATE_JOBS must be positive numbers of jobs "
+            f"separated by commas (e.g., `1,2,4`), not `{text}`."
+        )
+    return jobs_list
+
+
+def simulate_policies(env, targets, jobs_list):
+    """
+    Returns the simulation of building `targets` from scratch with the run times
+        of the previous builds: {"targets", "unknown", "work", "critical", "runs"},
+        where `runs` is [(jobs, default wall time, critical-path-first wall time)].
+    """
+    roots = env.arg2nodes(targets or ["."], env.fs.Entry)
+    graph = action_graph(roots)
+    durations = build_history.load_durations()
+    expected = unit_durations(graph, durations)
+    remaining = remaining_paths(graph, expected)
+    longest_first = {unit: -time for unit, time in remaining.items()}
+    runs = [
+        (
+            jobs,
+            simulate(graph, expected, jobs),
+            simulate(graph, expected, jobs, longest_first),
+        )
+        for jobs in jobs_list
+    ]
+    return {
+        "targets": len(expected),
+        "unknown": sum(str(unit) not in durations for unit in expected),
+        "work": sum(expected.values()),
+        "critical": max(remaining.values(), default=0),
+        "runs": runs,
+    }
+
+
+def print_simulation(result):
+    """
+    Print the simulated wall times of the scheduling policies (`scons --simulate`).
+    """
+    print(
+        f"scons: Simulated build of {result['targets']} target(s) "
+        f"(total run time {format_duration(result['work'])}, "
+        f"longest chain {format_duration(result['critical'])}):"
+    )
+    if result["unknown"]:
+        print(
+            f"\t{result['unknown']} target(s) never built before "
+            "(counted at the median run time)"
+        )
+    print(f"\t{'jobs':>5}  {'default':>9}  {'critical-path':>13}  {'gain':>6}")
+    for jobs, default, critical in result["runs"]:
+        gain = f"{1 - critical / default:.0%}" if default else "-"
+        print(
+            f"\t{jobs:>5}  {format_duration(default):>9}  "
+            f"{format_duration(critical):>13}  {gain:>6}"
+        )
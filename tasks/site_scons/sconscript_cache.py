@@ -0,0 +1,500 @@
+"""
+Shih-Hsuan Hsu
+October 18, 2026
+Cache the evaluation of SConscript files (`SCONSCRIPT_CACHE=True`).
+While a SConscript file is read, the builder calls (with the targets and sources
+    returned by the emitters and the final overrides), the calls of methods such as
+    `Precious`, `Clean`, and `Depends` (also from emitters), and the changes to `env`
+    are recorded in `.scons_cache/sconscripts`.
+In later builds, the calls are replayed with the emitters turned off,
+    instead of running the SConscript file again, if the SConscript file,
+    `site_scons`, `SConstruct`, and `env` are unchanged.
+SConscript files that use other environments (e.g., `env.Clone()`), global functions
+    (e.g., `Depends()` instead of `env.Depends()`), `Glob`, or `LinkNow` are always run.
+Do not enable it if SConscript files read other files to decide what to build.
+"""
+
+import os
+import json
+import hashlib
+import functools
+from collections import UserList
+import SCons.Node.FS
+import SCons.Node.Alias
+import SCons.Node.Python
+from SCons.Script.SConscript import DefaultEnvironmentCall
+from SCons.Script import SConscript
+from helpers import CACHE_DIR
+
+SCONSCRIPT_CACHE_DIR = os.path.join(CACHE_DIR, "sconscripts")
+"""Folder storing the recorded calls of each SConscript file."""
+
+SIDE_METHODS = [
+    "AddPostAction",
+    "AddPreAction",
+    "Alias",
+    "AlwaysBuild",
+    "Clean",
+    "Default",
+    "DefinePool",
+    "Depends",
+    "Ignore",
+    "NoCache",
+    "NoClean",
+    "Precious",
+    "Pseudo",
+    "Requires",
+    "SideEffect",
+]
+"""Environment methods whose calls are recorded and replayed."""
+
+BUILD_TIME_METHODS = ["AddPostAction", "AddPreAction"]
+"""Methods that are not recorded inside builder calls, since the builders add them again."""
+
+UNCACHEABLE_METHODS = [
+    "AddMethod",
+    "Clone",
+    "Command",
+    "Execute",
+    "Export",
+    "Glob",
+    "Install",
+    "InstallAs",
+    "LinkNow",
+    "Override",
+    "SConscript",
+    "Tool",
+]
+"""Environment methods that cannot be replayed (the SConscript file is always run)."""
+
+PURE_GLOBAL_FUNCTIONS = [
+    "Dir",
+    "Entry",
+    "File",
+    "Flatten",
+    "GetBuildPath",
+    "Help",
+    "Import",
+    "Literal",
+    "Split",
+]
+"""Global functions that can be used in cached SConscript files."""
+
+RECORDING = None
+"""The `Recording` of the SConscript file being read (None if not recording)."""
+
+
+class Uncacheable(Exception):
+    """
+    Raised when a call cannot be recorded.
+    """
+
+
+class Recording:
+    """
+    The calls recorded while reading a SConscript file.
+    """
+
+    def __init__(self, env):
+        self.env = env
+        self.events = []
+        self.exists = {}
+        self.depth = 0
+        """Depth of the builder calls (calls inside builders come from emitters)."""
+        self.cacheable = True
+        self.top_dir = env.Dir("#").abspath
+
+    def encode(self, value):
+        """
+        Returns a JSON-serializable version of an argument (nodes are stored by path).
+        """
+        if value is None or isinstance(value, (str, bool, int, float)):
+            return value
+        if isinstance(value, (list, tuple, UserList)):
+            # builders return node lists (`UserList`)
+            return [self.encode(item) for item in value]
+        if isinstance(value, dict):
+            return {str(k): self.encode(v) for k, v in value.items()}
+        if isinstance(value, SCons.Node.Alias.Alias):
+            return {"__node__": "Alias", "path": str(value)}
+        if isinstance(value, SCons.Node.Python.Value) and isinstance(
+            value.value, str
+        ):
+            return {"__node__": "Value", "value": value.value}
+        if isinstance(value, SCons.Node.FS.Base):
+            path = value.get_abspath()
+            if path == self.top_dir or path.startswith(self.top_dir + os.sep):
+                path = "#" + os.path.relpath(path, self.top_dir).replace(
+                    os.sep, "/"
+                )
+            return {"__node__": type(value).__name__, "path": path}
+        raise Uncacheable(f"Cannot record {value!r}.")
+
+    def record(self, event):
+        """
+        Add an event; the SConscript file is not cached if it cannot be encoded.
+        """
+        if not self.cacheable:
+            return
+        try:
+            self.events.append(self.encode(event))
+        except Uncacheable:
+            self.cacheable = False
+
+
+def decode(env, value):
+    """
+    Returns the argument stored by `Recording.encode`.
+    """
+    if isinstance(value, list):
+        return [decode(env, item) for item in value]
+    if isinstance(value, dict):
+        if value.get("__node__") == "Value":
+            return env.Value(value["value"])
+        if "__node__" in value:
+            # the paths are already substituted, so look them up directly
+            fs = env.fs
+            factory = {"File": fs.File, "Dir": fs.Dir, "Alias": env.Alias}
+            return factory.get(value["__node__"], fs.Entry)(value["path"])
+        return {k: decode(env, v) for k, v in value.items()}
+    return value
+
+
+def probe_exists(path):
+    """
+    Returns True if `path` exists.
+    Emitters use it for the paths they check, so that a recorded SConscript file
+        is run again when one of them is created or deleted.
+    """
+    exists = os.path.exists(path)
+    if RECORDING is not None:
+        RECORDING.exists[os.path.abspath(path)] = exists
+    return exists
+
+
+def record_builder_calls(env):
+    """
+    Wrap the builders in the environment, so that their calls are recorded.
+    The builder objects are kept as `builder` on the wrappers, for replaying.
+    """
+    for builder_name in list(env["BUILDERS"]):
+        original = env["BUILDERS"][builder_name]
+
+        def wrapper(*args, _original=original, _name=builder_name, **kwargs):
+            recording = RECORDING
+            if recording is None or recording.depth:
+                return _original(*args, **kwargs)
+            recording.depth += 1
+            try:
+                result = _original(*args, **kwargs)
+            finally:
+                recording.depth -= 1
+            record_result(recording, _name, result)
+            return result
+
+        wrapper.builder = getattr(original, "builder", original)
+        env["BUILDERS"][builder_name] = wrapper
+
+
+def record_result(recording, builder_name, result):
+    """
+    Record the nodes created by a builder call (one event per executor).
+    """
+    executors = []
+    for node in result:
+        executor = node.get_executor(create=0)
+        if executor is not None and executor not in executors:
+            executors.append(executor)
+    for executor in executors:
+        build_env = executor.env
+        overrides = {}
+        # the emitters may change the overrides (e.g., `LOG_FILE`)
+        while build_env is not recording.env:
+            if "__subject" not in build_env.__dict__:
+                # built in another environment
+                recording.cacheable = False
+                return
+            overrides = {**build_env.__dict__["overrides"], **overrides}
+            build_env = build_env.__dict__["__subject"]
+        recording.record(
+            {
+                "builder": builder_name,
+                "target": list(executor.get_all_targets()),
+                "source": list(executor.get_all_sources()),
+                "overrides": overrides,
+            }
+        )
+
+
+def recorded_method(recording, name, method):
+    """
+    Returns `method` of the environment wrapped to record its calls.
+    """
+
+    @functools.wraps(method)
+    def wrapper(*args, **kwargs):
+        if name in UNCACHEABLE_METHODS:
+            # builders call `Override` internally
+            if not recording.depth:
+                recording.cacheable = False
+        elif not (recording.depth and name in BUILD_TIME_METHODS):
+            recording.record({"method": name, "args": args, "kwargs": kwargs})
+        if name == "Clone":
+            # the clone must not copy the wrapped methods
+            uninstall_recorded_methods(recording)
+            try:
+                return method(*args, **kwargs)
+            finally:
+                install_recorded_methods(recording)
+        return method(*args, **kwargs)
+
+    return wrapper
+
+
+def install_recorded_methods(recording):
+    """
+    Wrap the methods of the environment (as instance attributes) to record their calls.
+    """
+    env = recording.env
+    recording.saved_methods = {}
+    for name in SIDE_METHODS + UNCACHEABLE_METHODS:
+        if not hasattr(env, name):
+            continue
+        if name in env.__dict__:
+            # e.g., methods added with `AddMethod`
+            recording.saved_methods[name] = env.__dict__[name]
+        env.__dict__[name] = recorded_method(
+            recording, name, getattr(env, name)
+        )
+
+
+def uninstall_recorded_methods(recording):
+    """
+    Restore the methods wrapped by `install_recorded_methods`.
+    """
+    env = recording.env
+    for name in SIDE_METHODS + UNCACHEABLE_METHODS:
+        env.__dict__.pop(name, None)
+    env.__dict__.update(recording.saved_methods)
+
+
+def snapshot(env):
+    """
+    Returns {variable: (value, JSON of mutable values)} of the environment.
+    """
+    state = {}
+    for key, value in env._dict.items():
+        frozen = value
+        if isinstance(value, (list, dict)):
+            try:
+                frozen = json.dumps(value, sort_keys=True)
+            except (TypeError, ValueError):
+                frozen = None
+        state[key] = (value, frozen)
+    return state
+
+
+def env_changes(before, env):
+    """
+    Returns ({changed variable: new value}, [deleted variables]).
+    """
+    after = snapshot(env)
+    changed = {
+        key: value
+        for key, (value, frozen) in after.items()
+        if key not in before
+        or before[key][0] is not value
+        or before[key][1] != frozen
+    }
+    deleted = sorted(set(before) - set(after))
+    return changed, deleted
+
+
+def read_and_record(env, sconscript):
+    """
+    Read a SConscript file and return its `Recording`.
+    """
+    global RECORDING
+    recording = Recording(env)
+    before = snapshot(env)
+    install_recorded_methods(recording)
+    # global functions (e.g., `Depends()`) use the default environment
+    global_call = DefaultEnvironmentCall.__call__
+
+    def recorded_global_call(self, *args, **kwargs):
+        if self.method_name not in PURE_GLOBAL_FUNCTIONS:
+            recording.cacheable = False
+        return global_call(self, *args, **kwargs)
+
+    DefaultEnvironmentCall.__call__ = recorded_global_call
+    RECORDING = recording
+    try:
+        global_call(SConscript, sconscript, exports={"env": env})
+    finally:
+        RECORDING = None
+        DefaultEnvironmentCall.__call__ = global_call
+        uninstall_recorded_methods(recording)
+    recording.env_change = env_changes(before, env)
+    recording.record(
+        {"env": recording.env_change[0], "deleted": recording.env_change[1]}
+    )
+    return recording
+
+
+def replay(env, sconscript, events):
+    """
+    Replay the recorded calls of a SConscript file, with the emitters turned off.
+    """
+    fs = env.fs
+    cwd = fs.getcwd()
+    # relative paths are relative to the SConscript file, as when it is read
+    fs.chdir(
+        fs.Dir(os.path.dirname(sconscript) or ".", fs.Top), change_os_dir=False
+    )
+    # the node of the SConscript file is created when it is read
+    fs.File(os.path.basename(sconscript))
+    try:
+        for event in events:
+            if "builder" in event:
+                builder = env["BUILDERS"][event["builder"]].builder
+                emitter = builder.emitter
+                builder.emitter = None
+                try:
+                    getattr(env, event["builder"])(
+                        target=decode(env, event["target"]),
+                        source=decode(env, event["source"]),
+                        **decode(env, event["overrides"]),
+                    )
+                finally:
+                    builder.emitter = emitter
+            elif "method" in event:
+                getattr(env, event["method"])(
+                    *decode(env, event["args"]),
+                    **decode(env, event["kwargs"]),
+                )
+            else:
+                for key, value in event["env"].items():
+                    env[key] = value
+                for key in event["deleted"]:
+                    del env[key]
+    finally:
+        fs.chdir(cwd, change_os_dir=False)
+
+
+def code_version():
+    """
+    Returns the hash of the code that affects how SConscript files are read
+        (`site_scons` and `SConstruct`).
+    """
+    site_scons = os.path.dirname(os.path.abspath(__file__))
+    paths = sorted(
+        os.path.join(site_scons, name)
+        for name in os.listdir(site_scons)
+        if name.endswith(".py")
+    )
+    paths.append(os.path.join(os.path.dirname(site_scons), "SConstruct"))
+    version = hashlib.sha256()
+    for path in paths:
+        with open(path, "rb") as f:
+            version.update(f.read())
+    return version.hexdigest()
+
+
+def env_fingerprint(env, arguments):
+    """
+    Returns the hash of the serializable variables in the environment,
+        the tools available, and the command line arguments (except `TASKS`).
+    """
+    state = {}
+    for key, value in env._dict.items():
+        try:
+            state[key] = json.dumps(value, sort_keys=True)
+        except (TypeError, ValueError):
+            continue
+    tools = env.get("TOOL_PROBE")
+    if tools is not None:
+        state["TOOL_PROBE"] = {
+            tool: result["available"] for tool, result in tools.results.items()
+        }
+    state["ARGUMENTS"] = {k: v for k, v in arguments.items() if k != "TASKS"}
+    return hashlib.sha256(
+        json.dumps(state, sort_keys=True).encode("utf-8")
+    ).hexdigest()
+
+
+def entry_path(sconscript):
+    """
+    Returns the file storing the recorded calls of a SConscript file.
+    """
+    name = hashlib.sha256(os.path.normpath(sconscript).encode("utf-8"))
+    return os.path.join(SCONSCRIPT_CACHE_DIR, name.hexdigest() + ".json")
+
+
+def read_sconscripts(env, sconscript_files, arguments):
+    """
+    Read the SConscript files, replaying the recorded calls of the unchanged ones
+        if `SCONSCRIPT_CACHE` is True.
+    Returns the number of SConscript files replayed.
+    """
+    if not env.get("SCONSCRIPT_CACHE", False):
+        SConscript(sconscript_files, exports={"env": env})
+        return 0
+    os.makedirs(SCONSCRIPT_CACHE_DIR, exist_ok=True)
+    version = code_version()
+    fingerprint = env_fingerprint(env, arguments)
+    replayed = 0
+    for sconscript in sconscript_files:
+        sconscript = str(sconscript)
+        with open(sconscript, "rb") as f:
+            key = hashlib.sha256(f.read())
+        key.update(version.encode("utf-8"))
+        key.update(fingerprint.encode("utf-8"))
+        key = key.hexdigest()
+        path = entry_path(sconscript)
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                entry = json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            entry = None
+        env_change = None
+        if (
+            entry is not None
+            and entry["key"] == key
+            and all(
+                os.path.exists(p) == exists
+                for p, exists in entry["exists"].items()
+            )
+        ):
+            replay(env, sconscript, entry["events"])
+            env_change = entry["events"][-1]
+            replayed += 1
+        else:
+            recording = read_and_record(env, sconscript)
+            env_change = {
+                "env": recording.env_change[0],
+                "deleted": recording.env_change[1],
+            }
+            if recording.cacheable:
+                tmp_path = f"{path}.tmp{os.getpid()}"
+                with open(tmp_path, "w", encoding="utf-8") as f:
+                    json.dump(
+                        {
+                            "sconscript": sconscript,
+                            "key": key,
+                            "exists": recording.exists,
+                            "events": recording.events,
+                        },
+                        f,
+                    )
+                os.replace(tmp_path, path)
+            elif os.path.exists(path):
+                os.remove(path)
+        # later SConscript files see the changes to the environment
+        if env_change["env"] or env_change["deleted"]:
+            fingerprint = hashlib.sha256(
+                (
+                    fingerprint
+                    + json.dumps(env_change, sort_keys=True, default=repr)
+                ).encode("utf-8")
+            ).hexdigest()
+    return replayed
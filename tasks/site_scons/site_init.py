@@ -5,7 +5,8 @@ This file is provide an initialization function for a SCons environment,
     which includes builders for Python, Stata, Julia, and copying/linking files.
 """
 
-import os
+# imported first, so that `--startup-profile` can time the other imports
+import startup_profile
 from custom_warnings import no_symlink_permission
 from actions import (
     python_build_action,
@@ -13,6 +14,7 @@ from actions import (
     symlink_build_action,
     copy_build_action,
     julia_build_action,
+    julia_sysimage_build_action,
     matlab_build_action,
     dynare_build_action,
     pdf_build_action,
@@ -23,14 +25,29 @@ from emitters import (
     python_emitter,
     stata_emitter,
     julia_emitter,
+    julia_sysimage_emitter,
     link_emitter,
     matlab_emitter,
     dynare_emitter,
     pdf_emitter,
     md5_emitter,
 )
-from methods import make_link_now, make_links, download_file, download_files
-from scanners import remove_latex_scanner
+from methods import (
+    make_link_now,
+    make_links,
+    download_file,
+    download_files,
+    fred_downloads,
+    julia_sysimage,
+)
+from scanners import remove_latex_scanner, julia_sysimage_scanner
+from tool_probe import SYMLINK, probe_tools
+from sconscript_cache import record_builder_calls
+from artifact_cache import CACHEABLE_BUILDERS, cache_action, print_cache_report
+from build_history import TIMED_BUILDERS, time_action
+from resources import RESOURCE_BUILDERS
+from job_pools import define_pool
+from auto_jobs import auto_jobs_action
 
 # load builders
 python_bld = Builder(
@@ -40,7 +57,13 @@ stata_bld = Builder(
     action=stata_build_action, src_suffix=".do", emitter=stata_emitter
 )
 julia_bld = Builder(
-    action=julia_build_action, src_suffix=".jl", emitter=julia_emitter
+    action=julia_build_action,
+    src_suffix=".jl",
+    emitter=julia_emitter,
+    source_scanner=julia_sysimage_scanner,
+)
+sysimage_bld = Builder(
+    action=julia_sysimage_build_action, emitter=julia_sysimage_emitter
 )
 matlab_bld = Builder(
     action=matlab_build_action, src_suffix=".m", emitter=matlab_emitter
@@ -56,33 +79,22 @@ no_action_builder = Builder(
 )
 
 
-def check_symlink_permission():
+def check_symlink_permission(tools):
     """
     This function is used to check if the user has permission to create symlinks.
+    The result is read from the tool probe (see `tool_probe.py`).
     """
-    permission = True
-    try:
-        with open("_test.txt", "w") as f:
-            f.write("test")
-        os.symlink("_test.txt", "_test_link.txt")
-    except OSError as e:
-        # handle no symlink permission on Windows machines
-        if (
-            "[WinError 1314] A required privilege is not held by the client"
-            in str(e)
-        ):
-            no_symlink_permission()
-        else:
-            raise e
-        permission = False
-    finally:
-        # clean up
-        try:
-            os.remove("_test.txt")
-            os.remove("_test_link.txt")
-        except FileNotFoundError:
-            pass
-    return permission
+    result = tools.get(SYMLINK)
+    if result["available"]:
+        return True
+    # handle no symlink permission on Windows machines
+    if (
+        "[WinError 1314] A required privilege is not held by the client"
+        in result.get("error", "")
+    ):
+        no_symlink_permission()
+        return False
+    raise OSError(result.get("error", "Cannot create symbolic links."))
 
 
 def add_post_action_to_all(env):
@@ -95,14 +107,20 @@ def add_post_action_to_all(env):
     for builder_name in env["BUILDERS"]:
         original_builders[builder_name] = env["BUILDERS"][builder_name]
 
+    # create the action once; creating an action from a function
+    # computes its signature, which is slow with many builder calls
+    post_action = env.Action(check_target_exist_action)
+
     # create wrapper that adds PostAction
     def create_wrapper(original_builder):
         def wrapper(*args, **kwargs):
             result = original_builder(*args, **kwargs)
             # check if the target exists and print a warning if it doesn't
-            env.AddPostAction(result, check_target_exist_action)
+            env.AddPostAction(result, post_action)
             return result
 
+        # keep the builder, so its emitter can be turned off when replaying
+        wrapper.builder = original_builder
         return wrapper
 
     # apply wrapper to all builders
@@ -110,6 +128,20 @@ def add_post_action_to_all(env):
         env["BUILDERS"][builder_name] = create_wrapper(builder)
 
 
+def add_action_wrapper_to_all(env, wrapper, builder_names=None):
+    """
+    This function wraps the action of the builders in the environment
+        (all builders if `builder_names` is None).
+    `wrapper(action_function, builder_name, action_contents)` returns the new function.
+    The signature of the action is unchanged, so targets are not rebuilt.
+    """
+    for builder_name in builder_names or list(env["BUILDERS"]):
+        action = env["BUILDERS"][builder_name].action
+        action.execfunction = wrapper(
+            action.execfunction, builder_name, action.get_presig([], [], env)
+        )
+
+
 def add_md5_emitter_to_all(env):
     """
     This function adds the md5 emitter to all builders in the environment.
@@ -137,13 +169,16 @@ def init_env():
     env = Environment()
     # use MD5 for the decider
     env.Decider("content")
+    # probe the tools (PDF compiler, symlink support, etc.) once
+    env["TOOL_PROBE"] = probe_tools()
     # set ALWAYS_COPY to True if no symlink permission
-    env["ALWAYS_COPY"] = not check_symlink_permission()
+    env["ALWAYS_COPY"] = not check_symlink_permission(env["TOOL_PROBE"])
     env.Append(
         BUILDERS={
             "Python": python_bld,
             "Stata": stata_bld,
             "Julia": julia_bld,
+            "Sysimage": sysimage_bld,
             "Matlab": matlab_bld,
             "Dynare": dynare_bld,
             "Copy": copy_bld,
@@ -164,8 +199,23 @@ def init_env():
     env.AddMethod(download_file, "Download")
     # attach the download_files function
     env.AddMethod(download_files, "Downloads")
+    # attach the fred_downloads function
+    env.AddMethod(fred_downloads, "FredDownloads")
+    # attach the julia_sysimage function
+    env.AddMethod(julia_sysimage, "JuliaSysimage")
+    # attach the define_pool function (limit the targets with POOL= running at once)
+    env.AddMethod(define_pool, "DefinePool")
     # add md5 emitter to all builders
     add_md5_emitter_to_all(env)
+    # record the run time of the actions (targets restored from the cache are not timed)
+    add_action_wrapper_to_all(env, time_action, TIMED_BUILDERS)
+    # wait for the limit of running actions set by the machine load (if AUTO_JOBS=1)
+    add_action_wrapper_to_all(env, auto_jobs_action, RESOURCE_BUILDERS)
+    # restore targets from the artifact cache (if ARTIFACT_CACHE is True)
+    add_action_wrapper_to_all(env, cache_action, CACHEABLE_BUILDERS)
+    env.AlwaysBuild(env.Alias("cache-stats", [], print_cache_report))
     # add post action to all builders
     add_post_action_to_all(env)
+    # record the builder calls for the SConscript cache (if SCONSCRIPT_CACHE is True)
+    record_builder_calls(env)
     return env
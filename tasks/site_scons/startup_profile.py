@@ -0,0 +1,109 @@
+"""
+Shih-Hsuan Hsu
+October 18, 2026
+Measure the start-up time of SCons (`scons --startup-profile`).
+Reports the time spent in each phase before the build starts
+    and the slowest imports, so that slow start-up does not creep back in.
+This module is imported first in `site_init.py`, so that imports can be timed
+    from the start; `--startup-profile` is registered in `SConstruct`.
+"""
+
+import os
+import sys
+import time
+import builtins
+import threading
+from contextlib import contextmanager
+
+ENABLED = "--startup-profile" in sys.argv
+"""Profile the start-up if `--startup-profile` is given."""
+
+PHASES = []
+"""List of (phase name, start time, end time, thread name)."""
+
+IMPORTS = {}
+"""Time spent importing each module (only the outermost imports are counted)."""
+
+START = time.perf_counter()
+"""Time when site_scons started loading."""
+
+_original_import = builtins.__import__
+_state = threading.local()
+
+
+def _timed_import(name, *args, **kwargs):
+    """
+    Replacement of `__import__` that times the outermost imports.
+    """
+    # skip modules already imported, nested imports, and relative imports
+    if not name or name in sys.modules or getattr(_state, "depth", 0) > 0:
+        return _original_import(name, *args, **kwargs)
+    _state.depth = 1
+    start = time.perf_counter()
+    try:
+        return _original_import(name, *args, **kwargs)
+    finally:
+        _state.depth = 0
+        IMPORTS[name] = IMPORTS.get(name, 0) + time.perf_counter() - start
+
+
+if ENABLED:
+    builtins.__import__ = _timed_import
+
+
+def process_uptime():
+    """
+    Returns the seconds since the process started (None if unknown).
+    Only available on Linux.
+    """
+    try:
+        with open("/proc/self/stat", "r", encoding="utf-8") as f:
+            # the process name may contain spaces, so split after it
+            start_ticks = int(f.read().rsplit(")", 1)[1].split()[19])
+        with open("/proc/uptime", "r", encoding="utf-8") as f:
+            uptime = float(f.read().split()[0])
+        return uptime - start_ticks / os.sysconf("SC_CLK_TCK")
+    except (OSError, ValueError, IndexError):
+        return None
+
+
+STARTUP_BEFORE_SITE_SCONS = process_uptime() if ENABLED else None
+"""Seconds between the start of the process and loading site_scons."""
+
+
+@contextmanager
+def profile_phase(name):
+    """
+    Record the time spent in a phase of the start-up.
+    """
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        PHASES.append(
+            (name, start, time.perf_counter(), threading.current_thread().name)
+        )
+
+
+def print_startup_profile(top=15):
+    """
+    Print the time spent in each phase and the `top` slowest imports.
+    """
+    if not ENABLED:
+        return
+    builtins.__import__ = _original_import
+    lines = ["scons: Startup profile:"]
+    if STARTUP_BEFORE_SITE_SCONS is not None:
+        lines.append(
+            f"\t{STARTUP_BEFORE_SITE_SCONS:8.3f} s  SCons start-up (before site_scons)"
+        )
+    lines.append(
+        f"\t{time.perf_counter() - START:8.3f} s  site_scons and SConstruct (total)"
+    )
+    for name, start, end, _ in PHASES:
+        lines.append(f"\t{end - start:8.3f} s    {name}")
+    lines.append(f"\tSlowest imports:")
+    slowest = sorted(IMPORTS.items(), key=lambda item: -item[1])[:top]
+    for name, seconds in slowest:
+        lines.append(f"\t{seconds:8.3f} s    {name}")
+    print("\n".join(lines))
@@ -0,0 +1,139 @@
+"""
+Shih-Hsuan Hsu
+October 18, 2026
+Find the tasks (folders with a `SConscript` file) and select the tasks to load.
+Only task roots are searched: the search does not descend into a task folder,
+    so data folders (`input`, `output`, etc.) are never walked.
+The index of tasks is stored in `.scons_cache` and reused
+    while the searched folders are unchanged.
+With `scons TASKS=foo,bar`, only `foo`, `bar`, and the tasks they depend on
+    (recorded by the task graph of the previous builds) are loaded.
+"""
+
+import os
+import json
+from SCons.Errors import UserError
+from helpers import CACHE_DIR
+
+TASK_EXCLUDED_DIRS = {"site_scons", "input", "output", "logs", "md5"}
+"""Folders that are not searched for tasks (hidden folders are skipped too)."""
+
+TASK_INDEX = os.path.join(CACHE_DIR, "task_index.json")
+"""File storing the tasks and the modification times of the searched folders."""
+
+TASK_DEPS = os.path.join(CACHE_DIR, "task_deps.json")
+"""File storing the upstream tasks of each task (from the previous builds)."""
+
+
+def scan_tasks(root):
+    """
+    Returns ({task name: SConscript path}, {searched folder: modification time}).
+    A folder with a `SConscript` file is a task; its subfolders are not searched.
+    """
+    tasks = {}
+    dir_mtimes = {}
+    stack = [root]
+    while stack:
+        dir_path = stack.pop()
+        dir_mtimes[dir_path] = os.stat(dir_path).st_mtime_ns
+        with os.scandir(dir_path) as entries:
+            for entry in entries:
+                if (
+                    not entry.is_dir()
+                    or entry.name in TASK_EXCLUDED_DIRS
+                    or entry.name.startswith((".", "_"))
+                ):
+                    continue
+                sconscript = os.path.join(entry.path, "SConscript")
+                if os.path.isfile(sconscript):
+                    name = os.path.relpath(entry.path, root).replace(
+                        os.sep, "/"
+                    )
+                    tasks[name] = os.path.normpath(sconscript)
+                else:
+                    stack.append(entry.path)
+    return tasks, dir_mtimes
+
+
+def find_tasks(root="."):
+    """
+    Returns {task name: SConscript path}, sorted by task name,
+        from the stored index if none of the searched folders changed.
+    """
+    try:
+        with open(TASK_INDEX, "r", encoding="utf-8") as f:
+            index = json.load(f)
+        valid = index["root"] == os.path.abspath(root) and all(
+            os.stat(path).st_mtime_ns == mtime
+            for path, mtime in index["dirs"].items()
+        )
+        # a SConscript file may have been deleted from a task folder
+        valid = valid and all(map(os.path.isfile, index["tasks"].values()))
+    except (OSError, ValueError, KeyError):
+        valid = False
+    if not valid:
+        tasks, dir_mtimes = scan_tasks(root)
+        index = {
+            "root": os.path.abspath(root),
+            "tasks": dict(sorted(tasks.items())),
+            "dirs": dir_mtimes,
+        }
+        os.makedirs(CACHE_DIR, exist_ok=True)
+        with open(TASK_INDEX, "w", encoding="utf-8") as f:
+            json.dump(index, f, indent=4)
+    return index["tasks"]
+
+
+def load_task_deps():
+    """
+    Returns {task name: list of upstream tasks} recorded by the previous builds.
+    """
+    try:
+        with open(TASK_DEPS, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return {}
+
+
+def save_task_deps(task_deps, loaded_tasks, tasks):
+    """
+    Update the recorded upstream tasks of the loaded tasks, and return all of them.
+    The records of the tasks that were not loaded are kept,
+        unless the task no longer exists.
+    """
+    all_deps = {
+        task: deps
+        for task, deps in load_task_deps().items()
+        if task in tasks and task not in loaded_tasks
+    }
+    for task in loaded_tasks:
+        all_deps[task] = sorted(task_deps.get(task, []))
+    os.makedirs(CACHE_DIR, exist_ok=True)
+    with open(TASK_DEPS, "w", encoding="utf-8") as f:
+        json.dump(dict(sorted(all_deps.items())), f, indent=4)
+    return {task: set(deps) for task, deps in all_deps.items()}
+
+
+def select_tasks(tasks, selection=""):
+    """
+    Returns the tasks to load: all tasks if `selection` is empty, otherwise
+        the tasks in `selection` (comma-separated) and their upstream tasks.
+    Run `scons` without `TASKS` after adding a dependency on a new task,
+        so that the dependency is recorded.
+    """
+    if not selection:
+        return list(tasks)
+    requested = [name.strip().strip("/") for name in selection.split(",")]
+    unknown = [name for name in requested if name and name not in tasks]
+    if unknown:
+        raise UserError(f"Unknown task(s) in TASKS: {', '.join(unknown)}")
+    task_deps = load_task_deps()
+    selected = set()
+    stack = [name for name in requested if name]
+    while stack:
+        task = stack.pop()
+        if task in selected or task not in tasks:
+            continue
+        selected.add(task)
+        stack.extend(task_deps.get(task, []))
+    return [task for task in tasks if task in selected]
@@ -0,0 +1,222 @@
+"""
+Shih-Hsuan Hsu
+October 18, 2026
+Probe the tools used by the builders (LaTeX, Python, Julia, Matlab, Stata, Graphviz)
+    and the symbolic link support once, instead of in every emitter and action.
+The probes run in parallel, and their results are stored in `.scons_cache`,
+    keyed on the hostname, `PATH`, and the modification time of each tool binary,
+    so unchanged tools are not probed again in later builds.
+The results are available as `env["TOOL_PROBE"]` (see `ToolProbe`).
+"""
+
+import os
+import json
+import shutil
+import tempfile
+import threading
+import subprocess
+from concurrent.futures import ThreadPoolExecutor
+from helpers import CACHE_DIR
+
+TOOL_PROBES = {
+    "latexmk": ["latexmk", "--version"],
+    "pdflatex": ["pdflatex", "--version"],
+    "python": ["python", "--version"],
+    "julia": ["julia", "--version"],
+    "matlab": None,
+    "stata-mp": None,
+    "stata-se": None,
+    "stata": None,
+    "dot": ["dot", "-V"],
+}
+"""
+Tools probed at start-up and the commands used to probe them
+    (None to only check that the tool is on `PATH`, e.g., for slow tools).
+Other tools (e.g., another `PDF_COMPILER`) are probed with `<tool> --version` when used.
+"""
+
+SYMLINK = "symlink"
+"""Name of the symbolic link probe."""
+
+TOOL_PROBE_FILE = os.path.join(CACHE_DIR, "tool_probe.json")
+"""File storing the probe results."""
+
+TOOL_PROBE_TIMEOUT = 30
+"""Timeout in seconds of each probe."""
+
+
+def binary_state(tool):
+    """
+    Returns (path, modification time) of the tool binary, or (None, None) if not found.
+    """
+    path = shutil.which(tool)
+    if path is None:
+        return None, None
+    try:
+        return path, os.stat(path).st_mtime_ns
+    except OSError:
+        return None, None
+
+
+def run_probe(tool, command):
+    """
+    Returns the probe result of a tool:
+        {"binary", "mtime", "available", "version"}.
+    """
+    path, mtime = binary_state(tool)
+    result = {"binary": path, "mtime": mtime, "available": False}
+    if path is None:
+        return result
+    if command is None:
+        result["available"] = True
+        return result
+    try:
+        runner = subprocess.run(
+            command,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.STDOUT,
+            stdin=subprocess.DEVNULL,
+            timeout=TOOL_PROBE_TIMEOUT,
+        )
+    except (OSError, subprocess.TimeoutExpired):
+        return result
+    result["available"] = runner.returncode == 0
+    output = runner.stdout.decode("utf-8", errors="replace").strip()
+    if output:
+        result["version"] = output.splitlines()[0]
+    return result
+
+
+def probe_symlink():
+    """
+    Returns the symbolic link probe result:
+        {"key", "available", "error"} (`key` is the directory tested).
+    The links are created in the cache directory,
+        which is on the same file system as the tasks.
+    """
+    os.makedirs(CACHE_DIR, exist_ok=True)
+    result = {"key": os.path.abspath(CACHE_DIR), "available": True}
+    test_dir = tempfile.mkdtemp(dir=CACHE_DIR)
+    try:
+        test_file = os.path.join(test_dir, "_test.txt")
+        with open(test_file, "w", encoding="utf-8") as f:
+            f.write("test")
+        os.symlink(test_file, os.path.join(test_dir, "_test_link.txt"))
+    except OSError as e:
+        result["available"] = False
+        result["error"] = str(e)
+    finally:
+        shutil.rmtree(test_dir, ignore_errors=True)
+    return result
+
+
+class ToolProbe:
+    """
+    Registry of the probe results of the tools.
+    """
+
+    def __init__(self, path=TOOL_PROBE_FILE):
+        self.path = path
+        self.results = {}
+        self.lock = threading.Lock()
+        self.probed = []
+        """Tools probed (not read from the cache) in this build."""
+
+    def load(self):
+        """
+        Returns the cached results if the hostname and `PATH` are unchanged.
+        """
+        # deferred: socket is only needed for the hostname
+        import socket
+
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                cache = json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            return {}
+        if cache.get("hostname") != socket.gethostname() or cache.get(
+            "PATH"
+        ) != os.environ.get("PATH", ""):
+            return {}
+        return cache.get("tools", {})
+
+    def save(self):
+        """
+        Store the results.
+        """
+        import socket
+
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        tmp_path = f"{self.path}.tmp{os.getpid()}"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(
+                {
+                    "hostname": socket.gethostname(),
+                    "PATH": os.environ.get("PATH", ""),
+                    "tools": self.results,
+                },
+                f,
+                indent=4,
+            )
+        os.replace(tmp_path, self.path)
+
+    def probe(self, tools=TOOL_PROBES):
+        """
+        Probe the tools (and the symbolic link support) in parallel,
+            reusing the cached results of the unchanged tools.
+        """
+        cached = self.load()
+        to_probe = {}
+        for tool, command in tools.items():
+            result = cached.get(tool)
+            if result is not None and [
+                result.get("binary"),
+                result.get("mtime"),
+            ] == list(binary_state(tool)):
+                self.results[tool] = result
+            else:
+                to_probe[tool] = command
+        symlink_result = cached.get(SYMLINK)
+        if symlink_result is not None and symlink_result.get(
+            "key"
+        ) == os.path.abspath(CACHE_DIR):
+            self.results[SYMLINK] = symlink_result
+        if not to_probe and SYMLINK in self.results:
+            return self
+        with ThreadPoolExecutor(max(len(to_probe), 1)) as executor:
+            futures = {
+                tool: executor.submit(run_probe, tool, command)
+                for tool, command in to_probe.items()
+            }
+            if SYMLINK not in self.results:
+                self.results[SYMLINK] = probe_symlink()
+                self.probed.append(SYMLINK)
+            for tool, future in futures.items():
+                self.results[tool] = future.result()
+                self.probed.append(tool)
+        self.save()
+        return self
+
+    def get(self, tool):
+        """
+        Returns the probe result of a tool, probing it if it is not registered yet.
+        """
+        with self.lock:
+            if tool not in self.results:
+                self.results[tool] = run_probe(tool, [tool, "--version"])
+                self.probed.append(tool)
+                self.save()
+            return self.results[tool]
+
+    def available(self, tool):
+        """
+        Returns True if the tool (or `symlink`) is available.
+        """
+        return self.get(tool)["available"]
+
+
+def probe_tools():
+    """
+    Returns the probe results of the tools in `TOOL_PROBES`.
+    """
+    return ToolProbe().probe()
@@ -0,0 +1,405 @@
+"""
+Shih-Hsuan Hsu
+October 18, 2026
+Long-lived worker processes that run scripts on behalf of the build actions.
+A worker is started once per SCons job slot and reused for every target,
+    so expensive start-up work (e.g., initializing Stata) is only paid once.
+The pools of an interpreter with different thread budgets share the job slots:
+    when they are all taken, an idle worker of another budget is stopped to make room,
+    so there are never more workers (licenses, memory) than jobs.
+
+Protocol (one request per connection, over a local TCP socket):
+    request:  NUL-separated fields `token, cwd, log_file, script, *args` + newline
+    response: the return code of the script, followed by the user and system CPU time
+        (in seconds) and the peak RSS (in bytes) of the run if the worker measured them
+        (otherwise they are stored as unknown) + newline
+Workers print `PORT <port>` to the stdout once they are ready.
+Each worker gets a random token in its `WORKER_TOKEN` environment variable
+    (only visible to the build user), and ignores requests without it,
+    so other users of a shared server cannot run code through the port.
+"""
+
+import os
+import sys
+import hmac
+import secrets
+import threading
+import subprocess
+from contextlib import contextmanager
+
+HOST = "127.0.0.1"
+"""Workers only listen on the loopback interface."""
+
+POOLS = {}
+"""Store the worker pools that have been started, keyed by name."""
+
+GROUPS = {}
+"""Store the pools sharing their size, keyed by group: (condition, pools)."""
+
+_POOLS_LOCK = threading.Lock()
+
+
+class Worker:
+    """
+    A worker process and the port it is listening on.
+    """
+
+    def __init__(self, command, log_file, env=None):
+        self.token = secrets.token_hex(32)
+        env = {
+            **(os.environ if env is None else env),
+            "WORKER_TOKEN": self.token,
+        }
+        # startup messages (e.g., license errors) go to the first log file
+        with open(log_file, "w", encoding="utf-8") as log:
+            self.process = subprocess.Popen(
+                command,
+                stdout=subprocess.PIPE,
+                stderr=log,
+                env=env,
+                text=True,
+            )
+        # wait for the worker to report its port
+        line = self.process.stdout.readline()
+        if not line.startswith("PORT "):
+            self.process.wait()
+            raise RuntimeError(
+                f"Worker {command} failed to start; see {log_file}."
+            )
+        self.port = int(line.split()[1])
+
+    def run(self, cwd, log_file, script, args):
+        """
+        Send a script to the worker and return its return code.
+        The resource usage reported by the worker is added to the current action.
+        """
+        import socket  # deferred to keep SCons start-up fast
+        from build_history import add_usage
+
+        request = (
+            "\0".join([self.token, cwd, log_file, script] + list(args)) + "\n"
+        )
+        with socket.create_connection((HOST, self.port)) as conn:
+            conn.sendall(request.encode("utf-8"))
+            response = conn.makefile("r", encoding="utf-8").readline()
+        if not response:
+            # the worker died while running the script
+            raise ConnectionError("Worker exited while running the script.")
+        fields = response.split()
+        if len(fields) == 4:
+            add_usage(float(fields[1]), float(fields[2]), int(fields[3]))
+        return int(fields[0])
+
+    def alive(self):
+        """
+        Returns True if the worker process is still running.
+        """
+        return self.process.poll() is None
+
+    def close(self):
+        """
+        Stop the worker process.
+        """
+        if self.alive():
+            self.process.terminate()
+            try:
+                self.process.wait(timeout=10)
+            except subprocess.TimeoutExpired:
+                self.process.kill()
+
+
+class WorkerPool:
+    """
+    A pool of workers (one per SCons job slot), with at most `size` workers
+        in total with its sibling pools (the pools of the same group, including itself).
+    Workers are started lazily and handed to one action at a time.
+    """
+
+    def __init__(self, command, size, env=None, condition=None, siblings=None):
+        self.command = command
+        self.size = size
+        self.env = env
+        self.workers = []
+        self.idle = []
+        self.condition = condition or threading.Condition()
+        self.siblings = [] if siblings is None else siblings
+        self.siblings.append(self)
+
+    def total_workers(self):
+        """
+        Returns the number of workers of the pool and its siblings.
+        """
+        return sum(len(pool.workers) for pool in self.siblings)
+
+    def evict_idle(self):
+        """
+        Remove the least recently used idle worker of a sibling pool and return it
+            (None if they are all busy).
+        """
+        for pool in self.siblings:
+            if pool is not self and pool.idle:
+                worker = pool.idle.pop(0)
+                pool.workers.remove(worker)
+                return worker
+        return None
+
+    def acquire(self, log_file):
+        """
+        Get an idle worker, starting a new one if the pools are not full
+            (or after stopping an idle worker of a sibling pool).
+        """
+        evicted = None
+        with self.condition:
+            while not self.idle and self.total_workers() >= self.size:
+                evicted = self.evict_idle()
+                if evicted is not None:
+                    break
+                self.condition.wait()
+            if self.idle:
+                return self.idle.pop()
+            # reserve the slot before the (slow) start-up
+            self.workers.append(None)
+        if evicted is not None:
+            evicted.close()
+        try:
+            worker = Worker(self.command, log_file, self.env)
+        except Exception:
+            with self.condition:
+                self.workers.remove(None)
+                self.condition.notify_all()
+            raise
+        with self.condition:
+            self.workers[self.workers.index(None)] = worker
+        return worker
+
+    def release(self, worker):
+        """
+        Return a worker to the pool, dropping it if it has died.
+        """
+        with self.condition:
+            if worker.alive():
+                self.idle.append(worker)
+            else:
+                self.workers.remove(worker)
+            # the waiting actions may belong to sibling pools
+            self.condition.notify_all()
+
+    def run(self, cwd, log_file, script, args):
+        """
+        Run a script on one of the workers and return its return code.
+        If the worker dies while running the script, the return code is 1.
+        """
+        worker = self.acquire(log_file)
+        try:
+            return worker.run(cwd, log_file, script, args)
+        except (ConnectionError, OSError) as e:
+            with open(log_file, "a", encoding="utf-8") as log:
+                print(f"WORKER FAILED: {e}", file=log)
+            worker.close()
+            return 1
+        finally:
+            self.release(worker)
+
+    def close(self):
+        """
+        Stop all the workers.
+        """
+        with self.condition:
+            for worker in self.workers:
+                if worker is not None:
+                    worker.close()
+            self.workers = []
+            self.idle = []
+
+
+def get_pool(name, command, env=None, group=None):
+    """
+    Returns the worker pool `name`, creating it on first use.
+    The pool size is the number of SCons jobs (`-j`),
+        shared by the pools of the same `group` (if given).
+    """
+    from SCons.Script import GetOption
+
+    with _POOLS_LOCK:
+        if name not in POOLS:
+            condition, siblings = (
+                GROUPS.setdefault(group, (threading.Condition(), []))
+                if group is not None
+                else (None, None)
+            )
+            POOLS[name] = WorkerPool(
+                command,
+                size=GetOption("num_jobs") or 1,
+                env=env,
+                condition=condition,
+                siblings=siblings,
+            )
+        return POOLS[name]
+
+
+def shutdown_workers():
+    """
+    Stop all the workers (registered to be called at exit).
+    """
+    for pool in POOLS.values():
+        pool.close()
+
+
+@contextmanager
+def redirect_output(log_file):
+    """
+    Redirect stdout and stderr (including output from C extensions)
+        to the log file, then restore them.
+    """
+    sys.stdout.flush()
+    sys.stderr.flush()
+    saved = os.dup(1), os.dup(2)
+    with open(log_file, "a", encoding="utf-8") as log:
+        os.dup2(log.fileno(), 1)
+        os.dup2(log.fileno(), 2)
+        try:
+            yield log
+        finally:
+            sys.stdout.flush()
+            sys.stderr.flush()
+            os.dup2(saved[0], 1)
+            os.dup2(saved[1], 2)
+            os.close(saved[0])
+            os.close(saved[1])
+
+
+def process_cpu(pid):
+    """
+    Returns (user CPU, system CPU) in seconds of a process and its waited children,
+        read from `/proc/<pid>/stat` (None if it cannot be read, e.g., not on Linux).
+    """
+    try:
+        with open(f"/proc/{pid}/stat", "r", encoding="utf-8") as f:
+            # the fields after the command name, which may contain spaces
+            fields = f.read().rsplit(")", 1)[1].split()
+    except (OSError, IndexError):
+        return None
+    ticks = os.sysconf("SC_CLK_TCK")
+    user, system, children_user, children_system = map(int, fields[11:15])
+    return (user + children_user) / ticks, (system + children_system) / ticks
+
+
+def reset_peak_rss(pid):
+    """
+    Reset the peak RSS of a process to its current RSS (Linux 4.0 or later).
+    Returns True if it was reset.
+    """
+    try:
+        with open(f"/proc/{pid}/clear_refs", "w", encoding="utf-8") as f:
+            f.write("5")
+    except OSError:
+        return False
+    return True
+
+
+def peak_rss(pid):
+    """
+    Returns the peak RSS in bytes of a process (`VmHWM` in `/proc/<pid>/status`),
+        or None if it cannot be read.
+    """
+    try:
+        with open(f"/proc/{pid}/status", "r", encoding="utf-8") as f:
+            for line in f:
+                if line.startswith("VmHWM:"):
+                    # in kilobytes
+                    return int(line.split()[1]) * 1024
+    except OSError:
+        pass
+    return None
+
+
+class ProcessUsage:
+    """
+    Measure the CPU time and peak RSS of a process while it runs a script,
+        e.g., the Stata worker itself or the MATLAB process driven by the MATLAB worker.
+    The peak RSS is reset when the measurement starts, so earlier scripts do not count.
+    """
+
+    def __init__(self, pid):
+        self.pid = pid
+        self.cpu = process_cpu(pid)
+        self.reset = reset_peak_rss(pid)
+
+    def stop(self):
+        """
+        Returns (user CPU, system CPU, peak RSS in bytes) of the process since the start,
+            or None if they cannot be measured (e.g., not on Linux).
+        """
+        cpu = process_cpu(self.pid)
+        rss = peak_rss(self.pid)
+        if self.cpu is None or cpu is None or not self.reset or rss is None:
+            return None
+        return cpu[0] - self.cpu[0], cpu[1] - self.cpu[1], rss
+
+
+def report_error(log_file):
+    """
+    Append the traceback of the exception being handled to the log file
+        (ignored if the log file cannot be written).
+    """
+    import traceback
+
+    try:
+        with open(log_file, "a", encoding="utf-8") as log:
+            traceback.print_exc(file=log)
+    except OSError:
+        pass
+
+
+def serve(handler):
+    """
+    Serve requests forever with `handler(cwd, log_file, script, args)`,
+        which returns the return code of the script, or (return code, usage),
+        where usage is (user CPU, system CPU, peak RSS in bytes) of the script
+        (None if it cannot be measured).
+    Requests without the token in `WORKER_TOKEN` are ignored.
+    If the handler raises an exception, the return code is 1 and the worker keeps serving.
+    The usage is only reported if the handler measures it, since the usage of the worker
+        (e.g., its peak RSS over every earlier script) says nothing about the script.
+    Called by the worker processes.
+    """
+    import socket
+
+    # the scripts (and their subprocesses) do not need the token
+    token = os.environ.pop("WORKER_TOKEN", "").encode("utf-8")
+    if not token:
+        raise RuntimeError(
+            "WORKER_TOKEN is not set; start workers with `Worker`."
+        )
+    server = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    server.bind((HOST, 0))
+    server.listen()
+    print(f"PORT {server.getsockname()[1]}", flush=True)
+    # nothing should be written to the console while idle
+    devnull = os.open(os.devnull, os.O_WRONLY)
+    os.dup2(devnull, 1)
+    os.dup2(devnull, 2)
+    while True:
+        conn, _ = server.accept()
+        with conn:
+            request = conn.makefile("r", encoding="utf-8").readline()
+            fields = request.rstrip("\n").split("\0")
+            if len(fields) < 4 or not hmac.compare_digest(
+                fields[0].encode("utf-8"), token
+            ):
+                continue  # not sent by SCons
+            cwd, log_file, script, *args = fields[1:]
+            try:
+                result = handler(cwd, log_file, script, args)
+            except Exception:  # pylint: disable=broad-except
+                # a failing job (e.g., a log file that cannot be opened)
+                # must not stop the worker
+                report_error(log_file)
+                result = 1
+            returncode, usage = (
+                result if isinstance(result, tuple) else (result, None)
+            )
+            response = str(returncode)
+            if usage is not None:
+                response += " " + " ".join(str(value) for value in usage)
+            conn.sendall(f"{response}\n".encode("utf-8"))
@@ -0,0 +1,66 @@
+"""
+Shih-Hsuan Hsu
+October 18, 2026
+Shared fixtures of the tests: a throwaway project with the SConstruct and site_scons
+    of this repository, and helpers to build it with SCons.
+"""
+
+import os
+import sys
+import shutil
+import subprocess
+import pytest
+
+TASKS_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+"""The tasks directory of this repository."""
+
+# allow importing the modules in site_scons and common/code
+for folder in ["site_scons", os.path.join("common", "code")]:
+    sys.path.insert(0, os.path.join(TASKS_DIR, folder))
+
+
+def write(path, text):
+    """
+    Write a text file, creating its folder.
+    """
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "w", encoding="utf-8") as f:
+        f.write(text)
+
+
+def read(path):
+    """
+    Returns the contents of a text file.
+    """
+    with open(path, "r", encoding="utf-8") as f:
+        return f.read()
+
+
+def run_scons(project_dir, *args):
+    """
+    Build the project with SCons and return its output (fails the test on errors).
+    """
+    runner = subprocess.run(
+        ["scons", "-Q", *args],
+        cwd=project_dir,
+        capture_output=True,
+        text=True,
+    )
+    assert runner.returncode == 0, runner.stdout + runner.stderr
+    return runner.stdout
+
+
+@pytest.fixture
+def project(tmp_path):
+    """
+    Returns the path of an empty project using the SConstruct and site_scons of this repository.
+    """
+    shutil.copy(os.path.join(TASKS_DIR, "SConstruct"), tmp_path)
+    ignore = shutil.ignore_patterns(
+        "benchmarks", "__pycache__", ".scons_cache", "input", "output", "logs"
+    )
+    for name in ["site_scons", "common"]:
+        shutil.copytree(
+            os.path.join(TASKS_DIR, name), tmp_path / name, ignore=ignore
+        )
+    return tmp_path
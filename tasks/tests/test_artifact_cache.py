@@ -0,0 +1,78 @@
+"""
+Shih-Hsuan Hsu
+October 18, 2026
+Tests of the artifact cache (`ARTIFACT_CACHE=True`).
+"""
+
+import os
+import shutil
+from conftest import write, read, run_scons
+from artifact_store import ArtifactStore
+
+SCONSCRIPT = """Import("env")
+
+env["ARTIFACT_CACHE"] = True
+copy = env.Python(target="output/copy.txt", source="code/copy.py")
+env.Depends(copy, "input/data.txt")
+"""
+"""A task whose target depends on a file that is not a source."""
+
+SCRIPT = """with open("../input/data.txt", encoding="utf-8") as f:
+    data = f.read()
+with open("../output/copy.txt", "w", encoding="utf-8") as f:
+    f.write(data)
+"""
+"""Copy the data to the target."""
+
+
+def test_explicit_dependencies_are_part_of_the_key(project):
+    """
+    A target is rebuilt (not restored) when a file added with `env.Depends` changes,
+        and restored when the file changes back.
+    """
+    task = project / "copy_task"
+    write(task / "SConscript", SCONSCRIPT)
+    write(task / "code" / "copy.py", SCRIPT)
+    output = task / "output" / "copy.txt"
+
+    write(task / "input" / "data.txt", "A")
+    run_scons(project)
+    assert read(output) == "A"
+
+    write(task / "input" / "data.txt", "B")
+    stdout = run_scons(project)
+    assert "from the artifact cache" not in stdout
+    assert read(output) == "B"
+
+    write(task / "input" / "data.txt", "A")
+    stdout = run_scons(project)
+    assert "from the artifact cache" in stdout
+    assert read(output) == "A"
+    assert os.path.exists(task / "logs" / "copy.log")
+
+
+def test_restoring_an_evicted_entry_is_a_miss(tmp_path, monkeypatch):
+    """
+    An entry evicted while it is restored (by another job) is a miss, not an error.
+    """
+    store = ArtifactStore("test", str(tmp_path / "store"), 1 << 30)
+    write(tmp_path / "a.txt", "A")
+    key = "ab" * 32
+    store.put(key, {"a.txt": str(tmp_path / "a.txt")})
+    copyfile = shutil.copyfile
+
+    def evict_then_copy(source, target):
+        store.remove(key)
+        return copyfile(source, target)
+
+    monkeypatch.setattr(shutil, "copyfile", evict_then_copy)
+    assert not store.get(key, str(tmp_path / "dest"), {"a.txt"})
+    assert (store.hits, store.misses) == (0, 1)
+    assert os.listdir(tmp_path / "dest") == []
+    monkeypatch.setattr(shutil, "copyfile", copyfile)
+    # storing the entry again replaces it as a whole
+    store.put(key, {"a.txt": str(tmp_path / "a.txt")})
+    store.put(key, {"a.txt": str(tmp_path / "a.txt")})
+    assert store.get(key, str(tmp_path / "dest"), {"a.txt"})
+    assert read(tmp_path / "dest" / "a.txt") == "A"
+    assert [key for _, _, key in store.entries()] == [key]
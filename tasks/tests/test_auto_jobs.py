@@ -0,0 +1,39 @@
+"""
+Shih-Hsuan Hsu
+October 18, 2026
+Tests of the adaptive number of jobs (`AUTO_JOBS=1`).
+"""
+
+import threading
+from auto_jobs import JobController
+
+
+def test_declared_cpus_count_against_the_limit():
+    """
+    An action declaring CPUs uses that many of the limit,
+        and waits until they are released.
+    """
+    controller = JobController(cpus=4, max_jobs=8)
+    assert controller.acquire() == 1
+    started = threading.Event()
+
+    def run():
+        controller.acquire(4)
+        started.set()
+
+    thread = threading.Thread(target=run, daemon=True)
+    thread.start()
+    assert not started.wait(0.2)
+    controller.release(1)
+    assert started.wait(5)
+    assert controller.running == 4
+
+
+def test_large_declarations_run_alone():
+    """
+    A declaration larger than the limit is charged the limit.
+    """
+    controller = JobController(cpus=2, max_jobs=4)
+    assert controller.acquire(16) == 2
+    controller.release(2)
+    assert controller.running == 0
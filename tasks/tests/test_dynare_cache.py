@@ -0,0 +1,70 @@
+"""
+Shih-Hsuan Hsu
+October 18, 2026
+Tests of the Dynare preprocessor cache (`DYNARE_CACHE=True`).
+"""
+
+import os
+import shutil
+import pytest
+import artifact_store
+from conftest import write, read
+from dynare_cache import (
+    dynare_version,
+    restore_preprocessed,
+    store_preprocessed,
+)
+
+ENV = {"DYNARE_CACHE": True, "DYNARE_VERSION": "6.2"}
+"""Settings of the Dynare targets."""
+
+
+@pytest.fixture
+def model(tmp_path, monkeypatch):
+    """
+    Returns the `.mod` file of a model preprocessed in an empty project.
+    """
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(artifact_store, "STORES", {})
+    code_dir = tmp_path / "code"
+    write(code_dir / "rbc.mod", "var y;\n")
+    write(code_dir / "+rbc" / "driver.m", "% driver\n")
+    write(code_dir / "rbc" / "model" / "json" / "modfile.json", "{}\n")
+    # results of the run are not part of the preprocessor output
+    write(code_dir / "rbc" / "Output" / "rbc_results.mat", "results\n")
+    return str(code_dir / "rbc.mod")
+
+
+def test_the_cache_requires_the_dynare_version():
+    """
+    The cache is not used with an unknown Dynare version.
+    """
+    with pytest.raises(ValueError, match="DYNARE_VERSION"):
+        dynare_version({"DYNARE_CACHE": True})
+
+
+def test_restore_the_package_and_the_model_folder(model):
+    """
+    Both the `+<model>` package and the `<model>/model` folder are restored.
+    """
+    store_preprocessed(ENV, model)
+    code_dir = os.path.dirname(model)
+    shutil.rmtree(os.path.join(code_dir, "+rbc"))
+    shutil.rmtree(os.path.join(code_dir, "rbc"))
+    assert restore_preprocessed(ENV, model)
+    assert read(os.path.join(code_dir, "+rbc", "driver.m")) == "% driver\n"
+    assert os.path.exists(
+        os.path.join(code_dir, "rbc", "model", "json", "modfile.json")
+    )
+    assert not os.path.exists(os.path.join(code_dir, "rbc", "Output"))
+    # another version of Dynare preprocesses the model again
+    assert not restore_preprocessed({**ENV, "DYNARE_VERSION": "6.3"}, model)
+
+
+def test_models_compiled_to_mex_files_are_not_cached(model):
+    """
+    The MEX files of `use_dll` depend on the compiler, so the model is not cached.
+    """
+    write(os.path.join(os.path.dirname(model), "+rbc", "dynamic.mexa64"), "")
+    store_preprocessed(ENV, model)
+    assert not restore_preprocessed(ENV, model)
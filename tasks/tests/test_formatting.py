@@ -0,0 +1,40 @@
+"""
+Shih-Hsuan Hsu
+October 18, 2026
+Tests of the incremental black formatter.
+"""
+
+import os
+import formatting
+from conftest import write
+
+
+def test_only_changed_contents_are_formatted(tmp_path, monkeypatch):
+    """
+    A file whose modification time changed but not its content (e.g., `touch`)
+        is not sent to black again.
+    """
+    sent = []
+
+    def run_black(files, line_length):
+        sent.append(sorted(os.path.basename(path) for path in files))
+        return files
+
+    monkeypatch.setattr(formatting, "run_black", run_black)
+    cache_path = str(tmp_path / "black_cache.json")
+    monkeypatch.setattr(formatting, "BLACK_CACHE", cache_path)
+    write(tmp_path / "task" / "a.py", "a = 1\n")
+    write(tmp_path / "task" / "b.py", "b = 1\n")
+    formatting.start_formatter(str(tmp_path / "task")).join()
+    assert sent[-1] == ["a.py", "b.py"]
+    # touch a.py and change b.py
+    stat = os.stat(tmp_path / "task" / "a.py")
+    os.utime(
+        tmp_path / "task" / "a.py",
+        ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9),
+    )
+    write(tmp_path / "task" / "b.py", "b = 2\n")
+    formatting.start_formatter(str(tmp_path / "task")).join()
+    assert sent[-1] == ["b.py"]
+    formatting.start_formatter(str(tmp_path / "task")).join()
+    assert sent[-1] == []
@@ -0,0 +1,175 @@
+"""
+Shih-Hsuan Hsu
+October 18, 2026
+Tests of the FRED downloads (`env.FredDownloads`) against the stand-in FRED API.
+"""
+
+import threading
+from http.server import ThreadingHTTPServer
+import pytest
+from conftest import write, read, run_scons
+from fred_batch import FredClient, KeyRing, download_batch
+from fred_stand_in_server import FredRequestHandler
+
+
+class RecordingHandler(FredRequestHandler):
+    """
+    The stand-in FRED API, recording the (series, key, status) of every request
+        and answering the first request of each series in `flaky` with a 500.
+    """
+
+    latency = 0.0
+    requests = {}
+    lock = threading.Lock()
+    log = []
+    starts = []
+    flaky = set()
+
+    def send_json(self, status, data, headers=None):
+        params = dict(
+            pair.split("=", 1) for pair in self.path.split("?")[-1].split("&")
+        )
+        with self.lock:
+            self.log.append(
+                (params.get("series_id"), params.get("api_key"), status)
+            )
+            if status == 200:
+                self.starts.append(params.get("observation_start"))
+        super().send_json(status, data, headers)
+
+    def do_GET(self):  # pylint: disable=invalid-name
+        series_id = self.path.split("series_id=")[-1].split("&")[0]
+        with self.lock:
+            failing = series_id in self.flaky
+            self.flaky.discard(series_id)
+        if failing:
+            self.send_json(500, {"error_code": 500, "error_message": "Error."})
+            return
+        super().do_GET()
+
+    def log_message(self, format, *args):  # pylint: disable=redefined-builtin
+        pass
+
+
+@pytest.fixture
+def server(tmp_path, monkeypatch):
+    """
+    Returns the handler class of a stand-in FRED API running in a thread,
+        with the cache in a temporary folder.
+    """
+    monkeypatch.setenv("FRED_CACHE_DIR", str(tmp_path / "cache"))
+    RecordingHandler.requests = {}
+    RecordingHandler.log = []
+    RecordingHandler.starts = []
+    RecordingHandler.flaky = set()
+    RecordingHandler.rate = 100.0
+    RecordingHandler.months = 36
+    RecordingHandler.vintage = 0
+    httpd = ThreadingHTTPServer(("127.0.0.1", 0), RecordingHandler)
+    thread = threading.Thread(target=httpd.serve_forever, daemon=True)
+    thread.start()
+    RecordingHandler.url = f"http://127.0.0.1:{httpd.server_port}/fred"
+    yield RecordingHandler
+    httpd.shutdown()
+    httpd.server_close()
+
+
+def test_batch_spreads_the_series_over_the_keys(server, tmp_path):
+    """
+    A batch downloads all its series, using every key.
+    """
+    series = [f"SERIES{i}" for i in range(8)]
+    pairs = [(s, str(tmp_path / f"{s}.csv")) for s in series]
+    keys = KeyRing(["key1", "key2"], rate=100, burst=1)
+    errors = download_batch(pairs, FredClient(keys, server.url), workers=4)
+    assert errors == {}
+    for _, path in pairs:
+        assert len(read(path).splitlines()) == 36
+    assert {key for _, key, _ in server.log} == {"key1", "key2"}
+    assert {s for s, _, _ in server.log} == set(series)
+
+
+def test_rate_limited_requests_back_off(server, tmp_path):
+    """
+    When the server answers 429, the key rests and the request is retried.
+    """
+    server.rate = 1.0
+    series = ["A", "B", "C"]
+    pairs = [(s, str(tmp_path / f"{s}.csv")) for s in series]
+    keys = KeyRing(["key"], rate=100, burst=3)
+    errors = download_batch(pairs, FredClient(keys, server.url), workers=3)
+    assert errors == {}
+    statuses = [status for _, _, status in server.log]
+    assert 429 in statuses
+    assert statuses.count(200) == len(series)
+
+
+def test_server_errors_are_retried(server, tmp_path):
+    """
+    A series whose first request fails with a 500 is downloaded on retry.
+    """
+    server.flaky = {"FLAKY"}
+    pairs = [("FLAKY", str(tmp_path / "flaky.csv"))]
+    keys = KeyRing(["key"], rate=100, burst=5)
+    assert download_batch(pairs, FredClient(keys, server.url)) == {}
+    assert [status for _, _, status in server.log] == [500, 200]
+    assert len(read(pairs[0][1]).splitlines()) == 36
+
+
+def test_missing_series_fail_without_stopping_the_batch(server, tmp_path):
+    """
+    A series that does not exist is reported (without retries),
+        and the other series of the batch are still downloaded.
+    """
+    pairs = [
+        ("MISSING1", str(tmp_path / "missing.csv")),
+        ("GDP", str(tmp_path / "gdp.csv")),
+    ]
+    keys = KeyRing(["key"], rate=100, burst=5)
+    errors = download_batch(pairs, FredClient(keys, server.url))
+    assert list(errors) == ["MISSING1"]
+    assert "does not exist" in errors["MISSING1"]
+    assert [s for s, _, _ in server.log].count("MISSING1") == 1
+    assert (tmp_path / "gdp.csv").exists()
+    assert not (tmp_path / "missing.csv").exists()
+
+
+def test_refresh_picks_up_new_and_revised_observations(server, tmp_path):
+    """
+    After the server publishes new observations and revises the recent ones,
+        a refresh only requests the recent observations but matches a full download.
+    """
+    keys = KeyRing(["key"], rate=100, burst=5)
+    client = FredClient(keys, server.url)
+    refreshed = str(tmp_path / "refreshed.csv")
+    assert download_batch([("GDP", refreshed)], client) == {}
+    before = read(refreshed).splitlines()
+    # restart the server with 4 more months and a new vintage
+    server.months, server.vintage = 40, 1
+    assert download_batch([("GDP", refreshed)], client) == {}
+    full = str(tmp_path / "full.csv")
+    assert download_batch([("GDP", full)], client, full=True) == {}
+    assert server.starts[0] is None and server.starts[1] is not None
+    assert server.starts[2] is None
+    after = read(refreshed).splitlines()
+    assert after == read(full).splitlines()
+    assert len(after) == 40
+    # the old observations are kept, the revised ones are updated
+    assert after[:24] == before[:24]
+    assert after[30:36] != before[30:36]
+
+
+def test_fred_downloads_depend_on_the_cache_module(project):
+    """
+    The downloads are rebuilt when `fred_batch.py` or `fred_cache.py` changes.
+    """
+    write(
+        project / "fred_task" / "SConscript",
+        'Import("env")\n'
+        'env.FredDownloads(target=["output/gdp.csv"], source=["GDP"])\n',
+    )
+    output = run_scons(
+        project, "-n", "--tree=prune", "fred_task/output/gdp.csv"
+    )
+    assert "+-common/code/fred_batch.py" in output
+    assert "+-common/code/fred_cache.py" in output
@@ -0,0 +1,27 @@
+"""
+Shih-Hsuan Hsu
+October 18, 2026
+Tests of the image formats exported to the SConscript files.
+"""
+
+from conftest import write, run_scons
+
+
+def test_figure_targets_follow_the_image_formats(project):
+    """
+    `env["IMAGE_FORMATS"]` has the formats of `save_figure` in `plot_settings.py`.
+    """
+    write(
+        project / "figure_task" / "SConscript",
+        'Import("env")\n'
+        "env.Python(\n"
+        '    target=[f"output/figure.{ext}" for ext in env["IMAGE_FORMATS"]],\n'
+        '    source=["code/plot_figure.py"],\n'
+        ")\n",
+    )
+    write(project / "figure_task" / "code" / "plot_figure.py", "")
+    output = run_scons(project, "-n", "figure_task")
+    assert (
+        '"figure_task/output/figure.pdf", "figure_task/output/figure.html"'
+        in output
+    )
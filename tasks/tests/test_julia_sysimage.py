@@ -0,0 +1,30 @@
+"""
+Shih-Hsuan Hsu
+October 18, 2026
+Tests of the Julia sysimage (`env.JuliaSysimage`).
+"""
+
+from conftest import write, run_scons
+
+SCONSCRIPT = """Import("env")
+
+env.Julia(target="output/a.txt", source="code/a.jl")
+env.JuliaSysimage(target="output/sys.so", source=["Project.toml"])
+"""
+"""A Julia target declared before the sysimage it starts with."""
+
+
+def test_julia_targets_depend_on_the_sysimage(project):
+    """
+    Julia targets are built after the sysimage, even if declared before it.
+    """
+    task = project / "julia_task"
+    write(task / "SConscript", SCONSCRIPT)
+    write(task / "code" / "a.jl", "println(1)\n")
+    write(task / "Project.toml", "[deps]\n")
+    output = run_scons(project, "-n", "--tree=prune", "julia_task/output/a.txt")
+    tree = output[output.index("+-julia_task/output/a.txt") :]
+    assert "+-julia_task/output/sys.so" in tree
+    assert output.index("julia_sysimage_build_action") < output.index(
+        "julia_build_action"
+    )
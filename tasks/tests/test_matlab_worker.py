@@ -0,0 +1,29 @@
+"""
+Shih-Hsuan Hsu
+October 18, 2026
+Tests of the resident MATLAB session (`MATLAB_WORKER=True`).
+"""
+
+from matlab_worker import job_statement
+
+
+def test_args_are_only_set_when_given(monkeypatch):
+    """
+    `ARGS` is set for a job with arguments, and cleared for the next job without.
+    """
+    monkeypatch.delenv("ARGS", raising=False)
+    with_args = job_statement("/task/code", "run('a.m')", ["x 'y'"])
+    assert "setenv('ARGS', 'x ''y''');" in with_args
+    assert with_args.endswith("run('a.m')")
+    without_args = job_statement("/task/code", "run('b.m')", [])
+    assert "x ''y''" not in without_args
+    assert "unsetenv('ARGS')" in without_args
+
+
+def test_args_of_the_session_are_restored(monkeypatch):
+    """
+    Without arguments, `ARGS` goes back to the value the session started with.
+    """
+    monkeypatch.setenv("ARGS", "default")
+    statement = job_statement("/task/code", "run('b.m')", [])
+    assert "setenv('ARGS', 'default');" in statement
@@ -0,0 +1,50 @@
+"""
+Shih-Hsuan Hsu
+October 18, 2026
+Tests of the prefork Python worker (`PYTHON_WORKER=True`).
+"""
+
+import os
+import sys
+from conftest import TASKS_DIR, write, read
+from worker_pool import Worker
+
+SCRIPT = """import sys
+import time
+import atexit
+import threading
+
+def finish():
+    time.sleep(0.2)
+    with open("thread.txt", "w") as f:
+        f.write("done")
+
+threading.Thread(target=finish).start()
+atexit.register(lambda: print("atexit ran"))
+sys.stdout.write("no newline")
+"""
+"""A script relying on the interpreter exit: a non-daemon thread,
+    an atexit function, and buffered output."""
+
+
+def test_scripts_exit_like_python(tmp_path):
+    """
+    The forked child waits for its threads, runs the atexit functions,
+        and flushes its output before exiting.
+    """
+    write(tmp_path / "script.py", SCRIPT)
+    log_file = str(tmp_path / "script.log")
+    worker = Worker(
+        [
+            sys.executable,
+            os.path.join(TASKS_DIR, "site_scons", "python_worker.py"),
+        ],
+        log_file,
+    )
+    try:
+        assert worker.run(str(tmp_path), log_file, "script.py", []) == 0
+    finally:
+        worker.close()
+    assert read(tmp_path / "thread.txt") == "done"
+    log = read(log_file)
+    assert "no newline" in log and "atexit ran" in log
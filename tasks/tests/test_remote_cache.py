@@ -0,0 +1,136 @@
+"""
+Shih-Hsuan Hsu
+October 18, 2026
+Tests of the remote cache client (`remote_cache.py`) against the reference server
+    (`cache_server.py`) running in a thread.
+"""
+
+import json
+import threading
+import urllib.error
+import urllib.request
+from http.server import ThreadingHTTPServer
+import pytest
+from conftest import write, read
+from artifact_store import ArtifactStore
+from cache_server import CacheRequestHandler
+from remote_cache import RemoteCache
+
+TOKEN = "secret-token"
+"""Shared token of the test server."""
+
+KEY = "ab" * 32
+"""Key of the test entry."""
+
+
+def start_server(root, handler=CacheRequestHandler):
+    """
+    Start a cache server on a free port in a thread and return it.
+    """
+    handler = type("Handler", (handler,), {"root": str(root), "token": TOKEN})
+    server = ThreadingHTTPServer(("127.0.0.1", 0), handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+@pytest.fixture
+def server(tmp_path):
+    """
+    Returns the URL of a cache server storing its files in `tmp_path / "server"`.
+    """
+    server = start_server(tmp_path / "server")
+    yield f"http://127.0.0.1:{server.server_port}"
+    server.shutdown()
+    server.server_close()
+
+
+def local_store(tmp_path, name):
+    """
+    Returns a local artifact store with one entry restoring `a.txt` if `name` is "pusher".
+    """
+    store = ArtifactStore(name, str(tmp_path / name), 1 << 30)
+    if name == "pusher":
+        write(tmp_path / "a.txt", "A")
+        store.put(KEY, {"a.txt": str(tmp_path / "a.txt")})
+    return store
+
+
+def test_push_and_pull_round_trip(tmp_path, server):
+    """
+    An entry pushed by one machine is pulled and restored by another.
+    """
+    RemoteCache(server, 2, 5, TOKEN).push(KEY, local_store(tmp_path, "pusher"))
+    remote = RemoteCache(server, 2, 5, TOKEN)
+    store = local_store(tmp_path, "puller")
+    assert remote.pull(KEY, store, {"a.txt"})
+    assert store.get(KEY, str(tmp_path / "dest"), {"a.txt"})
+    assert read(tmp_path / "dest" / "a.txt") == "A"
+    # an unknown key is a miss, and the server is still used
+    assert not remote.pull("cd" * 32, store, {"a.txt"})
+    assert (remote.hits, remote.misses, remote.available) == (1, 1, True)
+
+
+def test_requests_without_the_token_are_rejected(tmp_path, server):
+    """
+    The server rejects requests with a wrong token, and the client stops using it.
+    """
+    remote = RemoteCache(server, 2, 5, "wrong-token")
+    with pytest.raises(urllib.error.HTTPError) as error:
+        remote.request("GET", f"/ac/{KEY}")
+    assert error.value.code == 401
+    remote.push(KEY, local_store(tmp_path, "pusher"))
+    assert not remote.available
+    assert not (tmp_path / "server").exists()
+
+
+def test_unsafe_paths_are_rejected(tmp_path, server):
+    """
+    The server rejects invalid addresses and manifests writing outside the task,
+        and the client ignores manifests restoring other files than the targets.
+    """
+    remote = RemoteCache(server, 2, 5, TOKEN)
+    assert remote.request("GET", "/cas/../../secrets") is None
+    manifest = {"files": [{"path": "../evil.txt", "sha256": "0" * 64}]}
+    with pytest.raises(urllib.error.HTTPError) as error:
+        remote.request(
+            "PUT", f"/ac/{KEY}", json.dumps(manifest).encode("utf-8")
+        )
+    assert error.value.code == 400
+    # an entry restoring another file than the target
+    remote.push(KEY, local_store(tmp_path, "pusher"))
+    store = local_store(tmp_path, "puller")
+    assert not remote.pull(KEY, store, {"b.txt"})
+    assert remote.available and store.manifest(KEY) is None
+
+
+class TruncatingHandler(CacheRequestHandler):
+    """
+    A server that announces more bytes than it sends (a dropped connection).
+    """
+
+    def do_GET(self, send_body=True):  # pylint: disable=invalid-name
+        self.send_response(200)
+        self.send_header("Content-Length", "1000")
+        self.end_headers()
+        self.wfile.write(b"{}")
+        self.close_connection = True
+
+
+def test_failing_servers_fall_back_to_the_local_cache(tmp_path):
+    """
+    A truncated response or an unreachable server is a miss, not a failed build,
+        and the server is not used for the rest of the build.
+    """
+    server = start_server(tmp_path / "server", TruncatingHandler)
+    url = f"http://127.0.0.1:{server.server_port}"
+    try:
+        remote = RemoteCache(url, 2, 5, TOKEN)
+        assert not remote.pull(KEY, local_store(tmp_path, "puller"), {"a.txt"})
+        assert not remote.available
+    finally:
+        server.shutdown()
+        server.server_close()
+    # nothing listens on the port anymore
+    remote = RemoteCache(url, 2, 5, TOKEN)
+    assert not remote.pull(KEY, local_store(tmp_path, "puller"), {"a.txt"})
+    assert not remote.available
@@ -0,0 +1,96 @@
+"""
+Shih-Hsuan Hsu
+October 18, 2026
+Tests of the resource declarations (`CPUS=`, `MEM=`).
+"""
+
+from conftest import write, read, run_scons
+from resources import ResourceGate
+
+SCONSCRIPT = """Import("env")
+
+env["MACHINE_CPUS"] = 2
+for name, cpus in [("a", 2), ("b", None), ("c", None)]:
+    env.Python(
+        target=f"output/{name}.txt",
+        source="code/sleep.py",
+        ARGS=[name],
+        LOG_FILE=f"logs/{name}.log",
+        **({"CPUS": cpus} if cpus else {}),
+    )
+"""
+"""A target declaring the whole machine, and two undeclared targets (1 CPU each)."""
+
+SCRIPT = """import sys
+import time
+
+start = time.time()
+time.sleep(1)
+with open(f"../output/{sys.argv[1]}.txt", "w", encoding="utf-8") as f:
+    f.write(f"{start} {time.time()}")
+"""
+"""Sleep for a second and write the start and end times."""
+
+
+class FakeNode:
+    """
+    A node without a builder (its own scheduling unit).
+    """
+
+    def __init__(self, name):
+        self.name = name
+
+    def has_builder(self):
+        return False
+
+
+def test_undeclared_targets_wait_for_a_full_machine(project):
+    """
+    The undeclared targets count as one CPU, so they do not run next to the target
+        declaring all the CPUs, but run next to each other with `-j 3`.
+    """
+    task = project / "sleep_task"
+    write(task / "SConscript", SCONSCRIPT)
+    write(task / "code" / "sleep.py", SCRIPT)
+    run_scons(project, "-j3")
+    times = {
+        name: [float(t) for t in read(task / "output" / f"{name}.txt").split()]
+        for name in "abc"
+    }
+    a_start, a_end = times["a"]
+    for name in "bc":
+        start, end = times[name]
+        assert end <= a_start or a_end <= start
+    (b_start, b_end), (c_start, c_end) = times["b"], times["c"]
+    assert b_start < c_end and c_start < b_end
+
+
+def test_waiting_targets_start_in_order():
+    """
+    A target declaring all the CPUs is not overtaken by smaller targets
+        that became ready after it.
+    """
+    gate = ResourceGate(cpus=8, mem=None)
+    small, big, later = FakeNode("small"), FakeNode("big"), FakeNode("later")
+    assert gate.try_acquire(small, 1, 0)
+    assert not gate.try_acquire(big, 8, 0)
+    # fits, but `big` is waiting
+    assert not gate.try_acquire(later, 1, 0)
+    assert gate.waiting_nodes() == [big, later]
+    gate.release(1, 0)
+    assert not gate.try_acquire(later, 1, 0)
+    assert gate.try_acquire(big, 8, 0)
+    assert not gate.try_acquire(later, 1, 0)
+    gate.release(8, 0)
+    assert gate.try_acquire(later, 1, 0)
+    assert gate.waiting_nodes() == []
+
+
+def test_large_declarations_run_alone():
+    """
+    A declaration larger than the machine is reduced to the machine.
+    """
+    gate = ResourceGate(cpus=2, mem=100)
+    node = FakeNode("huge")
+    assert gate.try_acquire(node, 64, 1000)
+    assert (gate.used_cpus, gate.used_mem) == (2, 100)
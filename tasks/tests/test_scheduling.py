@@ -0,0 +1,92 @@
+"""
+Shih-Hsuan Hsu
+October 18, 2026
+Tests of the critical-path-first scheduling and the scheduling simulator.
+"""
+
+import pytest
+import SCons.Taskmaster
+from monkey_patches import patch_critical_path_first
+from scheduling import simulate, parse_jobs_list
+
+
+class FakeNode:
+    """
+    A ready node without a builder (its own scheduling unit).
+    """
+
+    def __init__(self, name):
+        self.name = name
+
+    def has_builder(self):
+        return False
+
+    def get_executor(self):
+        return self
+
+    def get_action_side_effects(self):
+        return []
+
+
+def fake_find_next_ready_node(self):
+    """
+    Stand-in for the SCons search: returns the next ready node and, like SCons,
+        resets `ready_exc` on every call and sets it for a node that failed to scan.
+    """
+    self.ready_exc = None
+    if not self.fake_ready:
+        return None
+    node = self.fake_ready.pop(0)
+    if node.name == "broken":
+        self.ready_exc = (RuntimeError, RuntimeError("cannot scan"))
+    return node
+
+
+def test_critical_path_first_keeps_scan_errors(monkeypatch):
+    """
+    A node returned with an exception (e.g., a failed scan) is returned
+        with its exception, not queued (the next search would clear the exception).
+    """
+    monkeypatch.setattr(
+        SCons.Taskmaster.Taskmaster,
+        "_find_next_ready_node",
+        fake_find_next_ready_node,
+    )
+    patch_critical_path_first()
+    taskmaster = SCons.Taskmaster.Taskmaster.__new__(
+        SCons.Taskmaster.Taskmaster
+    )
+    taskmaster.original_top = []
+    taskmaster.fake_ready = [FakeNode(name) for name in ["a", "broken", "c"]]
+    node = taskmaster._find_next_ready_node()
+    assert node.name == "broken"
+    assert taskmaster.ready_exc is not None
+    names = []
+    while (node := taskmaster._find_next_ready_node()) is not None:
+        assert taskmaster.ready_exc is None
+        names.append(node.name)
+    assert sorted(names) == ["a", "c"]
+
+
+def test_simulate():
+    """
+    Two independent 1-second units after a 1-second unit take 2 seconds
+        with 2 jobs and 3 seconds with 1 job.
+    """
+    graph = {"first": [], "left": ["first"], "right": ["first"]}
+    expected = {"first": 1.0, "left": 1.0, "right": 1.0}
+    assert simulate(graph, expected, 1) == 3.0
+    assert simulate(graph, expected, 2) == 2.0
+
+
+def test_simulate_needs_one_job():
+    """
+    Simulating less than one job is an error (instead of a crash).
+    """
+    with pytest.raises(ValueError):
+        simulate({"first": []}, {"first": 1.0}, 0)
+    with pytest.raises(ValueError):
+        parse_jobs_list("1,0")
+    with pytest.raises(ValueError):
+        parse_jobs_list("a")
+    assert parse_jobs_list("1,2,4") == [1, 2, 4]
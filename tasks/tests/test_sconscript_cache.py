@@ -0,0 +1,63 @@
+"""
+Shih-Hsuan Hsu
+October 18, 2026
+Tests of the SConscript cache (`SCONSCRIPT_CACHE=1`).
+"""
+
+import os
+import json
+from conftest import write, read, run_scons
+
+SCONSCRIPT = """Import("env")
+
+env.Python(target="output/a.txt", source="code/a.py", ARGS="{arg}")
+env.Precious("output/a.txt")
+"""
+"""A task with one Python target."""
+
+
+def tree(output):
+    """
+    Returns the dependency tree printed by `--tree=prune`.
+    """
+    return output[output.index("+-") :]
+
+
+def read_entries(project):
+    """
+    Returns the recorded entries of the SConscript cache.
+    """
+    folder = project / ".scons_cache" / "sconscripts"
+    entries = []
+    for name in sorted(os.listdir(folder)):
+        if name.endswith(".json"):
+            entries.append(json.loads(read(folder / name)))
+    return entries
+
+
+def test_replay_gives_the_same_dependency_tree(project):
+    """
+    A recorded SConscript file is replayed into the same targets and dependencies,
+        and recorded again when it changes.
+    """
+    task = project / "cached_task"
+    write(task / "SConscript", SCONSCRIPT.format(arg="x"))
+    write(
+        task / "code" / "a.py",
+        "open('../output/a.txt', 'w').write('a')\n",
+    )
+    args = ["SCONSCRIPT_CACHE=1", "-n", "--tree=prune", "cached_task"]
+    recorded = run_scons(project, *args)
+    (entry,) = read_entries(project)
+    assert entry["sconscript"].endswith("SConscript")
+    assert [
+        event["builder"] for event in entry["events"] if "builder" in event
+    ] == ["Python"]
+    replayed = run_scons(project, *args)
+    assert tree(replayed) == tree(recorded)
+    assert "cached_task/output/a.txt" in tree(replayed)
+    # a changed SConscript file is run and recorded again
+    write(task / "SConscript", SCONSCRIPT.format(arg="y"))
+    run_scons(project, *args)
+    (new_entry,) = read_entries(project)
+    assert new_entry["key"] != entry["key"]
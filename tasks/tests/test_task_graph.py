@@ -0,0 +1,55 @@
+"""
+Shih-Hsuan Hsu
+October 18, 2026
+Tests of the task graph targets.
+"""
+
+import json
+from conftest import write, read, run_scons
+
+SCONSCRIPT = """Import("env")
+
+env.Python(target="output/a.txt", source="code/a.py")
+"""
+"""A task with one Python target."""
+
+
+def test_run_times_do_not_rebuild_the_graph(project):
+    """
+    The graph files are only rebuilt when the edges change,
+        while the run times are written to `task_times.json`
+        and drawn in `task_graph_times.dot`.
+    """
+    task = project / "time_task"
+    write(task / "SConscript", SCONSCRIPT)
+    script = "open('../output/a.txt', 'w').write('{}')\n"
+    write(task / "code" / "a.py", script.format(1))
+    assert "Writing the task graph\n" in run_scons(project)
+    # a new run time of the task
+    write(task / "code" / "a.py", "import time\ntime.sleep(0.3)\n" + script)
+    run_scons(project)
+    output = run_scons(project)
+    assert "Writing the task graph\n" not in output
+    times = json.loads(
+        read(project / "task_graph" / "output" / "task_times.json")
+    )
+    assert times["tasks"]["time_task"]["time"] >= 0.1
+    assert times["critical_path"] == ["time_task"]
+    dot = read(project / "task_graph" / "output" / "task_graph_times.dot")
+    assert "time_task\\n" in dot
+    assert "color=red" in dot
+    # a new edge rebuilds the graph
+    write(
+        project / "other_task" / "SConscript",
+        'Import("env")\nenv.Python(target="output/b.txt", '
+        'source=["code/b.py", "#/time_task/output/a.txt"])\n',
+    )
+    write(
+        project / "other_task" / "code" / "b.py",
+        "open('../output/b.txt', 'w').write('b')\n",
+    )
+    assert "Writing the task graph\n" in run_scons(project)
+    graph = json.loads(
+        read(project / "task_graph" / "output" / "task_graph.json")
+    )
+    assert graph["deps"]["other_task"] == ["time_task"]
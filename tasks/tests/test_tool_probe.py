@@ -0,0 +1,28 @@
+"""
+Shih-Hsuan Hsu
+October 18, 2026
+Tests of the tool probe (`env["TOOL_PROBE"]`).
+"""
+
+from conftest import write, run_scons
+
+SCONSCRIPT = """Import("env")
+
+env.Tool("textfile")
+env.Textfile(target="output/notes.txt", source=["notes"])
+env.PDF(target="output/paper.pdf", source="code/paper.tex")
+"""
+"""A task loading an SCons tool (which sets the reserved `TOOLS` variable) and a PDF target."""
+
+
+def test_loading_a_tool_keeps_the_probe(project):
+    """
+    `env.Tool()` overwrites `env["TOOLS"]`, so the PDF emitter must read the probe
+        from `env["TOOL_PROBE"]`.
+    """
+    task = project / "paper_task"
+    write(task / "SConscript", SCONSCRIPT)
+    write(task / "code" / "paper.tex", "\\documentclass{article}\n")
+    output = run_scons(project, "-n", "--tree=prune", "paper_task")
+    assert "paper_task/output/paper.pdf" in output
+    assert "paper_task/output/notes.txt" in output
@@ -0,0 +1,124 @@
+"""
+Shih-Hsuan Hsu
+October 18, 2026
+Tests of the persistent worker pools.
+"""
+
+import os
+import sys
+import threading
+import subprocess
+import pytest
+import worker_pool
+from conftest import TASKS_DIR, write, read
+from worker_pool import ProcessUsage, Worker, WorkerPool, peak_rss
+
+FAILING_WORKER = """from worker_pool import serve
+
+def run(cwd, log_file, script, args):
+    if script == "raise.py":
+        raise RuntimeError("handler failed")
+    return 0
+
+serve(run)
+"""
+"""A worker whose handler raises an exception for `raise.py`."""
+
+
+class FakeWorker:
+    """
+    A worker that does not start a process.
+    """
+
+    def __init__(self, command, log_file, env=None):
+        self.env = env
+        self.closed = False
+
+    def alive(self):
+        return not self.closed
+
+    def close(self):
+        self.closed = True
+
+
+def test_pools_of_an_interpreter_share_the_job_slots(monkeypatch):
+    """
+    Pools with different thread budgets never have more workers in total than jobs:
+        an idle worker of another budget is stopped to make room.
+    """
+    monkeypatch.setattr(worker_pool, "Worker", FakeWorker)
+    condition, siblings = threading.Condition(), []
+    one = WorkerPool(["x"], 2, {"T": "1"}, condition, siblings)
+    four = WorkerPool(["x"], 2, {"T": "4"}, condition, siblings)
+    first, second = one.acquire("log"), one.acquire("log")
+    one.release(first)
+    one.release(second)
+    worker = four.acquire("log")
+    assert worker.env == {"T": "4"}
+    assert first.closed and not second.closed
+    assert one.total_workers() == 2
+    # both slots are taken: a third action waits for a worker to be released
+    acquired = []
+    thread = threading.Thread(
+        target=lambda: acquired.append(one.acquire("log")), daemon=True
+    )
+    one.acquire("log")
+    thread.start()
+    thread.join(0.2)
+    assert not acquired
+    four.release(worker)
+    thread.join(5)
+    assert acquired and worker.closed
+    assert one.total_workers() == 2
+
+
+def test_usage_of_a_resident_process_excludes_earlier_jobs():
+    """
+    The peak RSS of a job run by a resident process (e.g., the MATLAB session)
+        does not include the memory used by earlier jobs.
+    """
+    process = subprocess.Popen(
+        [
+            sys.executable,
+            "-c",
+            "b = bytearray(200 * 2**20)\ndel b\nprint('ready', flush=True)\n"
+            "input()",
+        ],
+        stdin=subprocess.PIPE,
+        stdout=subprocess.PIPE,
+        text=True,
+    )
+    try:
+        process.stdout.readline()
+        before = peak_rss(process.pid)
+        usage = ProcessUsage(process.pid).stop()
+        if usage is None:
+            pytest.skip("the usage of a process cannot be measured here")
+        assert before >= 200 * 2**20
+        assert usage[2] < 100 * 2**20
+    finally:
+        process.communicate("")
+
+
+def test_handler_exceptions_do_not_stop_the_worker(tmp_path):
+    """
+    A job whose handler raises fails with return code 1 and its traceback in the log,
+        and the worker keeps serving the next jobs.
+    """
+    write(tmp_path / "worker.py", FAILING_WORKER)
+    log_file = str(tmp_path / "job.log")
+    worker = Worker(
+        [sys.executable, str(tmp_path / "worker.py")],
+        log_file,
+        {
+            **os.environ,
+            "PYTHONPATH": os.path.join(TASKS_DIR, "site_scons"),
+        },
+    )
+    try:
+        assert worker.run(str(tmp_path), log_file, "raise.py", []) == 1
+        assert worker.alive()
+        assert worker.run(str(tmp_path), log_file, "ok.py", []) == 0
+    finally:
+        worker.close()
+    assert "RuntimeError: handler failed" in read(log_file)